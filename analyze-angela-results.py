@@ -4,11 +4,74 @@ Angela Paris Test Results Analyzer
 Analyzes the output from comprehensive Angela tests to understand prompt weights and behavior
 """
 
+from array import array
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import heapq
 import json
+import math
 import re
+import time
 from collections import Counter, defaultdict
 from datetime import datetime
 import os
+import random
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # AnchorStore falls back to pure-Python aggregation
+    np = None
+
+# Default keyword tables, keyed by the analysis stage that reports them.
+# Override with --keywords <file.json>, either {"table": [keywords]} or
+# {"word_boundary": true, "tables": {"table": [keywords]}}.
+DEFAULT_KEYWORD_TABLES = {
+    'budget': [
+        'free', 'cheap', 'affordable', 'budget',
+        'luxury', 'upscale', 'premium', 'expensive',
+        'guided', 'private', 'exclusive'
+    ],
+    'vibe': [
+        'romantic', 'intimate', 'chill', 'relaxed',
+        'adventure', 'active', 'fun', 'social',
+        'luxurious', 'upscale', 'authentic', 'local'
+    ],
+    'priority': [
+        'culture', 'history', 'museum', 'art',
+        'food', 'dining', 'restaurant', 'culinary',
+        'adventure', 'outdoor', 'hiking', 'active',
+        'relaxation', 'wellness', 'spa', 'chill',
+        'shopping', 'market', 'boutique', 'fashion',
+        'nightlife', 'bar', 'club', 'entertainment'
+    ],
+    'transport': [
+        'walking', 'walk', 'stroll', 'pedestrian',
+        'metro', 'subway', 'train', 'transport',
+        'taxi', 'uber', 'car', 'drive',
+        'bike', 'cycling', 'accessible'
+    ]
+}
+
+# Bump whenever stream_analyze output changes so cached per-file aggregates are recomputed
+ANALYZER_VERSION = '3'
+DEFAULT_CACHE_DIR = '.angela-analysis-cache'
+
+# Near-duplicate clustering: 16 bands x 4 rows puts the LSH threshold near Jaccard 0.5
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+NEAR_DUPLICATE_THRESHOLD = 0.5
+
+# Distinctive-term statistics: the log-odds prior is this fraction of the corpus term counts
+TERM_PRIOR_SCALE = 0.1
+TERM_PRIOR_FLOOR = 0.01
+
+SAMPLE_TITLE_LIMIT = 3
+FAILED_TEST_LIMIT = 50
+DISTINCT_SKETCH_SIZE = 4096
+TITLE_WORD_LIMIT = 1000
+STREAM_CHUNK_SIZE = 1 << 20
 
 def load_test_results(filename):
     """Load test results from JSON file"""
@@ -19,300 +82,1606 @@ def load_test_results(filename):
         print(f"❌ File {filename} not found. Run the test suite first.")
         return None
 
-def analyze_anchor_patterns(results):
-    """Analyze patterns in anchor suggestions"""
-    print("🔍 ANALYZING ANCHOR PATTERNS")
-    print("=" * 50)
-    
-    all_anchors = []
-    budget_anchors = defaultdict(list)
-    vibe_anchors = defaultdict(list)
-    priority_anchors = defaultdict(list)
-    
-    for result in results:
-        if not result.get('success') or not result.get('outputAnchors'):
-            continue
-            
-        profile = result['profileName']
+def iter_test_results(filename, chunk_size=STREAM_CHUNK_SIZE):
+    """Yield results one at a time from a top-level JSON array without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(filename, 'r') as f:
+        buffer = f.read(chunk_size)
+        pos = 0
+        eof = not buffer
+
+        def skip(chars):
+            nonlocal buffer, pos, eof
+            while True:
+                while pos < len(buffer) and buffer[pos] in chars:
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+
+        skip(' \t\r\n')
+        if pos >= len(buffer) or buffer[pos] != '[':
+            raise ValueError(f"{filename} is not a JSON array of test results")
+        pos += 1
+
+        while True:
+            skip(' \t\r\n,')
+            if pos >= len(buffer):
+                raise ValueError(f"{filename} ended before the closing ']'")
+            if buffer[pos] == ']':
+                return
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Element straddles the chunk boundary - pull in more text and retry
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            pos = end
+            yield result
+
+class KeywordMatcher:
+    """Find every keyword from every table in one scan of a text.
+
+    The text is lower-cased and split into word tokens once. A keyword made only
+    of word characters can only occur inside a single token, so each distinct
+    token is resolved to the keywords it contains the first time it is seen and
+    memoized; after warm-up a description costs one tokenize plus a dict lookup
+    per word. Keywords with spaces or punctuation fall back to one compiled
+    alternation. With word_boundary=True keywords only match whole words ("art"
+    no longer matches "party"); otherwise the old substring semantics are kept.
+    """
+
+    TOKEN_CACHE_LIMIT = 200000
+
+    def __init__(self, tables, word_boundary=False):
+        self.tables = {name: [kw.lower() for kw in keywords] for name, keywords in tables.items()}
+        self.word_boundary = word_boundary
+
+        self._tables_for = defaultdict(list)
+        for name, keywords in self.tables.items():
+            for keyword in dict.fromkeys(keywords):
+                self._tables_for[keyword].append(name)
+
+        # Table order, de-duplicated - used as the stable keyword coding order
+        self.keyword_order = list(self._tables_for)
+        self._word_keywords = [kw for kw in self.keyword_order if re.fullmatch(r'\w+', kw)]
+        self._word_keyword_set = frozenset(self._word_keywords)
+        phrases = sorted((kw for kw in self.keyword_order if kw not in self._word_keyword_set),
+                         key=lambda kw: (-len(kw), kw))
+        if phrases:
+            alternation = '|'.join(re.escape(kw) for kw in phrases)
+            if word_boundary:
+                alternation = rf'\b(?:{alternation})\b'
+            self._phrase_pattern = re.compile(rf'(?=({alternation}))')
+            self._implied = {
+                kw: [prefix for prefix in phrases if kw.startswith(prefix) and self._ends_word(kw, len(prefix))]
+                for kw in phrases
+            }
+        else:
+            self._phrase_pattern = None
+        self._token_cache = {}
+
+    def _ends_word(self, keyword, length):
+        if not self.word_boundary or length == len(keyword):
+            return True
+        return keyword[length - 1].isalnum() != keyword[length].isalnum()
+
+    def _token_keywords(self, token):
+        if self.word_boundary:
+            return (token,) if token in self._word_keyword_set else ()
+        return tuple(kw for kw in self._word_keywords if kw in token)
+
+    def find(self, text):
+        """Return the set of keywords (from any table) found in text"""
+        text = text.lower()
+        cache = self._token_cache
+        found = set()
+        for token in set(re.findall(r'\w+', text)):
+            keywords = cache.get(token)
+            if keywords is None:
+                if len(cache) >= self.TOKEN_CACHE_LIMIT:
+                    cache.clear()
+                keywords = cache[token] = self._token_keywords(token)
+            if keywords:
+                found.update(keywords)
+        if self._phrase_pattern is not None:
+            for match in self._phrase_pattern.finditer(text):
+                found.update(self._implied[match.group(1)])
+        return found
+
+    def scan(self, text):
+        """Return {table: [keywords found in text]} - each keyword is counted at most once"""
+        hits = defaultdict(list)
+        for keyword in self.find(text):
+            for table in self._tables_for[keyword]:
+                hits[table].append(keyword)
+        return hits
+
+def load_keyword_matcher(path=None, word_boundary=None):
+    """Build a KeywordMatcher from the default tables, optionally overridden by a JSON file"""
+    tables = dict(DEFAULT_KEYWORD_TABLES)
+    config_boundary = False
+    if path:
+        with open(path, 'r') as f:
+            config = json.load(f)
+        if 'tables' in config:
+            config_boundary = config.get('word_boundary', False)
+            config = config['tables']
+        tables.update(config)
+    if word_boundary is None:
+        word_boundary = config_boundary
+    return KeywordMatcher(tables, word_boundary=word_boundary)
+
+DEFAULT_MATCHER = KeywordMatcher(DEFAULT_KEYWORD_TABLES)
+
+def budget_tier(budget):
+    """Map a budget string such as '$30-50/day' to its analysis bucket"""
+    if '$30-50' in budget:
+        return 'budget'
+    elif '$800-1200' in budget:
+        return 'luxury'
+    elif '$200-350' in budget:
+        return 'mid-range'
+    return 'other'
+
+class NearDuplicateIndex:
+    """Cluster anchors whose titles and descriptions mostly overlap, in near-linear time.
+
+    Every anchor gets a MinHash signature over its title words and description
+    word pairs. Signatures are split into LSH bands, and the cluster seeds that
+    share a band bucket (or the exact title) become candidates. A candidate is
+    only accepted after its exact Jaccard similarity to the anchor clears the
+    threshold, over title words (strictly) and over all shingles, and the anchor
+    joins the best such seed. Comparing against the seed rather than any earlier member
+    keeps matches from chaining, so "Louvre Tour" and "Guided Louvre Tour" can
+    share a cluster while templated descriptions cannot pull "Louvre Tour" and
+    "Seine by Bike" together.
+    """
+
+    PRIME = (1 << 31) - 1
+    STOP_WORDS = frozenset(['a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'the', 'to', 'with'])
+
+    def __init__(self, permutations=MINHASH_PERMUTATIONS, bands=LSH_BANDS,
+                 threshold=NEAR_DUPLICATE_THRESHOLD, max_representatives=8, seed=1):
+        if permutations % bands:
+            raise ValueError("permutations must be a multiple of bands")
+        self.permutations = permutations
+        self.bands = bands
+        self.rows = permutations // bands
+        self.threshold = threshold
+        self.max_representatives = max_representatives
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, self.PRIME) for _ in range(permutations)]
+        self._b = [rng.randrange(0, self.PRIME) for _ in range(permutations)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+        self._clusters = array('I')
+        self._buckets = {}
+        self._seeds = {}  # seed id -> (title key, shingle hashes)
+        self._title_seeds = {}
+        self._title_matches = {}  # (title key, seed title key) -> titles similar enough
+
+    def _title_words(self, title):
+        return frozenset(w for w in re.findall(r'\w+', title.lower()) if w not in self.STOP_WORDS)
+
+    def _shingles(self, title_words, description):
+        desc_words = [w for w in re.findall(r'\w+', description.lower()) if w not in self.STOP_WORDS]
+        shingles = {f"t:{w}" for w in title_words}
+        shingles.update(f"d:{a} {b}" for a, b in zip(desc_words, desc_words[1:]))
+        return frozenset(zlib.crc32(shingle.encode('utf-8')) % self.PRIME for shingle in shingles)
+
+    def _signature(self, hashes):
+        if np is not None:
+            values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+            return tuple(((self._a_np * values + self._b_np) % self.PRIME).min(axis=1).tolist())
+        return tuple(min((a * h + b) % self.PRIME for h in hashes) for a, b in zip(self._a, self._b))
+
+    @staticmethod
+    def _jaccard(left, right):
+        union = len(left | right)
+        return len(left & right) / union if union else 0.0
+
+    def add(self, title, description=''):
+        """Index one anchor and return its id (ids are sequential from 0)"""
+        i = len(self._clusters)
+        title_words = self._title_words(title)
+        hashes = self._shingles(title_words, description)
+        if not hashes:
+            self._clusters.append(i)
+            return i
+
+        signature = self._signature(hashes)
+        keys = [hash((band,) + signature[band * self.rows:(band + 1) * self.rows]) for band in range(self.bands)]
+        title_key = ' '.join(sorted(title_words))
+        candidates = set(self._title_seeds.get(title_key, ()))
+        for key in keys:
+            candidates.update(self._buckets.get(key, ()))
+
+        best, best_score = None, self.threshold
+        for seed in candidates:
+            seed_title, seed_hashes = self._seeds[seed]
+            pair = (title_key, seed_title)
+            if pair not in self._title_matches:
+                # Strictly above: one swapped word in a short title ("Seine Food Crawl" vs
+                # "Louvre Food Crawl") lands exactly on 0.5
+                self._title_matches[pair] = self._jaccard(title_words, frozenset(seed_title.split())) > self.threshold
+            if not self._title_matches[pair]:
+                continue
+            score = self._jaccard(hashes, seed_hashes)
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = seed, score
+        if best is not None:
+            self._clusters.append(best)
+            return i
+
+        # No verified match: this anchor seeds a new cluster
+        self._clusters.append(i)
+        self._seeds[i] = (title_key, hashes)
+        seeds = self._title_seeds.setdefault(title_key, [])
+        if len(seeds) < self.max_representatives:
+            seeds.append(i)
+        for key in keys:
+            seeds = self._buckets.setdefault(key, [])
+            if len(seeds) < self.max_representatives:
+                seeds.append(i)
+        return i
+
+    def cluster_ids(self):
+        """Cluster id (the seed anchor's id) for every indexed anchor"""
+        return array('I', self._clusters)
+
+class Codebook:
+    """Dense integer codes for category values, in first-seen order"""
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self._codes
+
+class AnchorStore:
+    """Columnar, integer-coded storage for every anchor in a results set.
+
+    Each anchor is held once: its title, the index of the test result it came
+    from and its keyword hits (CSR-encoded keyword codes). Budget tier, vibes,
+    priorities, mobility and profile are coded per result, so an anchor's groups
+    are looked up through `anchor_result` instead of copying the anchor into
+    every group list. Group sizes and keyword counts are matrix products over
+    results when NumPy is installed, and plain loops over the same arrays when
+    it is not.
+    """
+
+    DIMENSIONS = ('budget', 'vibe', 'priority', 'mobility')
+
+    def __init__(self, matcher, near_duplicates=None):
+        self.matcher = matcher
+        self.near_duplicates = near_duplicates
+        self._cluster_ids = None
+        self.keywords = Codebook()
+        for keyword in matcher.keyword_order:
+            self.keywords.code(keyword)
+        self.profiles = Codebook()
+        self.codebooks = {dimension: Codebook() for dimension in self.DIMENSIONS}
+
+        self.titles = []
+        self.anchor_result = array('I')
+        self.keyword_codes = array('I')
+        self.keyword_offsets = array('Q', [0])
+        # Sparse document-term matrix over title words, CSR by anchor
+        self.terms = Codebook()
+        self.term_codes = array('I')
+        self.term_offsets = array('Q', [0])
+
+        self.result_profile = array('I')
+        self.result_codes = {dimension: array('I') for dimension in self.DIMENSIONS}
+        self.result_offsets = {dimension: array('Q', [0]) for dimension in self.DIMENSIONS}
+        self._aggregates = None
+        self._index = None
+
+    @property
+    def size(self):
+        return len(self.titles)
+
+    @property
+    def result_count(self):
+        return len(self.result_profile)
+
+    def add_result(self, result):
+        """Append one successful test result and its anchors"""
         anchors = result['outputAnchors']
-        input_data = result['inputData']
-        
-        # Extract key factors
-        budget = input_data['tripIntentData'].get('budget', 'unknown')
-        vibes = input_data['tripIntentData'].get('vibes', [])
-        priorities = input_data['tripIntentData'].get('priorities', [])
-        
+        intent = result['inputData']['tripIntentData']
+        r = self.result_count
+        self.result_profile.append(self.profiles.code(result['profileName']))
+
+        values = {
+            'budget': [budget_tier(intent.get('budget', 'unknown'))],
+            'vibe': intent.get('vibes', []),
+            'priority': intent.get('priorities', []),
+            'mobility': intent.get('mobility', [])
+        }
+        for dimension, dimension_values in values.items():
+            codebook = self.codebooks[dimension]
+            codes = self.result_codes[dimension]
+            for value in dimension_values:
+                codes.append(codebook.code(value))
+            self.result_offsets[dimension].append(len(codes))
+
         for anchor in anchors:
-            all_anchors.append(anchor)
-            
-            # Group by budget range
-            if '$30-50' in budget:
-                budget_anchors['budget'].append(anchor)
-            elif '$800-1200' in budget:
-                budget_anchors['luxury'].append(anchor)
-            elif '$200-350' in budget:
-                budget_anchors['mid-range'].append(anchor)
+            self.titles.append(anchor.get('title', ''))
+            self.anchor_result.append(r)
+            # Scan each description once; the description itself is not kept
+            for keyword in self.matcher.find(anchor.get('description', '')):
+                self.keyword_codes.append(self.keywords.code(keyword))
+            self.keyword_offsets.append(len(self.keyword_codes))
+            for word in re.findall(r'\b\w+\b', anchor.get('title', '').lower()):
+                self.term_codes.append(self.terms.code(word))
+            self.term_offsets.append(len(self.term_codes))
+            if self.near_duplicates is not None:
+                self.near_duplicates.add(anchor.get('title', ''), anchor.get('description', ''))
+        self._aggregates = None
+        self._cluster_ids = None
+        self._index = None
+
+    def _compute_aggregates(self):
+        """Per-result anchor counts, per-result keyword counts and per-dimension membership"""
+        R, K = self.result_count, len(self.keywords)
+        if np is not None:
+            anchor_result = np.frombuffer(self.anchor_result, dtype=np.uint32).astype(np.int64)
+            anchors_per_result = np.bincount(anchor_result, minlength=R)
+            hits_per_anchor = np.diff(np.frombuffer(self.keyword_offsets, dtype=np.uint64)).astype(np.int64)
+            hit_rows = np.repeat(anchor_result, hits_per_anchor)
+            hit_codes = np.frombuffer(self.keyword_codes, dtype=np.uint32).astype(np.int64)
+            result_keywords = np.bincount(hit_rows * K + hit_codes, minlength=R * K).reshape(R, K)
+            membership = {}
+            for dimension in self.DIMENSIONS:
+                V = len(self.codebooks[dimension])
+                per_result = np.diff(np.frombuffer(self.result_offsets[dimension], dtype=np.uint64)).astype(np.int64)
+                rows = np.repeat(np.arange(R), per_result)
+                codes = np.frombuffer(self.result_codes[dimension], dtype=np.uint32).astype(np.int64)
+                membership[dimension] = np.bincount(rows * V + codes, minlength=R * V).reshape(R, V)
+        else:
+            anchors_per_result = [0] * R
+            result_keywords = [Counter() for _ in range(R)]
+            offsets = self.keyword_offsets
+            for i, r in enumerate(self.anchor_result):
+                anchors_per_result[r] += 1
+                result_keywords[r].update(self.keyword_codes[offsets[i]:offsets[i + 1]])
+            membership = {}
+            for dimension in self.DIMENSIONS:
+                codes, dim_offsets = self.result_codes[dimension], self.result_offsets[dimension]
+                membership[dimension] = [codes[dim_offsets[r]:dim_offsets[r + 1]] for r in range(R)]
+        self._aggregates = (anchors_per_result, result_keywords, membership)
+        return self._aggregates
+
+    def group_summary(self, dimension):
+        """[(value, anchor count, {keyword: anchors containing it})] for every value of a dimension"""
+        anchors_per_result, result_keywords, membership = self._aggregates or self._compute_aggregates()
+        values = self.codebooks[dimension].values
+        keywords = self.keywords.values
+        if np is not None:
+            groups = membership[dimension].T
+            sizes = groups @ anchors_per_result
+            keyword_counts = groups @ result_keywords
+            return [
+                (value, int(sizes[v]), {keywords[k]: int(c) for k, c in enumerate(keyword_counts[v]) if c})
+                for v, value in enumerate(values)
+            ]
+        sizes = [0] * len(values)
+        keyword_counts = [Counter() for _ in values]
+        for r, codes in enumerate(membership[dimension]):
+            for v in codes:
+                sizes[v] += anchors_per_result[r]
+                keyword_counts[v].update(result_keywords[r])
+        return [
+            (value, sizes[v], {keywords[k]: c for k, c in keyword_counts[v].items()})
+            for v, value in enumerate(values)
+        ]
+
+    def group_indices(self, dimension, value):
+        """Anchor ids belonging to one dimension value, in insertion order"""
+        codebook = self.codebooks[dimension]
+        if value not in codebook:
+            return []
+        code = codebook.code(value)
+        if np is not None:
+            _, _, membership = self._aggregates or self._compute_aggregates()
+            in_group = membership[dimension][:, code] > 0
+            anchor_result = np.frombuffer(self.anchor_result, dtype=np.uint32)
+            return np.flatnonzero(in_group[anchor_result])
+        codes, offsets = self.result_codes[dimension], self.result_offsets[dimension]
+        in_group = {r for r in range(self.result_count) if code in codes[offsets[r]:offsets[r + 1]]}
+        return [i for i, r in enumerate(self.anchor_result) if r in in_group]
+
+    def sample_titles(self, dimension, value, limit=SAMPLE_TITLE_LIMIT):
+        return [self.titles[i] for i in self.group_indices(dimension, value)[:limit]]
+
+    def term_totals(self):
+        """Occurrences of every title term across all anchors, indexed by term code"""
+        if np is not None:
+            return np.bincount(np.frombuffer(self.term_codes, dtype=np.uint32), minlength=len(self.terms))
+        totals = [0] * len(self.terms)
+        for code in self.term_codes:
+            totals[code] += 1
+        return totals
+
+    def group_term_counts(self, dimension):
+        """Title-term occurrences per dimension value: a (values x terms) matrix, or a list of Counters without NumPy"""
+        V, T = len(self.codebooks[dimension]), len(self.terms)
+        codes, offsets = self.result_codes[dimension], self.result_offsets[dimension]
+        if np is not None:
+            anchor_result = np.frombuffer(self.anchor_result, dtype=np.uint32).astype(np.int64)
+            terms_per_anchor = np.diff(np.frombuffer(self.term_offsets, dtype=np.uint64)).astype(np.int64)
+            occurrence_result = np.repeat(anchor_result, terms_per_anchor)
+            occurrence_term = np.frombuffer(self.term_codes, dtype=np.uint32).astype(np.int64)
+
+            # Expand every term occurrence once per dimension value of its result
+            result_offsets = np.frombuffer(offsets, dtype=np.uint64).astype(np.int64)
+            values_per_occurrence = np.diff(result_offsets)[occurrence_result]
+            total = int(values_per_occurrence.sum())
+            run_starts = np.repeat(np.cumsum(values_per_occurrence) - values_per_occurrence, values_per_occurrence)
+            positions = np.repeat(result_offsets[occurrence_result], values_per_occurrence) + (np.arange(total) - run_starts)
+            values = np.frombuffer(codes, dtype=np.uint32).astype(np.int64)[positions]
+            terms = np.repeat(occurrence_term, values_per_occurrence)
+            return np.bincount(values * T + terms, minlength=V * T).reshape(V, T)
+
+        counts = [Counter() for _ in range(V)]
+        term_offsets = self.term_offsets
+        for i, r in enumerate(self.anchor_result):
+            anchor_terms = self.term_codes[term_offsets[i]:term_offsets[i + 1]]
+            for v in codes[offsets[r]:offsets[r + 1]]:
+                counts[v].update(anchor_terms)
+        return counts
+
+    @property
+    def index(self):
+        """Inverted dimension index over the current anchors, built on first use"""
+        if self._index is None:
+            self._index = AnchorIndex(self)
+        return self._index
+
+    @property
+    def cluster_ids(self):
+        if self.near_duplicates is None:
+            return None
+        if self._cluster_ids is None:
+            self._cluster_ids = self.near_duplicates.cluster_ids()
+        return self._cluster_ids
+
+    def cluster_diversity(self, dimension):
+        """[(value, anchor count, near-duplicate cluster count)] for every value of a dimension"""
+        cluster_ids = self.cluster_ids
+        rows = []
+        for value in self.codebooks[dimension].values:
+            indices = self.group_indices(dimension, value)
+            if np is not None:
+                clusters = np.unique(np.frombuffer(cluster_ids, dtype=np.uint32)[indices]).size
             else:
-                budget_anchors['other'].append(anchor)
-            
-            # Group by vibes
-            for vibe in vibes:
-                vibe_anchors[vibe].append(anchor)
-            
-            # Group by priorities
-            for priority in priorities:
-                priority_anchors[priority].append(anchor)
-    
-    print(f"📊 Total Anchors Analyzed: {len(all_anchors)}")
-    print(f"📊 Successful Tests: {len([r for r in results if r.get('success')])}")
+                clusters = len({cluster_ids[i] for i in indices})
+            rows.append((value, len(indices), clusters))
+        return rows
+
+class AnchorIndex:
+    """Inverted index from every dimension value to the anchors it covers.
+
+    Each value maps to a bitmap (a Python int, bit i = anchor id i) over the
+    store's anchors: budget tier, every vibe, priority and mobility option, the
+    profile name and every keyword hit. An ad-hoc slice such as
+    "luxury ∧ romantic ∧ walking" is then a handful of big-integer ANDs instead
+    of another pass over the results. Profiles have roughly one value per test,
+    so their bitmaps are built on demand from each result's anchor range rather
+    than kept for every profile.
+    """
+
+    DIMENSIONS = AnchorStore.DIMENSIONS + ('profile', 'keyword')
+    ALIASES = {'kw': 'keyword', 'tier': 'budget', 'vibes': 'vibe', 'priorities': 'priority'}
+
+    def __init__(self, store):
+        self.store = store
+        self.all = (1 << store.size) - 1
+        self.bitmaps = {dimension: {} for dimension in self.DIMENSIONS if dimension != 'profile'}
+
+        # Anchors of one result are contiguous: result r owns ids result_starts[r]..result_starts[r + 1] - 1
+        self.result_starts = array('Q', [0] * (store.result_count + 1))
+        for r in store.anchor_result:
+            self.result_starts[r + 1] += 1
+        for r in range(store.result_count):
+            self.result_starts[r + 1] += self.result_starts[r]
+        self.profile_results = defaultdict(list)
+        for r, code in enumerate(store.result_profile):
+            self.profile_results[store.profiles.values[code]].append(r)
+
+        codebooks = dict(store.codebooks)
+        result_codes = {dimension: (store.result_codes[dimension], store.result_offsets[dimension])
+                        for dimension in store.DIMENSIONS}
+        if np is not None:
+            anchors_per_result = np.diff(np.frombuffer(self.result_starts, dtype=np.int64))
+            for dimension, (codes, offsets) in result_codes.items():
+                self._fill_numpy(dimension, codebooks[dimension], codes, offsets, anchors_per_result)
+            self._fill_numpy('keyword', store.keywords, store.keyword_codes, store.keyword_offsets)
+            return
+
+        # Pure-Python path: set bits in one bytearray per value
+        members = {dimension: [bytearray((store.size + 7) // 8) for _ in codebooks[dimension].values]
+                   for dimension in codebooks}
+        members['keyword'] = [bytearray((store.size + 7) // 8) for _ in store.keywords.values]
+        keyword_offsets = store.keyword_offsets
+        for i, r in enumerate(store.anchor_result):
+            byte, bit = i >> 3, 1 << (i & 7)
+            for dimension, (codes, offsets) in result_codes.items():
+                dimension_members = members[dimension]
+                for v in codes[offsets[r]:offsets[r + 1]]:
+                    dimension_members[v][byte] |= bit
+            for k in store.keyword_codes[keyword_offsets[i]:keyword_offsets[i + 1]]:
+                members['keyword'][k][byte] |= bit
+        codebooks['keyword'] = store.keywords
+        for dimension, dimension_members in members.items():
+            for value, bits in zip(codebooks[dimension].values, dimension_members):
+                self.bitmaps[dimension][value] = int.from_bytes(bits, 'little')
+
+    def _fill_numpy(self, dimension, codebook, codes, offsets, anchors_per_result=None):
+        """
+        Bitmaps from a CSR layout (row r holds codes[offsets[r]:offsets[r + 1]]); rows are
+        results, expanded to their anchors with anchors_per_result, or anchors when it is None
+        """
+        codes = np.frombuffer(codes, dtype=np.uint32)
+        offsets = np.frombuffer(offsets, dtype=np.int64)
+        # One value at a time, so the transient is a pass over the codes plus one row mask
+        for v, value in enumerate(codebook.values):
+            rows = np.searchsorted(offsets, np.flatnonzero(codes == v), side='right') - 1
+            membership = np.zeros(len(offsets) - 1, dtype=bool)
+            membership[rows] = True
+            if anchors_per_result is not None:
+                membership = np.repeat(membership, anchors_per_result)
+            bits = np.packbits(membership, bitorder='little').tobytes()
+            self.bitmaps[dimension][value] = int.from_bytes(bits, 'little')
+
+    def values(self, dimension):
+        if dimension == 'profile':
+            return list(self.profile_results)
+        return list(self.bitmaps[dimension])
+
+    def bitmap(self, dimension, value):
+        if dimension != 'profile':
+            return self.bitmaps[dimension][value]
+        bits = bytearray((self.store.size + 7) // 8)
+        for r in self.profile_results[value]:
+            for i in range(self.result_starts[r], self.result_starts[r + 1]):
+                bits[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(bits, 'little')
+
+    def resolve(self, term):
+        """Bitmap for one query term: `[!]value` or `[!]dimension:value`.
+
+        Values match case-insensitively, exactly when possible and otherwise by
+        substring (every matching value is OR-ed). Bare values search budget,
+        vibe, priority and mobility; profile and keyword need their prefix.
+        Returns (bitmap, [(dimension, value)]) and raises ValueError on no match.
+        """
+        term = term.strip()
+        negate = term.startswith('!')
+        if negate:
+            term = term[1:].strip()
+        dimension, separator, value = term.partition(':')
+        if not separator:
+            dimension, value = '', term
+        dimension = self.ALIASES.get(dimension.strip().lower(), dimension.strip().lower())
+        if dimension and dimension not in self.DIMENSIONS:
+            raise ValueError(f"unknown dimension '{dimension}' (use one of: {', '.join(self.DIMENSIONS)})")
+        dimensions = [dimension] if dimension else AnchorStore.DIMENSIONS
+        needle = value.strip().lower()
+
+        matches = [(d, v) for d in dimensions for v in self.values(d) if v.lower() == needle]
+        if not matches:
+            matches = [(d, v) for d in dimensions for v in self.values(d) if needle in v.lower()]
+        if not needle or not matches:
+            raise ValueError(f"no {dimension or 'budget/vibe/priority/mobility'} value matches '{value.strip()}'")
+
+        bitmap = 0
+        for d, v in matches:
+            bitmap |= self.bitmap(d, v)
+        return (self.all & ~bitmap if negate else bitmap), matches
+
+    def query(self, expression):
+        """Intersect every term of an expression separated by '∧', '&&' or ','"""
+        bitmap = self.all
+        resolved = []
+        for term in re.split(r'∧|&&|,', expression):
+            if not term.strip():
+                continue
+            term_bitmap, matches = self.resolve(term)
+            bitmap &= term_bitmap
+            resolved.append((term.strip(), matches))
+        return bitmap, resolved
+
+    @staticmethod
+    def ids(bitmap, limit=None):
+        """Anchor ids set in a bitmap, lowest first"""
+        ids = []
+        while bitmap and (limit is None or len(ids) < limit):
+            low = bitmap & -bitmap
+            ids.append(low.bit_length() - 1)
+            bitmap ^= low
+        return ids
+
+def distinctive_terms(store, dimension, top_n=5, min_length=4):
+    """Top title terms per dimension value by weighted log-odds against every other anchor.
+
+    Uses the informative-Dirichlet-prior log-odds ratio (Monroe et al. 2008):
+    the prior is a scaled copy of the corpus counts, and the z-score divides
+    the log-odds difference by its approximate standard deviation. All values
+    of a dimension are scored in one batch of matrix operations.
+    Returns [(value, [(term, z, count)])].
+    """
+    terms = store.terms.values
+    totals = store.term_totals()
+    group_counts = store.group_term_counts(dimension)
+    values = store.codebooks[dimension].values
+    keep = [len(term) >= min_length for term in terms]
+
+    if np is not None:
+        totals = totals.astype(np.float64)
+        counts = group_counts.astype(np.float64)
+        alpha = totals * TERM_PRIOR_SCALE + TERM_PRIOR_FLOOR
+        alpha0 = alpha.sum()
+        n_total = totals.sum()
+        n_group = counts.sum(axis=1, keepdims=True)
+        rest = np.maximum(totals - counts, 0.0)
+        n_rest = np.maximum(n_total - n_group, 0.0)
+        delta = (np.log((counts + alpha) / (n_group + alpha0 - counts - alpha))
+                 - np.log((rest + alpha) / (n_rest + alpha0 - rest - alpha)))
+        z = delta / np.sqrt(1.0 / (counts + alpha) + 1.0 / (rest + alpha))
+        z[:, ~np.array(keep, dtype=bool)] = -np.inf
+        z[counts == 0] = -np.inf
+        rows = []
+        for v, value in enumerate(values):
+            order = np.argsort(-z[v], kind='stable')[:top_n]
+            rows.append((value, [(terms[t], float(z[v, t]), int(counts[v, t])) for t in order if np.isfinite(z[v, t])]))
+        return rows
+
+    alpha = [total * TERM_PRIOR_SCALE + TERM_PRIOR_FLOOR for total in totals]
+    alpha0 = sum(alpha)
+    n_total = sum(totals)
+    rows = []
+    for value, counts in zip(values, group_counts):
+        n_group = sum(counts.values())
+        n_rest = max(n_total - n_group, 0)
+        scored = []
+        for t, count in counts.items():
+            if not keep[t]:
+                continue
+            a = alpha[t]
+            rest = max(totals[t] - count, 0)
+            delta = (math.log((count + a) / (n_group + alpha0 - count - a))
+                     - math.log((rest + a) / (n_rest + alpha0 - rest - a)))
+            scored.append((-(delta / math.sqrt(1 / (count + a) + 1 / (rest + a))), t, count))
+        scored.sort()
+        rows.append((value, [(terms[t], -neg_z, count) for neg_z, t, count in scored[:top_n]]))
+    return rows
+
+def print_term_stage(stage_result):
+    print("\n🧪 DISTINCTIVE TITLE TERMS (weighted log-odds z-score)")
+    print("=" * 50)
     
+    for dimension, label in (('budget', 'BUDGET'), ('vibe', 'VIBE'), ('priority', 'PRIORITY'), ('mobility', 'MOBILITY')):
+        print(f"\n{label}:")
+        for group in stage_result['dimensions'].get(dimension, []):
+            if not group['terms']:
+                continue
+            formatted = ', '.join(f"{t['term']} ({t['z']:+.1f}, n={t['count']})" for t in group['terms'])
+            print(f"  {group['name']}: {formatted}")
+
+def analyze_term_distinctiveness(analysis_data, top_n=5):
+    """Show which title terms each budget, vibe, priority and mobility group over-uses"""
+    store = analysis_data['store']
+    stage_result = {'stage': 'term_stats', 'dimensions': {}}
+    for dimension in AnchorStore.DIMENSIONS:
+        stage_result['dimensions'][dimension] = [
+            {'name': value, 'terms': [{'term': term, 'z': round(z, 3), 'count': count} for term, z, count in top_terms]}
+            for value, top_terms in distinctive_terms(store, dimension, top_n)
+        ]
+    print_term_stage(stage_result)
+    return stage_result
+
+def run_query(store, expression, sample_limit=SAMPLE_TITLE_LIMIT):
+    """Answer one ad-hoc slice such as 'luxury ∧ romantic ∧ walking' from the inverted index"""
+    index = store.index
+    start = time.perf_counter()
+    bitmap, resolved = index.query(expression)
+    anchors = bitmap.bit_count()
+    elapsed = time.perf_counter() - start
     return {
-        'all_anchors': all_anchors,
-        'budget_anchors': budget_anchors,
-        'vibe_anchors': vibe_anchors,
-        'priority_anchors': priority_anchors
+        'query': expression,
+        'terms': [{'term': term, 'matches': [f"{d}:{v}" for d, v in matches]} for term, matches in resolved],
+        'anchors': anchors,
+        'share': anchors / store.size * 100 if store.size else 0.0,
+        'microseconds': elapsed * 1e6,
+        'sample_titles': [store.titles[i] for i in index.ids(bitmap, sample_limit)]
     }
 
-def analyze_budget_impact(analysis_data):
-    """Analyze how budget affects anchor suggestions"""
-    print("\n💰 BUDGET IMPACT ANALYSIS")
+def print_query(query_result):
+    print(f"\n🔎 {query_result['query']}")
+    for term in query_result['terms']:
+        print(f"  {term['term']} → {', '.join(term['matches'])}")
+    print(f"  {query_result['anchors']} anchors ({query_result['share']:.1f}%) in {query_result['microseconds']:.0f} µs")
+    for i, title in enumerate(query_result['sample_titles']):
+        print(f"    {i+1}. {title}")
+
+def print_queries_stage(stage_result):
+    print("\n🔎 ANCHOR QUERIES")
     print("=" * 50)
+    for query_result in stage_result['queries']:
+        print_query(query_result)
+    for failed in stage_result.get('errors', []):
+        print(f"\n❌ {failed['query']}: {failed['error']}")
+
+def analyze_queries(analysis_data, expressions):
+    """Run each --query expression against the store's inverted index"""
+    stage_result = {'stage': 'queries', 'queries': [], 'errors': []}
+    for expression in expressions:
+        try:
+            stage_result['queries'].append(run_query(analysis_data['store'], expression))
+        except ValueError as e:
+            stage_result['errors'].append({'query': expression, 'error': str(e)})
+    print_queries_stage(stage_result)
+    return stage_result
+
+def interactive_query(analysis_data):
+    """Prompt for slices until a blank line, 'quit' or EOF; '?' lists the indexed values"""
+    store = analysis_data['store']
+    index = store.index
+    print("\n🔎 INTERACTIVE ANCHOR QUERIES")
+    print("=" * 50)
+    print("Combine terms with '∧', '&&' or ',' - e.g. luxury ∧ romantic ∧ walking")
+    print("Prefix a term with 'dimension:' to pick budget, vibe, priority, mobility, profile or keyword, '!' to exclude it")
+    while True:
+        try:
+            expression = input("\nquery> ").strip()
+        except EOFError:
+            break
+        if expression.lower() in ('', 'quit', 'exit'):
+            break
+        if expression == '?':
+            for dimension in AnchorIndex.DIMENSIONS:
+                values = index.values(dimension)
+                shown = ', '.join(values[:12]) + (f" ... (+{len(values) - 12})" if len(values) > 12 else "")
+                print(f"  {dimension}: {shown}")
+            continue
+        try:
+            print_query(run_query(store, expression))
+        except ValueError as e:
+            print(f"❌ {e}")
+
+def build_anchor_store(results, matcher=None, near_duplicates=False):
+    store = AnchorStore(matcher or DEFAULT_MATCHER, NearDuplicateIndex() if near_duplicates else None)
+    for result in results:
+        if result.get('success') and result.get('outputAnchors'):
+            store.add_result(result)
+    return store
+
+def analyze_anchor_patterns(results, matcher=None, near_duplicates=False):
+    """Analyze patterns in anchor suggestions"""
+    store = build_anchor_store(results, matcher, near_duplicates)
+    stage_result = {
+        'stage': 'anchor_patterns',
+        'total_anchors': store.size,
+        'successful_tests': len([r for r in results if r.get('success')])
+    }
+    print_anchor_patterns_stage(stage_result)
     
-    budget_anchors = analysis_data['budget_anchors']
+    return {
+        'store': store,
+        'matcher': store.matcher,
+        'stage_result': stage_result
+    }
+
+def print_anchor_patterns_stage(stage_result):
+    print("🔍 ANALYZING ANCHOR PATTERNS")
+    print("=" * 50)
+    print(f"📊 Total Anchors Analyzed: {stage_result['total_anchors']}")
+    print(f"📊 Successful Tests: {stage_result['successful_tests']}")
+
+# stage name -> (dimension, keyword table, section heading, group label, keyword heading, show sample titles)
+GROUP_STAGES = {
+    'budget_impact': ('budget', 'budget', "💰 BUDGET IMPACT ANALYSIS", 'BUDGET', 'Budget', True),
+    'vibe_impact': ('vibe', 'vibe', "🎭 VIBE IMPACT ANALYSIS", 'VIBE', 'Vibe', True),
+    'priority_impact': ('priority', 'priority', "🎯 PRIORITY IMPACT ANALYSIS", 'PRIORITY', 'Priority', True),
+    'mobility_impact': ('mobility', 'transport', "🚶 MOBILITY IMPACT ANALYSIS", 'MOBILITY', 'Transportation', False)
+}
+
+def print_group_stage(stage_result):
+    """Print one impact section from its structured stage result"""
+    _, _, heading, label, keyword_heading, show_samples = GROUP_STAGES[stage_result['stage']]
+    print(f"\n{heading}")
+    print("=" * 50)
     
-    for budget_level, anchors in budget_anchors.items():
-        if not anchors:
-            continue
-            
-        print(f"\n{budget_level.upper()} BUDGET ({len(anchors)} anchors):")
+    for group in stage_result['groups']:
+        print(f"\n{group['name'].upper()} {label} ({group['anchors']} anchors):")
         
-        # Analyze common themes
-        titles = [anchor.get('title', '') for anchor in anchors]
-        descriptions = [anchor.get('description', '') for anchor in anchors]
+        print(f"  {keyword_heading} Keywords Found:")
+        for keyword, count in group['keywords'].items():
+            print(f"    {keyword}: {count}")
         
-        # Look for budget indicators in descriptions
-        budget_keywords = {
-            'free': 0, 'cheap': 0, 'affordable': 0, 'budget': 0,
-            'luxury': 0, 'upscale': 0, 'premium': 0, 'expensive': 0,
-            'guided': 0, 'private': 0, 'exclusive': 0
+        if show_samples:
+            # Show sample titles
+            print("  Sample Titles:")
+            for i, title in enumerate(group['sample_titles']):
+                print(f"    {i+1}. {title}")
+
+def _store_group_stage(store, stage):
+    """Build a group stage result straight from the columnar store"""
+    dimension, table_name, _, _, _, show_samples = GROUP_STAGES[stage]
+    table = store.matcher.tables[table_name]
+    groups = []
+    for value, size, keyword_counts in store.group_summary(dimension):
+        if not size:
+            continue
+        group = {
+            'name': value,
+            'anchors': size,
+            'keywords': {kw: keyword_counts[kw] for kw in table if keyword_counts.get(kw, 0) > 0}
         }
-        
-        for desc in descriptions:
-            desc_lower = desc.lower()
-            for keyword in budget_keywords:
-                if keyword in desc_lower:
-                    budget_keywords[keyword] += 1
-        
-        print("  Budget Keywords Found:")
-        for keyword, count in budget_keywords.items():
-            if count > 0:
-                print(f"    {keyword}: {count}")
-        
-        # Show sample titles
-        print("  Sample Titles:")
-        for i, title in enumerate(titles[:3]):
-            print(f"    {i+1}. {title}")
+        if show_samples:
+            group['sample_titles'] = store.sample_titles(dimension, value)
+        groups.append(group)
+    stage_result = {'stage': stage, 'dimension': dimension, 'groups': groups}
+    print_group_stage(stage_result)
+    return stage_result
+
+def analyze_budget_impact(analysis_data):
+    """Analyze how budget affects anchor suggestions"""
+    return _store_group_stage(analysis_data['store'], 'budget_impact')
 
 def analyze_vibe_impact(analysis_data):
     """Analyze how vibes affect anchor suggestions"""
-    print("\n🎭 VIBE IMPACT ANALYSIS")
-    print("=" * 50)
-    
-    vibe_anchors = analysis_data['vibe_anchors']
-    
-    for vibe, anchors in vibe_anchors.items():
-        if not anchors:
-            continue
-            
-        print(f"\n{vibe.upper()} VIBE ({len(anchors)} anchors):")
-        
-        # Analyze common themes
-        titles = [anchor.get('title', '') for anchor in anchors]
-        descriptions = [anchor.get('description', '') for anchor in anchors]
-        
-        # Look for vibe indicators
-        vibe_keywords = {
-            'romantic': 0, 'intimate': 0, 'chill': 0, 'relaxed': 0,
-            'adventure': 0, 'active': 0, 'fun': 0, 'social': 0,
-            'luxurious': 0, 'upscale': 0, 'authentic': 0, 'local': 0
-        }
-        
-        for desc in descriptions:
-            desc_lower = desc.lower()
-            for keyword in vibe_keywords:
-                if keyword in desc_lower:
-                    vibe_keywords[keyword] += 1
-        
-        print("  Vibe Keywords Found:")
-        for keyword, count in vibe_keywords.items():
-            if count > 0:
-                print(f"    {keyword}: {count}")
-        
-        # Show sample titles
-        print("  Sample Titles:")
-        for i, title in enumerate(titles[:3]):
-            print(f"    {i+1}. {title}")
+    return _store_group_stage(analysis_data['store'], 'vibe_impact')
 
 def analyze_priority_impact(analysis_data):
     """Analyze how priorities affect anchor suggestions"""
-    print("\n🎯 PRIORITY IMPACT ANALYSIS")
-    print("=" * 50)
-    
-    priority_anchors = analysis_data['priority_anchors']
-    
-    for priority, anchors in priority_anchors.items():
-        if not anchors:
-            continue
-            
-        print(f"\n{priority.upper()} PRIORITY ({len(anchors)} anchors):")
-        
-        # Analyze common themes
-        titles = [anchor.get('title', '') for anchor in anchors]
-        descriptions = [anchor.get('description', '') for anchor in anchors]
-        
-        # Look for priority-specific keywords
-        priority_keywords = {
-            'culture': 0, 'history': 0, 'museum': 0, 'art': 0,
-            'food': 0, 'dining': 0, 'restaurant': 0, 'culinary': 0,
-            'adventure': 0, 'outdoor': 0, 'hiking': 0, 'active': 0,
-            'relaxation': 0, 'wellness': 0, 'spa': 0, 'chill': 0,
-            'shopping': 0, 'market': 0, 'boutique': 0, 'fashion': 0,
-            'nightlife': 0, 'bar': 0, 'club': 0, 'entertainment': 0
-        }
-        
-        for desc in descriptions:
-            desc_lower = desc.lower()
-            for keyword in priority_keywords:
-                if keyword in desc_lower:
-                    priority_keywords[keyword] += 1
-        
-        print("  Priority Keywords Found:")
-        for keyword, count in priority_keywords.items():
-            if count > 0:
-                print(f"    {keyword}: {count}")
-        
-        # Show sample titles
-        print("  Sample Titles:")
-        for i, title in enumerate(titles[:3]):
-            print(f"    {i+1}. {title}")
+    return _store_group_stage(analysis_data['store'], 'priority_impact')
 
-def analyze_mobility_impact(results):
+def analyze_mobility_impact(results, analysis_data=None):
     """Analyze how mobility preferences affect suggestions"""
-    print("\n🚶 MOBILITY IMPACT ANALYSIS")
+    store = analysis_data['store'] if analysis_data else build_anchor_store(results)
+    return _store_group_stage(store, 'mobility_impact')
+
+def print_recommendations_stage(stage_result):
+    print("\n💡 RECOMMENDATIONS")
     print("=" * 50)
     
-    mobility_groups = defaultdict(list)
+    total, successful = stage_result['total_tests'], stage_result['successful_tests']
+    if total:
+        print(f"✅ Success Rate: {successful}/{total} ({stage_result['success_rate']:.1f}%)")
     
-    for result in results:
-        if not result.get('success') or not result.get('outputAnchors'):
-            continue
-            
-        mobility = result['inputData']['tripIntentData'].get('mobility', [])
-        anchors = result['outputAnchors']
-        
-        for mob in mobility:
-            mobility_groups[mob].extend(anchors)
+    if stage_result['failed_tests']:
+        print(f"❌ Failed Tests: {stage_result['failed_tests']}")
+        for failure in stage_result['failures']:
+            print(f"    - {failure['profile']}: {failure['error']}")
+        if stage_result['failed_tests'] > len(stage_result['failures']):
+            print(f"    ... and {stage_result['failed_tests'] - len(stage_result['failures'])} more")
     
-    for mobility, anchors in mobility_groups.items():
-        if not anchors:
-            continue
-            
-        print(f"\n{mobility.upper()} MOBILITY ({len(anchors)} anchors):")
-        
-        # Look for transportation keywords
-        transport_keywords = {
-            'walking': 0, 'walk': 0, 'stroll': 0, 'pedestrian': 0,
-            'metro': 0, 'subway': 0, 'train': 0, 'transport': 0,
-            'taxi': 0, 'uber': 0, 'car': 0, 'drive': 0,
-            'bike': 0, 'cycling': 0, 'accessible': 0
-        }
-        
-        for anchor in anchors:
-            desc = anchor.get('description', '').lower()
-            for keyword in transport_keywords:
-                if keyword in desc:
-                    transport_keywords[keyword] += 1
+    approx = "" if stage_result['unique_exact'] else "~"
+    print(f"\n📊 Anchor Diversity:")
+    print(f"    Total Anchors: {stage_result['total_anchors']}")
+    print(f"    Unique Anchors: {approx}{stage_result['unique_anchors']}")
+    if stage_result['total_anchors']:
+        print(f"    Diversity Rate: {approx}{stage_result['diversity_rate']:.1f}%")
+    
+    if stage_result.get('near_duplicate_clusters') is not None:
+        print(f"    Near-Duplicate Clusters: {stage_result['near_duplicate_clusters']}")
+        print(f"    Cluster Diversity Rate: {stage_result['cluster_diversity_rate']:.1f}%")
         
-        print("  Transportation Keywords Found:")
-        for keyword, count in transport_keywords.items():
-            if count > 0:
-                print(f"    {keyword}: {count}")
+        print(f"\n📊 Cluster Diversity by Segment:")
+        for dimension, label in (('budget', 'Budget'), ('vibe', 'Vibe'), ('priority', 'Priority')):
+            print(f"    {label}:")
+            for segment in stage_result['cluster_diversity'][dimension]:
+                print(f"        {segment['name']}: {segment['clusters']}/{segment['anchors']} clusters "
+                      f"({segment['clusters']/segment['anchors']*100:.1f}%)")
+    
+    # Check for common patterns
+    print(f"\n🔍 Common Patterns:")
+    print("    Most Common Words in Titles:")
+    for entry in stage_result['common_words']:
+        if len(entry['word']) > 3:  # Skip short words
+            print(f"        {entry['word']}: {entry['count']}")
 
 def generate_recommendations(analysis_data, results):
     """Generate recommendations based on analysis"""
-    print("\n💡 RECOMMENDATIONS")
-    print("=" * 50)
-    
     successful_tests = [r for r in results if r.get('success')]
     failed_tests = [r for r in results if not r.get('success')]
     
-    print(f"✅ Success Rate: {len(successful_tests)}/{len(results)} ({len(successful_tests)/len(results)*100:.1f}%)")
-    
-    if failed_tests:
-        print(f"❌ Failed Tests: {len(failed_tests)}")
-        for test in failed_tests:
-            print(f"    - {test['profileName']}: {test.get('error', 'Unknown error')}")
-    
     # Analyze anchor diversity
-    all_titles = [anchor.get('title', '') for anchor in analysis_data['all_anchors']]
-    unique_titles = set(all_titles)
-    
-    print(f"\n📊 Anchor Diversity:")
-    print(f"    Total Anchors: {len(all_titles)}")
-    print(f"    Unique Anchors: {len(unique_titles)}")
-    print(f"    Diversity Rate: {len(unique_titles)/len(all_titles)*100:.1f}%")
+    store = analysis_data['store']
+    all_titles = store.titles
+    unique_titles = len(set(all_titles))
     
-    # Check for common patterns
-    print(f"\n🔍 Common Patterns:")
+    # Most common words in titles, from the store's document-term matrix
+    totals = store.term_totals()
+    order = sorted(range(len(totals)), key=lambda t: -totals[t])[:10]
     
-    # Most common words in titles
-    all_words = []
-    for title in all_titles:
-        words = re.findall(r'\b\w+\b', title.lower())
-        all_words.extend(words)
+    stage_result = {
+        'stage': 'recommendations',
+        'total_tests': len(results),
+        'successful_tests': len(successful_tests),
+        'failed_tests': len(failed_tests),
+        'success_rate': len(successful_tests) / len(results) * 100 if results else 0.0,
+        'failures': [{'profile': t['profileName'], 'error': t.get('error', 'Unknown error')} for t in failed_tests],
+        'total_anchors': len(all_titles),
+        'unique_anchors': unique_titles,
+        'unique_exact': True,
+        'diversity_rate': unique_titles / len(all_titles) * 100 if all_titles else 0.0,
+        'common_words': [{'word': store.terms.values[t], 'count': int(totals[t])} for t in order]
+    }
     
-    word_counts = Counter(all_words)
-    common_words = word_counts.most_common(10)
+    if store.cluster_ids is not None:
+        clusters = len(set(store.cluster_ids))
+        stage_result['near_duplicate_clusters'] = clusters
+        stage_result['cluster_diversity_rate'] = clusters / len(all_titles) * 100 if all_titles else 0.0
+        stage_result['cluster_diversity'] = {
+            dimension: [
+                {'name': value, 'anchors': size, 'clusters': clusters}
+                for value, size, clusters in store.cluster_diversity(dimension) if size
+            ]
+            for dimension in ('budget', 'vibe', 'priority')
+        }
     
-    print("    Most Common Words in Titles:")
-    for word, count in common_words:
-        if len(word) > 3:  # Skip short words
-            print(f"        {word}: {count}")
+    print_recommendations_stage(stage_result)
+    return stage_result
+
+class DistinctSketch:
+    """K-minimum-values distinct counter - exact until `size` distinct values, bounded memory after that"""
+
+    def __init__(self, size=DISTINCT_SKETCH_SIZE):
+        self.size = size
+        self._heap = []  # negated hashes, so the largest kept hash sits at the top
+        self._members = set()
+
+    def add(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        h = int.from_bytes(digest, 'big')
+        if h in self._members:
+            return
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, -h)
+            self._members.add(h)
+        elif h < -self._heap[0]:
+            evicted = -heapq.heapreplace(self._heap, -h)
+            self._members.discard(evicted)
+            self._members.add(h)
+
+    @property
+    def exact(self):
+        return len(self._heap) < self.size
+
+    @classmethod
+    def from_hashes(cls, size, hashes):
+        sketch = cls(size)
+        sketch._heap = [-h for h in hashes]
+        heapq.heapify(sketch._heap)
+        sketch._members = set(hashes)
+        return sketch
+
+    def merge(self, other):
+        """Fold another sketch of the same size into this one (union of the underlying sets)"""
+        for h in other._members:
+            if h in self._members:
+                continue
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, -h)
+                self._members.add(h)
+            elif h < -self._heap[0]:
+                evicted = -heapq.heapreplace(self._heap, -h)
+                self._members.discard(evicted)
+                self._members.add(h)
+
+    def estimate(self):
+        if self.exact:
+            return len(self._heap)
+        kth_smallest = -self._heap[0]
+        return int((self.size - 1) * (1 << 64) / (kth_smallest + 1))
+
+def _prune_words(words, limit=TITLE_WORD_LIMIT):
+    """Keep the `limit` most frequent title words once the counter holds twice that many"""
+    if len(words) > 2 * limit:
+        kept = words.most_common(limit)
+        words.clear()
+        words.update(dict(kept))
+    return words
+
+def _new_group():
+    return {'count': 0, 'keywords': Counter(), 'sample_titles': []}
+
+def _add_to_group(group, title, keyword_hits):
+    group['count'] += 1
+    group['keywords'].update(keyword_hits)
+    if len(group['sample_titles']) < SAMPLE_TITLE_LIMIT:
+        group['sample_titles'].append(title)
+
+def stream_analyze(filename, matcher=None):
+    """Build every analysis aggregate in a single pass over the results file"""
+    matcher = matcher or DEFAULT_MATCHER
+    summary = {
+        'total_tests': 0,
+        'successful_tests': 0,
+        'failed_tests': 0,
+        'failures': [],
+        'total_anchors': 0,
+        'budget': defaultdict(_new_group),
+        'vibe': defaultdict(_new_group),
+        'priority': defaultdict(_new_group),
+        'mobility': defaultdict(_new_group),
+        'distinct_titles': DistinctSketch(),
+        'title_words': Counter(),
+        'keyword_tables': matcher.tables
+    }
+
+    for result in iter_test_results(filename):
+        summary['total_tests'] += 1
+        if not result.get('success'):
+            summary['failed_tests'] += 1
+            if len(summary['failures']) < FAILED_TEST_LIMIT:
+                summary['failures'].append((result.get('profileName', 'unknown'), result.get('error', 'Unknown error')))
+            continue
+        summary['successful_tests'] += 1
+
+        anchors = result.get('outputAnchors')
+        if not anchors:
+            continue
+
+        intent = result['inputData']['tripIntentData']
+        tier = budget_tier(intent.get('budget', 'unknown'))
+        vibes = intent.get('vibes', [])
+        priorities = intent.get('priorities', [])
+        mobility = intent.get('mobility', [])
+
+        for anchor in anchors:
+            summary['total_anchors'] += 1
+            title = anchor.get('title', '')
+            description = anchor.get('description', '')
+
+            # Keyword hits are computed once per anchor, then shared by every group it belongs to
+            hits = matcher.scan(description)
+
+            _add_to_group(summary['budget'][tier], title, hits.get('budget', ()))
+            for vibe in vibes:
+                _add_to_group(summary['vibe'][vibe], title, hits.get('vibe', ()))
+            for priority in priorities:
+                _add_to_group(summary['priority'][priority], title, hits.get('priority', ()))
+            for mob in mobility:
+                _add_to_group(summary['mobility'][mob], title, hits.get('transport', ()))
+
+            summary['distinct_titles'].add(title)
+            summary['title_words'].update(re.findall(r'\b\w+\b', title.lower()))
+            _prune_words(summary['title_words'])
+
+    return summary
+
+def _merge_groups(target, source):
+    for name, group in source.items():
+        merged = target[name]
+        merged['count'] += group['count']
+        merged['keywords'].update(group['keywords'])
+        room = SAMPLE_TITLE_LIMIT - len(merged['sample_titles'])
+        if room > 0:
+            merged['sample_titles'].extend(group['sample_titles'][:room])
+
+def merge_summaries(summaries):
+    """Combine per-file stream_analyze summaries into one summary covering all of them"""
+    combined = None
+    for summary in summaries:
+        if combined is None:
+            combined = {
+                'total_tests': 0,
+                'successful_tests': 0,
+                'failed_tests': 0,
+                'failures': [],
+                'total_anchors': 0,
+                'budget': defaultdict(_new_group),
+                'vibe': defaultdict(_new_group),
+                'priority': defaultdict(_new_group),
+                'mobility': defaultdict(_new_group),
+                'distinct_titles': DistinctSketch(summary['distinct_titles'].size),
+                'title_words': Counter(),
+                'keyword_tables': summary['keyword_tables']
+            }
+        for key in ('total_tests', 'successful_tests', 'failed_tests', 'total_anchors'):
+            combined[key] += summary[key]
+        room = FAILED_TEST_LIMIT - len(combined['failures'])
+        if room > 0:
+            combined['failures'].extend(summary['failures'][:room])
+        for dimension in ('budget', 'vibe', 'priority', 'mobility'):
+            _merge_groups(combined[dimension], summary[dimension])
+        combined['distinct_titles'].merge(summary['distinct_titles'])
+        combined['title_words'].update(summary['title_words'])
+        _prune_words(combined['title_words'])
+    return combined
+
+def summary_to_dict(summary):
+    """JSON-safe form of a stream_analyze summary"""
+    data = {key: summary[key] for key in ('total_tests', 'successful_tests', 'failed_tests', 'total_anchors', 'keyword_tables')}
+    data['failures'] = [list(failure) for failure in summary['failures']]
+    for dimension in ('budget', 'vibe', 'priority', 'mobility'):
+        data[dimension] = {
+            name: {'count': group['count'], 'keywords': dict(group['keywords']), 'sample_titles': group['sample_titles']}
+            for name, group in summary[dimension].items()
+        }
+    sketch = summary['distinct_titles']
+    data['distinct_titles'] = {'size': sketch.size, 'hashes': sorted(sketch._members)}
+    data['title_words'] = dict(summary['title_words'])
+    return data
+
+def summary_from_dict(data):
+    """Inverse of summary_to_dict"""
+    summary = {key: data[key] for key in ('total_tests', 'successful_tests', 'failed_tests', 'total_anchors', 'keyword_tables')}
+    summary['failures'] = [tuple(failure) for failure in data['failures']]
+    for dimension in ('budget', 'vibe', 'priority', 'mobility'):
+        groups = defaultdict(_new_group)
+        for name, group in data[dimension].items():
+            groups[name] = {'count': group['count'], 'keywords': Counter(group['keywords']), 'sample_titles': group['sample_titles']}
+        summary[dimension] = groups
+    sketch = data['distinct_titles']
+    summary['distinct_titles'] = DistinctSketch.from_hashes(sketch['size'], sketch['hashes'])
+    summary['title_words'] = _prune_words(Counter(data['title_words']))
+    return summary
+
+class AnalysisCache:
+    """On-disk per-file summaries keyed by file content hash, analyzer version and keyword config.
+
+    index.json remembers (size, mtime) -> sha256 per path so unchanged files
+    are not even re-hashed on the next run.
+    """
+
+    def __init__(self, cache_dir, matcher):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        config = json.dumps({
+            'version': ANALYZER_VERSION,
+            'tables': matcher.tables,
+            'word_boundary': matcher.word_boundary,
+            'sketch_size': DISTINCT_SKETCH_SIZE
+        }, sort_keys=True)
+        self.config_key = hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+        self._index_path = os.path.join(cache_dir, 'index.json')
+        try:
+            with open(self._index_path, 'r') as f:
+                self._index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._index = {}
+
+    def content_hash(self, filename):
+        stat = os.stat(filename)
+        path = os.path.abspath(filename)
+        entry = self._index.get(path)
+        if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            return entry['sha256']
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+                digest.update(block)
+        self._index[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def _entry_path(self, content_hash):
+        return os.path.join(self.cache_dir, f"{content_hash}-{self.config_key}.json")
+
+    def get(self, content_hash):
+        try:
+            with open(self._entry_path(content_hash), 'r') as f:
+                return summary_from_dict(json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(self, content_hash, summary):
+        self._write_json(self._entry_path(content_hash), summary_to_dict(summary))
+
+    def save_index(self):
+        self._write_json(self._index_path, self._index)
+
+    def _write_json(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+def _analyze_file_worker(filename, tables, word_boundary):
+    """Process-pool entry point - each worker builds its own matcher and streams one file"""
+    return stream_analyze(filename, KeywordMatcher(tables, word_boundary=word_boundary))
+
+def analyze_files_parallel(filenames, matcher=None, workers=None, cache_dir=None):
+    """Stream every file in a process pool; returns ([(filename, summary)], combined summary).
+
+    With cache_dir set, only files whose content is not already cached are analyzed.
+    """
+    matcher = matcher or DEFAULT_MATCHER
+    workers = workers or os.cpu_count() or 1
+    cache = AnalysisCache(cache_dir, matcher) if cache_dir else None
+
+    summaries = {}
+    hashes = {}
+    if cache:
+        for filename in filenames:
+            hashes[filename] = cache.content_hash(filename)
+            cached = cache.get(hashes[filename])
+            if cached is not None:
+                summaries[filename] = cached
+    pending = [f for f in filenames if f not in summaries]
+
+    if pending:
+        args = ([matcher.tables] * len(pending), [matcher.word_boundary] * len(pending))
+        if workers == 1 or len(pending) == 1:
+            computed = list(map(_analyze_file_worker, pending, *args))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as executor:
+                computed = list(executor.map(_analyze_file_worker, pending, *args))
+        for filename, summary in zip(pending, computed):
+            summaries[filename] = summary
+            if cache:
+                cache.put(hashes[filename], summary)
+
+    if cache:
+        cache.save_index()
+        print(f"🗄️  Cache: {len(filenames) - len(pending)} reused, {len(pending)} analyzed")
+
+    per_file = [(filename, summaries[filename]) for filename in filenames]
+    return per_file, merge_summaries(summaries[filename] for filename in filenames)
+
+def per_file_rows(per_file):
+    """Structured per-file results for the multi-file report"""
+    rows = []
+    for filename, summary in per_file:
+        total = summary['total_tests']
+        anchors = summary['total_anchors']
+        sketch = summary['distinct_titles']
+        unique = sketch.estimate()
+        rows.append({
+            'file': filename,
+            'total_tests': total,
+            'successful_tests': summary['successful_tests'],
+            'success_rate': summary['successful_tests'] / total * 100 if total else 0.0,
+            'total_anchors': anchors,
+            'unique_anchors': unique,
+            'unique_exact': sketch.exact,
+            'diversity_rate': unique / anchors * 100 if anchors else 0.0
+        })
+    return rows
+
+def print_per_file_table(rows):
+    """One line per analyzed file so trends across sweeps are visible at a glance"""
+    print("📁 PER-FILE RESULTS")
+    print("=" * 50)
+    for row in rows:
+        approx = "" if row['unique_exact'] else "~"
+        print(f"  {row['file']}: {row['successful_tests']}/{row['total_tests']} tests ({row['success_rate']:.1f}%), "
+              f"{row['total_anchors']} anchors, {approx}{row['unique_anchors']} unique "
+              f"({approx}{row['diversity_rate']:.1f}% diversity)")
+
+def stream_stage_results(summary):
+    """Structured stage results from a stream_analyze / merge_summaries summary, same schema as batch mode"""
+    stages = [{
+        'stage': 'anchor_patterns',
+        'total_anchors': summary['total_anchors'],
+        'successful_tests': summary['successful_tests']
+    }]
+    for stage, (dimension, table_name, _, _, _, show_samples) in GROUP_STAGES.items():
+        table = summary['keyword_tables'][table_name]
+        groups = []
+        for name, group in summary[dimension].items():
+            entry = {
+                'name': name,
+                'anchors': group['count'],
+                'keywords': {kw: group['keywords'][kw] for kw in table if group['keywords'][kw] > 0}
+            }
+            if show_samples:
+                entry['sample_titles'] = group['sample_titles']
+            groups.append(entry)
+        stages.append({'stage': stage, 'dimension': dimension, 'groups': groups})
+
+    total, anchors = summary['total_tests'], summary['total_anchors']
+    sketch = summary['distinct_titles']
+    unique = sketch.estimate()
+    stages.append({
+        'stage': 'recommendations',
+        'total_tests': total,
+        'successful_tests': summary['successful_tests'],
+        'failed_tests': summary['failed_tests'],
+        'success_rate': summary['successful_tests'] / total * 100 if total else 0.0,
+        'failures': [{'profile': profile, 'error': error} for profile, error in summary['failures']],
+        'total_anchors': anchors,
+        'unique_anchors': unique,
+        'unique_exact': sketch.exact,
+        'diversity_rate': unique / anchors * 100 if anchors else 0.0,
+        'common_words': [{'word': word, 'count': count} for word, count in summary['title_words'].most_common(10)]
+    })
+    return stages
+
+def print_stage(stage_result):
+    """Print any structured stage result in the analyzer's console layout"""
+    stage = stage_result['stage']
+    if stage == 'anchor_patterns':
+        print_anchor_patterns_stage(stage_result)
+    elif stage in GROUP_STAGES:
+        print_group_stage(stage_result)
+    elif stage == 'term_stats':
+        print_term_stage(stage_result)
+    elif stage == 'recommendations':
+        print_recommendations_stage(stage_result)
+    elif stage == 'queries':
+        print_queries_stage(stage_result)
+
+def print_stream_report(summary):
+    """Print a streaming summary in the same layout as the batch analyzer; returns its stage results"""
+    stages = stream_stage_results(summary)
+    for stage_result in stages:
+        print_stage(stage_result)
+    return stages
+
+def build_report(files, stages, per_file=None):
+    """Machine-readable run summary: everything needed to compare runs without the raw test files"""
+    report = {
+        'analyzer_version': ANALYZER_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'files': list(files),
+        'stages': {stage_result['stage']: stage_result for stage_result in stages}
+    }
+    if per_file is not None:
+        report['per_file'] = per_file
+    return report
+
+def write_report_json(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def write_report_ndjson(report, path):
+    """One record per line: a run header, one line per stage, then one line per file"""
+    with open(path, 'w') as f:
+        header = {key: report[key] for key in ('analyzer_version', 'generated_at', 'files')}
+        f.write(json.dumps({'type': 'run', **header}) + '\n')
+        for stage_result in report['stages'].values():
+            f.write(json.dumps({'type': 'stage', **stage_result}) + '\n')
+        for row in report.get('per_file', []):
+            f.write(json.dumps({'type': 'file', **row}) + '\n')
+
+def load_report(path):
+    """Read a report written by write_report_json or write_report_ndjson"""
+    with open(path, 'r') as f:
+        text = f.read()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    report = {'stages': {}, 'per_file': []}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        record_type = record.pop('type')
+        if record_type == 'run':
+            report.update(record)
+        elif record_type == 'stage':
+            report['stages'][record['stage']] = record
+        elif record_type == 'file':
+            report['per_file'].append(record)
+    return report
+
+def diff_reports(old, new, min_change=5.0):
+    """Compare two stored reports; keyword shifts below min_change percentage points are ignored"""
+    diff = {'old': old.get('generated_at'), 'new': new.get('generated_at'), 'totals': {}, 'groups': {}, 'common_words': {}}
+
+    old_rec = old['stages'].get('recommendations', {})
+    new_rec = new['stages'].get('recommendations', {})
+    for key in ('total_tests', 'successful_tests', 'total_anchors', 'unique_anchors',
+                'success_rate', 'diversity_rate', 'cluster_diversity_rate'):
+        if key in old_rec or key in new_rec:
+            before, after = old_rec.get(key), new_rec.get(key)
+            change = after - before if before is not None and after is not None else None
+            diff['totals'][key] = {'old': before, 'new': after, 'change': change}
+
+    for stage in GROUP_STAGES:
+        old_groups = {g['name']: g for g in old['stages'].get(stage, {}).get('groups', [])}
+        new_groups = {g['name']: g for g in new['stages'].get(stage, {}).get('groups', [])}
+        changes = []
+        for name in list(old_groups) + [n for n in new_groups if n not in old_groups]:
+            before, after = old_groups.get(name), new_groups.get(name)
+            if before is None or after is None:
+                changes.append({'group': name, 'status': 'added' if before is None else 'removed'})
+                continue
+            keyword_shifts = []
+            for keyword in dict.fromkeys(list(before['keywords']) + list(after['keywords'])):
+                old_rate = before['keywords'].get(keyword, 0) / before['anchors'] * 100 if before['anchors'] else 0.0
+                new_rate = after['keywords'].get(keyword, 0) / after['anchors'] * 100 if after['anchors'] else 0.0
+                if abs(new_rate - old_rate) >= min_change:
+                    keyword_shifts.append({'keyword': keyword, 'old_rate': old_rate, 'new_rate': new_rate,
+                                           'change': new_rate - old_rate})
+            keyword_shifts.sort(key=lambda shift: -abs(shift['change']))
+            if keyword_shifts or before['anchors'] != after['anchors']:
+                changes.append({'group': name, 'status': 'changed', 'old_anchors': before['anchors'],
+                                'new_anchors': after['anchors'], 'keyword_shifts': keyword_shifts})
+        diff['groups'][stage] = changes
+
+    old_words = {w['word'] for w in old_rec.get('common_words', [])}
+    new_words = {w['word'] for w in new_rec.get('common_words', [])}
+    diff['common_words'] = {'entered': sorted(new_words - old_words), 'left': sorted(old_words - new_words)}
+    return diff
+
+def print_report_diff(diff):
+    print("🔀 ANALYZER RUN DIFF")
+    print("=" * 60)
+    print(f"📅 Old: {diff['old']}")
+    print(f"📅 New: {diff['new']}")
+
+    print("\n📊 Totals:")
+    for key, values in diff['totals'].items():
+        change = values['change']
+        formatted = f"{change:+.1f}" if isinstance(change, float) else (f"{change:+d}" if change is not None else "n/a")
+        before, after = (f"{v:.1f}" if isinstance(v, float) else str(v) for v in (values['old'], values['new']))
+        print(f"    {key}: {before} → {after} ({formatted})")
+
+    for stage, changes in diff['groups'].items():
+        label = GROUP_STAGES[stage][3]
+        if not changes:
+            continue
+        print(f"\n{GROUP_STAGES[stage][2]}")
+        for change in changes:
+            if change['status'] != 'changed':
+                print(f"  {change['group'].upper()} {label}: {change['status']}")
+                continue
+            print(f"  {change['group'].upper()} {label}: {change['old_anchors']} → {change['new_anchors']} anchors")
+            for shift in change['keyword_shifts']:
+                print(f"    {shift['keyword']}: {shift['old_rate']:.1f}% → {shift['new_rate']:.1f}% ({shift['change']:+.1f}pp)")
+
+    words = diff['common_words']
+    if words['entered'] or words['left']:
+        print("\n🔍 Most Common Words in Titles:")
+        if words['entered']:
+            print(f"    entered top 10: {', '.join(words['entered'])}")
+        if words['left']:
+            print(f"    left top 10: {', '.join(words['left'])}")
+
+def _write_outputs(args, report):
+    if args.json_output:
+        write_report_json(report, args.json_output)
+        print(f"📁 Results saved to: {args.json_output}")
+    if args.ndjson_output:
+        write_report_ndjson(report, args.ndjson_output)
+        print(f"📁 Results saved to: {args.ndjson_output}")
 
 def main():
     """Main analysis function"""
+    parser = argparse.ArgumentParser(description="Analyze Angela Paris test results")
+    parser.add_argument('files', nargs='*', help="Results file(s) to analyze (defaults to the most recent one)")
+    parser.add_argument('--stream', action='store_true',
+                        help="Read results incrementally and build all aggregates in one bounded-memory pass")
+    parser.add_argument('--keywords', help="JSON file overriding the keyword tables")
+    parser.add_argument('--word-boundary', action='store_true', default=None,
+                        help="Match keywords as whole words only")
+    parser.add_argument('--near-duplicates', action='store_true',
+                        help="Cluster near-duplicate anchors with MinHash/LSH and report cluster diversity (batch mode)")
+    parser.add_argument('--term-stats', action='store_true',
+                        help="Report title terms that distinguish each budget, vibe, priority and mobility group (batch mode)")
+    parser.add_argument('--all', action='store_true',
+                        help="Analyze every angela-paris-test-results-*.json file in parallel and merge the results")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes for multi-file analysis (defaults to the CPU count)")
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f"Directory for cached per-file aggregates (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="Recompute every file and skip the cache")
+    parser.add_argument('--query', action='append', default=[],
+                        help="Count anchors matching a slice such as 'luxury ∧ romantic ∧ walking' (batch mode, repeatable)")
+    parser.add_argument('--interactive', action='store_true',
+                        help="Prompt for anchor queries after the report (batch mode)")
+    parser.add_argument('--json', dest='json_output', help="Write the structured results to this JSON file")
+    parser.add_argument('--ndjson', dest='ndjson_output', help="Write the structured results as NDJSON (one record per line)")
+    parser.add_argument('--diff', nargs=2, metavar=('OLD', 'NEW'),
+                        help="Compare two stored --json/--ndjson results instead of analyzing test files")
+    parser.add_argument('--diff-threshold', type=float, default=5.0,
+                        help="Smallest keyword-rate shift, in percentage points, reported by --diff (default: 5)")
+    args = parser.parse_args()
+
+    if args.diff:
+        print_report_diff(diff_reports(load_report(args.diff[0]), load_report(args.diff[1]), args.diff_threshold))
+        return
+
+    matcher = load_keyword_matcher(args.keywords, args.word_boundary)
+    cache_dir = None if args.no_cache else args.cache_dir
+
     print("🤖 ANGELA PARIS TEST RESULTS ANALYZER")
     print("=" * 60)
     print(f"📅 Analysis Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # Find the most recent test results file
-    json_files = [f for f in os.listdir('.') if f.startswith('angela-paris-test-results-') and f.endswith('.json')]
+    if args.files:
+        json_files = args.files
+    else:
+        # Find the test results files
+        json_files = sorted(f for f in os.listdir('.') if f.startswith('angela-paris-test-results-') and f.endswith('.json'))
+        
+        if not json_files:
+            print("❌ No test results files found. Run the test suite first.")
+            return
     
-    if not json_files:
-        print("❌ No test results files found. Run the test suite first.")
+    if args.all or len(args.files) > 1:
+        missing = [f for f in json_files if not os.path.exists(f)]
+        if missing:
+            print(f"❌ File {missing[0]} not found. Run the test suite first.")
+            return
+        print(f"📁 Analyzing {len(json_files)} files")
+        per_file, summary = analyze_files_parallel(json_files, matcher, args.workers, cache_dir)
+        rows = per_file_rows(per_file)
+        print_per_file_table(rows)
+        print(f"\n🧮 COMBINED RESULTS")
+        print("=" * 60)
+        stages = print_stream_report(summary)
+        
+        print(f"\n🎯 Analysis Complete!")
+        print(f"📊 Total Tests: {summary['total_tests']}")
+        print(f"✅ Successful: {summary['successful_tests']}")
+        print(f"❌ Failed: {summary['failed_tests']}")
+        _write_outputs(args, build_report(json_files, stages, rows))
         return
     
     # Use the most recent file
-    latest_file = sorted(json_files)[-1]
+    latest_file = json_files[-1]
     print(f"📁 Analyzing: {latest_file}")
     
+    if args.stream:
+        if not os.path.exists(latest_file):
+            print(f"❌ File {latest_file} not found. Run the test suite first.")
+            return
+        _, summary = analyze_files_parallel([latest_file], matcher, 1, cache_dir)
+        stages = print_stream_report(summary)
+        
+        print(f"\n🎯 Analysis Complete!")
+        print(f"📊 Total Tests: {summary['total_tests']}")
+        print(f"✅ Successful: {summary['successful_tests']}")
+        print(f"❌ Failed: {summary['failed_tests']}")
+        _write_outputs(args, build_report([latest_file], stages))
+        return
+    
     # Load and analyze results
     results = load_test_results(latest_file)
     if not results:
         return
     
     # Run analysis
-    analysis_data = analyze_anchor_patterns(results)
-    analyze_budget_impact(analysis_data)
-    analyze_vibe_impact(analysis_data)
-    analyze_priority_impact(analysis_data)
-    analyze_mobility_impact(results)
-    generate_recommendations(analysis_data, results)
+    analysis_data = analyze_anchor_patterns(results, matcher, args.near_duplicates)
+    stages = [
+        analysis_data['stage_result'],
+        analyze_budget_impact(analysis_data),
+        analyze_vibe_impact(analysis_data),
+        analyze_priority_impact(analysis_data),
+        analyze_mobility_impact(results, analysis_data)
+    ]
+    if args.term_stats:
+        stages.append(analyze_term_distinctiveness(analysis_data))
+    stages.append(generate_recommendations(analysis_data, results))
+    if args.query:
+        stages.append(analyze_queries(analysis_data, args.query))
     
     print(f"\n🎯 Analysis Complete!")
     print(f"📊 Total Tests: {len(results)}")
     print(f"✅ Successful: {len([r for r in results if r.get('success')])}")
     print(f"❌ Failed: {len([r for r in results if not r.get('success')])}")
+    _write_outputs(args, build_report([latest_file], stages))
+    if args.interactive:
+        interactive_query(analysis_data)
 
 if __name__ == "__main__":
     main()
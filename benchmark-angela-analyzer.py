@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Angela Analyzer Benchmark Suite
+Times every analyze-angela-results.py stage on synthetic result files and reports
+wall time, peak RSS and throughput so regressions in the analyzer's hot loops show up
+"""
+
+import argparse
+from contextlib import redirect_stdout
+import importlib.util
+import json
+import multiprocessing
+import os
+import resource
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+def _load_script(name, filename):
+    """Import one of the hyphenated sibling scripts as a module"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+analyzer = _load_script('angela_analyzer', 'analyze-angela-results.py')
+generator = _load_script('angela_generator', 'generate-angela-results.py')
+
+# stage name -> (prerequisite, callable). Prerequisites run untimed before the stage.
+def _load(path, _):
+    return analyzer.load_test_results(path)
+
+def _patterns(path, results):
+    return analyzer.analyze_anchor_patterns(results)
+
+STAGES = {
+    'load': (None, _load),
+    'anchor_patterns': ('load', _patterns),
+    'budget_impact': ('anchor_patterns', lambda path, data: analyzer.analyze_budget_impact(data)),
+    'vibe_impact': ('anchor_patterns', lambda path, data: analyzer.analyze_vibe_impact(data)),
+    'priority_impact': ('anchor_patterns', lambda path, data: analyzer.analyze_priority_impact(data)),
+    'mobility_impact': ('anchor_patterns', lambda path, data: analyzer.analyze_mobility_impact(None, data)),
+    'term_stats': ('anchor_patterns', lambda path, data: analyzer.analyze_term_distinctiveness(data)),
+    'near_duplicates': ('load', lambda path, results: analyzer.build_anchor_store(results, near_duplicates=True).cluster_ids),
+    'stream': (None, lambda path, _: analyzer.stream_analyze(path))
+}
+
+def _peak_rss_mb():
+    # ru_maxrss is KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _run_chain(stage, path):
+    prerequisite, func = STAGES[stage]
+    value = _run_chain(prerequisite, path) if prerequisite else None
+    return func(path, value)
+
+def _measure(stage, path, queue):
+    """Runs in a fresh process so peak RSS belongs to this stage and its prerequisites only"""
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        prerequisite, func = STAGES[stage]
+        value = _run_chain(prerequisite, path) if prerequisite else None
+        rss_before = _peak_rss_mb()
+        start = time.perf_counter()
+        func(path, value)
+        elapsed = time.perf_counter() - start
+    queue.put({'seconds': elapsed, 'peak_rss_mb': _peak_rss_mb(), 'rss_growth_mb': _peak_rss_mb() - rss_before})
+
+def run_stage(stage, path):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_measure, args=(stage, path, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+def ensure_dataset(anchor_count, compact=False):
+    path = generator.default_output_path(anchor_count)
+    if not os.path.exists(path):
+        print(f"🧪 Generating {anchor_count} anchors -> {path}")
+        generator.write_results(path, anchor_count, compact=compact)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze-angela-results.py stages")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help=f"Anchor counts to benchmark (default: {' '.join(map(str, DEFAULT_SIZES))})")
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--compact', action='store_true', help="Generate minified JSON datasets")
+    parser.add_argument('--json', dest='json_output', help="Write the measurements to this JSON file")
+    parser.add_argument('--compare', help="Previous --json output to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = {(row['anchors'], row['stage']): row for row in json.load(f)['results']}
+
+    print("⏱️  ANGELA ANALYZER BENCHMARK")
+    print("=" * 60)
+    print(f"{'anchors':>10}  {'stage':<16} {'seconds':>9} {'anchors/s':>12} {'peak MB':>9} {'+MB':>8}  vs baseline")
+
+    rows = []
+    for anchor_count in args.sizes:
+        path = ensure_dataset(anchor_count, args.compact)
+        for stage in args.stages:
+            measured = run_stage(stage, path)
+            row = {
+                'anchors': anchor_count,
+                'stage': stage,
+                'seconds': measured['seconds'],
+                'anchors_per_second': anchor_count / measured['seconds'] if measured['seconds'] else 0.0,
+                'peak_rss_mb': measured['peak_rss_mb'],
+                'rss_growth_mb': measured['rss_growth_mb']
+            }
+            rows.append(row)
+
+            change = ""
+            previous = baseline.get((anchor_count, stage))
+            if previous and previous['seconds']:
+                delta = (row['seconds'] - previous['seconds']) / previous['seconds'] * 100
+                change = f"{delta:+.1f}% time"
+                if delta > 10:
+                    change += " ⚠️"
+            print(f"{anchor_count:>10}  {stage:<16} {row['seconds']:>9.3f} {row['anchors_per_second']:>12,.0f} "
+                  f"{row['peak_rss_mb']:>9.1f} {row['rss_growth_mb']:>8.1f}  {change}")
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump({'analyzer_version': analyzer.ANALYZER_VERSION, 'results': rows}, f, indent=2)
+        print(f"\n📁 Measurements saved to: {args.json_output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Python Brain Load Test
+Replays /generate-prompt and /analyze-user payloads, shaped exactly as
+services/TripWell/pythonPromptService.js and routes/TripWell/adminUserAnalyzeRoute.js
+build them, against a locally started AI service at stepped concurrency (or rate).
+Reports latency percentiles and histograms, error rates and a throughput curve,
+and flags the step where throughput stops scaling (the saturation point)
+"""
+
+import argparse
+from bisect import bisect_left
+from collections import Counter
+import http.client
+import json
+import math
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+DEFAULT_TARGET = 'http://localhost:5000'
+DEFAULT_STEPS = [1, 4, 16, 64]
+DEFAULT_MIX = 'generate-prompt=0.7,analyze-user=0.3'
+# A step saturates when throughput grows less than this over the previous step
+SATURATION_GAIN = 0.05
+# Latency histogram bucket upper bounds (ms)
+HISTOGRAM_BOUNDS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000]
+# Error recorded for open-loop requests the step ended before sending
+DROPPED = 'Dropped'
+# Client timeouts matching the Node callers (seconds)
+TIMEOUTS = {'generate-prompt': 30, 'analyze-user': 15}
+
+CITIES = ['Paris', 'Rome', 'Barcelona', 'Tokyo', 'New York', 'London', 'Lisbon', 'Kyoto', 'Mexico City', 'Chicago']
+PERSONAS = ['art', 'foodie', 'adventure', 'history']
+WHO_WITH = ['solo', 'spouse', 'spouse-kids', 'son-daughter', 'friends', 'other']
+SEASONS = ['Spring', 'Summer', 'Fall', 'Winter']
+PURPOSES = ['vacation', 'Romantic getaway', 'Family trip', 'Business + leisure']
+FUNNEL_STAGES = ['none', 'itinerary_demo', 'spots_demo', 'updates_only', 'full_app']
+
+def generate_prompt_payload(rng):
+    """Body pythonPromptService.generatePromptPython posts (persona weights as needsmartpromptservice builds them)"""
+    primary = rng.choice(PERSONAS)
+    return {
+        'city': rng.choice(CITIES),
+        'persona_weights': {persona: 0.6 if persona == primary else 0.1 for persona in PERSONAS},
+        'budget_level': round(rng.random(), 2),
+        'romance_level': rng.choice([0.0, 0.0, round(rng.random(), 2)]),
+        'caretaker_role': rng.choice([0.0, 0.0, round(rng.random(), 2)]),
+        'flexibility': rng.choice([0.2, 0.5, 0.8]),
+        'who_with': rng.choice(WHO_WITH),
+        'daily_spacing': rng.choice([0.3, 0.5, 0.7]),
+        'season': rng.choice(SEASONS),
+        'purpose': rng.choice(PURPOSES),
+        'budget': rng.randrange(100, 600, 25)
+    }
+
+def analyze_user_payload(rng):
+    """Body adminUserAnalyzeRoute posts to /analyze-user"""
+    user_id = '%024x' % rng.getrandbits(96)
+    created = datetime.now() - timedelta(days=rng.randint(0, 180))
+    profile_complete = rng.random() < 0.7
+    trip_id = '%024x' % rng.getrandbits(96) if profile_complete and rng.random() < 0.4 else None
+    index = rng.randint(1, 10 ** 6)
+    return {
+        'user_id': user_id,
+        'firebase_id': user_id,
+        'email': f"loadtest{index}@example.com",
+        'firstName': f"Load{index}",
+        'lastName': "Test",
+        'profileComplete': profile_complete,
+        'tripId': trip_id,
+        'funnelStage': rng.choice(FUNNEL_STAGES),
+        'createdAt': created.isoformat(),
+        'context': 'admin_test',
+        'hints': {
+            'user_type': 'existing_user',
+            'entry_point': 'admin_test',
+            'has_profile': profile_complete,
+            'has_trip': trip_id is not None,
+            'days_since_signup': (datetime.now() - created).days
+        }
+    }
+
+PAYLOADS = {'generate-prompt': generate_prompt_payload, 'analyze-user': analyze_user_payload}
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        endpoint, _, weight = part.partition('=')
+        if endpoint.strip() not in PAYLOADS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{endpoint}' (choose from {', '.join(PAYLOADS)})")
+        mix[endpoint.strip()] = float(weight or 1)
+    return mix
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def histogram(latencies_ms):
+    counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+    for latency in latencies_ms:
+        counts[bisect_left(HISTOGRAM_BOUNDS, latency)] += 1
+    return counts
+
+def _worker(target, jobs, records, deadline):
+    """
+    Send jobs over one keep-alive connection; latency counts from each job's scheduled start
+
+    Open-loop jobs still queued at the deadline are recorded as dropped rather than
+    skipped: they carry the most queueing delay, so leaving them out would flatter
+    the steps past saturation
+    """
+    parts = urlsplit(target)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    connection = None
+    base_path = parts.path.rstrip('/')
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        scheduled, endpoint, body = job
+        open_loop = scheduled is not None
+        if not open_loop:
+            scheduled = time.perf_counter()  # closed loop: timed from when this connection is free
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if time.perf_counter() > deadline:
+            if open_loop:
+                records.append((endpoint, (time.perf_counter() - scheduled) * 1000, None, DROPPED))
+            continue
+        status, error = None, None
+        try:
+            if connection is None:
+                connection = connection_class(parts.hostname, parts.port, timeout=TIMEOUTS[endpoint])
+            connection.timeout = TIMEOUTS[endpoint]
+            connection.request('POST', f"{base_path}/{endpoint}", body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = None
+        except Exception as e:
+            error = type(e).__name__
+            if connection is not None:
+                connection.close()
+            connection = None
+        records.append((endpoint, (time.perf_counter() - scheduled) * 1000, status, error))
+    if connection is not None:
+        connection.close()
+
+def run_step(target, concurrency, duration, rate, mix, rng):
+    """
+    One load step: `concurrency` connections for `duration` seconds
+
+    With a rate, requests are scheduled open-loop at that many per second (queueing
+    delay counts toward latency, and requests not sent by the deadline count as
+    dropped); without one, every connection sends back-to-back
+    """
+    endpoints, weights = list(mix), list(mix.values())
+    jobs = queue.Queue(maxsize=concurrency * 4)
+    records = []
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=_worker, args=(target, jobs, records, deadline), daemon=True)
+               for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+
+    sent = 0
+    while True:
+        scheduled = start + sent / rate if rate else None
+        if (scheduled or time.perf_counter()) >= deadline:
+            break
+        endpoint = rng.choices(endpoints, weights)[0]
+        body = json.dumps(PAYLOADS[endpoint](rng))
+        try:
+            jobs.put((scheduled, endpoint, body), timeout=max(deadline - time.perf_counter(), 0.001))
+        except queue.Full:
+            break
+        sent += 1
+    for _ in threads:
+        jobs.put(None)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if rate:
+        # Scheduled before the deadline but never queued: every connection was busy and the queue full
+        unsent = max(math.ceil(duration * rate) - sent, 0)
+        for i, endpoint in enumerate(rng.choices(endpoints, weights, k=unsent)):
+            records.append((endpoint, (deadline - start - (sent + i) / rate) * 1000, None, DROPPED))
+    return summarize(records, concurrency, rate, elapsed)
+
+def summarize(records, concurrency, rate, elapsed):
+    row = {'concurrency': concurrency, 'rate': rate, 'seconds': elapsed, 'endpoints': {}}
+    for endpoint in sorted({record[0] for record in records}) + ['all']:
+        selected = [r for r in records if endpoint in ('all', r[0])]
+        ok = sorted(latency for _, latency, status, error in selected if error is None and status and status < 400)
+        failures = Counter(error or str(status) for _, _, status, error in selected
+                           if error is not None or not status or status >= 400)
+        row['endpoints'][endpoint] = {
+            'requests': len(selected),
+            'dropped': sum(1 for r in selected if r[3] == DROPPED),
+            'throughput': len(ok) / elapsed if elapsed else 0.0,
+            'error_rate': (len(selected) - len(ok)) / len(selected) if selected else 0.0,
+            'errors': dict(failures),
+            'p50_ms': percentile(ok, 0.50),
+            'p90_ms': percentile(ok, 0.90),
+            'p99_ms': percentile(ok, 0.99),
+            'max_ms': ok[-1] if ok else 0.0,
+            'histogram': histogram(ok)
+        }
+    return row
+
+def print_histogram(counts):
+    labels = [f"≤{bound}ms" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}ms"]
+    peak = max(counts) or 1
+    for label, count in zip(labels, counts):
+        if count:
+            print(f"      {label:>9} {count:>7}  {'█' * max(int(count / peak * 40), 1)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Python AI service's /generate-prompt and /analyze-user")
+    parser.add_argument('--target', default=DEFAULT_TARGET, help=f"Service base URL (default: {DEFAULT_TARGET})")
+    parser.add_argument('--steps', type=int, nargs='+', default=DEFAULT_STEPS,
+                        help=f"Concurrency per step (default: {' '.join(map(str, DEFAULT_STEPS))})")
+    parser.add_argument('--rates', type=float, nargs='+',
+                        help="Open-loop requests/second per step instead of back-to-back (one per --steps entry, or one for all)")
+    parser.add_argument('--duration', type=float, default=20.0, help="Seconds per step (default: 20)")
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Endpoint weights (default: {DEFAULT_MIX})")
+    parser.add_argument('--seed', type=int, default=7, help="Payload random seed")
+    parser.add_argument('--histograms', action='store_true', help="Print a latency histogram per step")
+    parser.add_argument('--json', dest='json_output', help="Write the measurements to this JSON file")
+    parser.add_argument('--compare', help="Previous --json output to compare against")
+    args = parser.parse_args()
+
+    rates = args.rates or [None]
+    if len(rates) == 1:
+        rates = rates * len(args.steps)
+    if len(rates) != len(args.steps):
+        parser.error("--rates needs one value or one per --steps entry")
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = {(row['concurrency'], row['rate']): row for row in json.load(f)['results']}
+
+    rng = random.Random(args.seed)
+    print("🚦 PYTHON BRAIN LOAD TEST")
+    print("=" * 60)
+    print(f"🎯 {args.target}  mix: {', '.join(f'{e}={w:g}' for e, w in args.mix.items())}  {args.duration:g}s per step")
+    print(f"{'conc':>5} {'rate':>7}  {'endpoint':<16} {'reqs':>7} {'drop':>6} {'req/s':>8} {'err%':>6} "
+          f"{'p50ms':>8} {'p90ms':>8} {'p99ms':>8}  vs baseline")
+
+    rows = []
+    previous_throughput = None
+    saturation = None
+    for concurrency, rate in zip(args.steps, rates):
+        row = run_step(args.target, concurrency, args.duration, rate, args.mix, rng)
+        rows.append(row)
+        for endpoint, stats in row['endpoints'].items():
+            change = ""
+            before = baseline.get((concurrency, rate), {}).get('endpoints', {}).get(endpoint)
+            if before and before['p99_ms']:
+                delta = (stats['p99_ms'] - before['p99_ms']) / before['p99_ms'] * 100
+                change = f"{delta:+.1f}% p99"
+                if delta > 10:
+                    change += " ⚠️"
+            print(f"{concurrency:>5} {rate or '-':>7}  {endpoint:<16} {stats['requests']:>7} {stats['dropped']:>6} {stats['throughput']:>8.1f} "
+                  f"{stats['error_rate'] * 100:>6.1f} {stats['p50_ms']:>8.1f} {stats['p90_ms']:>8.1f} "
+                  f"{stats['p99_ms']:>8.1f}  {change}")
+            if stats['errors']:
+                print(f"{'':>16}errors: {', '.join(f'{k} x{v}' for k, v in sorted(stats['errors'].items()))}")
+            if args.histograms and endpoint == 'all':
+                print_histogram(stats['histogram'])
+
+        throughput = row['endpoints'].get('all', {}).get('throughput', 0.0)
+        if saturation is None and previous_throughput and throughput < previous_throughput * (1 + SATURATION_GAIN):
+            saturation = rows[-2]
+        previous_throughput = throughput
+
+    print("\n📈 Throughput curve")
+    peak = max((row['endpoints'].get('all', {}).get('throughput', 0.0) for row in rows), default=0.0) or 1.0
+    for row in rows:
+        throughput = row['endpoints'].get('all', {}).get('throughput', 0.0)
+        print(f"   conc {row['concurrency']:>4}  {throughput:>8.1f} req/s  {'█' * max(int(throughput / peak * 40), 1)}")
+    if saturation:
+        stats = saturation['endpoints']['all']
+        print(f"\n🧱 Saturates around concurrency {saturation['concurrency']}: {stats['throughput']:.1f} req/s, "
+              f"p99 {stats['p99_ms']:.0f}ms")
+    else:
+        print("\n✅ Throughput still scaling at the last step")
+
+    if args.json_output:
+        with open(args.json_output, 'w') as f:
+            json.dump({'target': args.target, 'mix': args.mix, 'histogram_bounds_ms': HISTOGRAM_BOUNDS,
+                       'saturation_concurrency': saturation['concurrency'] if saturation else None,
+                       'results': rows}, f, indent=2)
+        print(f"\n📁 Measurements saved to: {args.json_output}")
+
+if __name__ == "__main__":
+    main()
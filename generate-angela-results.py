@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Synthetic Angela Paris Test Results Generator
+Writes result files in the same schema as test-angela-paris-comprehensive.js so the
+analyzer can be exercised and benchmarked at any size without calling OpenAI
+"""
+
+import argparse
+import json
+import os
+import random
+
+DEFAULT_OUTPUT_DIR = 'angela-bench'
+
+# Mirrors the option lists used by test-angela-paris-comprehensive.js
+BUDGETS = [
+    "$30-50/day", "$100-180/day", "$150-250/day", "$200-350/day", "$200-400/day",
+    "$300-500/day", "$400-600/day", "$500-800/day", "$600-900/day", "$800-1200/day"
+]
+VIBES = [
+    "Authentic & Local", "Romantic & Intimate", "Luxurious & Upscale",
+    "Social & Fun", "Adventurous & Active", "Relaxed & Chill"
+]
+PRIORITIES = [
+    "Culture & History", "Food & Dining", "Adventure & Outdoor",
+    "Relaxation & Wellness", "Shopping & Markets", "Nightlife & Fun"
+]
+MOBILITY = ["Love walking everywhere", "Prefer transport options", "Mix of walking and transport"]
+TRAVEL_PACE = [
+    "Slow & Relaxed - Take your time", "Moderate - Balanced activities",
+    "Fast Paced - Pack it all in", "Flexible - Go with the flow"
+]
+SEASONS = ["Spring", "Summer", "Fall", "Winter"]
+WHO_WITH = ["solo", "spouse", "spouse-kids", "friends"]
+
+PLACES = [
+    ("Louvre", "Louvre Museum"), ("Eiffel Tower", "Champ de Mars"), ("Montmartre", "18th arrondissement"),
+    ("Seine", "Seine River"), ("Le Marais", "Le Marais"), ("Versailles", "Versailles"),
+    ("Musee d'Orsay", "7th arrondissement"), ("Latin Quarter", "5th arrondissement"),
+    ("Canal Saint-Martin", "10th arrondissement"), ("Luxembourg Gardens", "6th arrondissement"),
+    ("Sainte-Chapelle", "Ile de la Cite"), ("Pere Lachaise", "20th arrondissement")
+]
+TITLE_TEMPLATES = [
+    "{place} Tour", "Guided {place} Tour", "{place} Walking Tour", "Sunset at {place}",
+    "{place} Food Crawl", "Private {place} Experience", "{place} by Bike", "Evening {place} Cruise",
+    "Hidden Gems of {place}", "{place} Market Morning"
+]
+
+# Description phrases biased by the profile's budget tier, vibes, priorities and mobility
+BUDGET_PHRASES = {
+    'low': ["free entry on the first Sunday", "a cheap and cheerful stop", "an affordable picnic", "budget friendly"],
+    'mid': ["a guided small-group visit", "good value for the experience", "a relaxed sit-down lunch"],
+    'high': ["an exclusive private guide", "a luxury champagne tasting", "upscale premium seating", "an expensive tasting menu"]
+}
+VIBE_PHRASES = {
+    "Authentic & Local": ["where locals actually go", "an authentic neighborhood feel"],
+    "Romantic & Intimate": ["a romantic, intimate setting", "candlelit and romantic"],
+    "Luxurious & Upscale": ["luxurious surroundings", "an upscale atmosphere"],
+    "Social & Fun": ["a fun, social crowd", "lively and fun"],
+    "Adventurous & Active": ["an active adventure", "an adventure off the beaten path"],
+    "Relaxed & Chill": ["a chill, relaxed pace", "relaxed afternoon vibes"]
+}
+PRIORITY_PHRASES = {
+    "Culture & History": ["centuries of history", "a world-class museum and art collection", "rich culture"],
+    "Food & Dining": ["a culinary highlight", "classic French dining", "a beloved restaurant"],
+    "Adventure & Outdoor": ["outdoor exploring", "a short hiking trail"],
+    "Relaxation & Wellness": ["a wellness break", "a spa afternoon", "pure relaxation"],
+    "Shopping & Markets": ["boutique shopping", "a bustling market", "Parisian fashion"],
+    "Nightlife & Fun": ["a cocktail bar", "a late-night club", "live entertainment"]
+}
+MOBILITY_PHRASES = {
+    "Love walking everywhere": ["an easy stroll", "best explored on foot by walking"],
+    "Prefer transport options": ["a quick metro ride", "a short taxi hop", "reachable by train"],
+    "Mix of walking and transport": ["walk one way and take the metro back", "a bike ride along the river"]
+}
+
+def _budget_band(budget):
+    low = int(budget.lstrip('$').split('-')[0])
+    if low < 150:
+        return 'low'
+    if low < 400:
+        return 'mid'
+    return 'high'
+
+def make_profile(rng, index):
+    """A random but plausible Paris traveler profile"""
+    priorities = rng.sample(PRIORITIES, 2)
+    vibes = rng.sample(VIBES, rng.choice([1, 2]))
+    budget = rng.choice(BUDGETS)
+    return {
+        'name': f"Paris Synthetic {index + 1}: {vibes[0].split(' ')[0]} {priorities[0].split(' ')[0]}",
+        'tripData': {
+            'city': "Paris",
+            'season': rng.choice(SEASONS),
+            'purpose': f"{priorities[0]} focused trip",
+            'whoWith': rng.choice(WHO_WITH)
+        },
+        'tripIntentData': {
+            'priorities': priorities,
+            'vibes': vibes,
+            'mobility': [rng.choice(MOBILITY)],
+            'travelPace': [rng.choice(TRAVEL_PACE)],
+            'budget': budget
+        }
+    }
+
+def make_anchor(rng, intent):
+    place, location = rng.choice(PLACES)
+    phrases = [rng.choice(BUDGET_PHRASES[_budget_band(intent['budget'])])]
+    phrases.append(rng.choice(VIBE_PHRASES[rng.choice(intent['vibes'])]))
+    phrases.append(rng.choice(PRIORITY_PHRASES[rng.choice(intent['priorities'])]))
+    phrases.append(rng.choice(MOBILITY_PHRASES[intent['mobility'][0]]))
+    rng.shuffle(phrases)
+    return {
+        'title': rng.choice(TITLE_TEMPLATES).format(place=place),
+        'description': f"Spend time at {place} with {phrases[0]}, {phrases[1]} and {phrases[2]} - {phrases[3]}.",
+        'location': f"{location}, Paris",
+        'isDayTrip': place == "Versailles",
+        'suggestedFollowOn': f"Stay near {location} for dinner"
+    }
+
+def iter_results(anchor_count, anchors_per_test=5, failure_rate=0.05, seed=42):
+    """Yield result dicts until anchor_count anchors have been produced"""
+    rng = random.Random(seed)
+    produced = 0
+    test_number = 0
+    while produced < anchor_count:
+        test_number += 1
+        profile = make_profile(rng, test_number - 1)
+        result = {
+            'testNumber': test_number,
+            'profileName': profile['name'],
+            'inputData': {
+                'tripData': profile['tripData'],
+                'tripIntentData': profile['tripIntentData']
+            }
+        }
+        if rng.random() < failure_rate:
+            result['error'] = "Failed to generate anchor suggestions"
+            result['timestamp'] = "2026-01-01T00:00:00.000Z"
+            result['success'] = False
+        else:
+            count = min(anchors_per_test, anchor_count - produced)
+            result['outputAnchors'] = [make_anchor(rng, profile['tripIntentData']) for _ in range(count)]
+            result['timestamp'] = "2026-01-01T00:00:00.000Z"
+            result['success'] = True
+            produced += count
+        yield result
+
+def write_results(path, anchor_count, anchors_per_test=5, failure_rate=0.05, seed=42, compact=False):
+    """Stream a results file to disk - memory stays flat even for 10M anchors"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tests = 0
+    with open(path, 'w') as f:
+        f.write('[')
+        for result in iter_results(anchor_count, anchors_per_test, failure_rate, seed):
+            if compact:
+                f.write((',' if tests else '') + json.dumps(result, separators=(',', ':')))
+            else:
+                # Same layout as JSON.stringify(results, null, 2) in the Node test suite
+                body = json.dumps(result, indent=2).replace('\n', '\n  ')
+                f.write((',\n  ' if tests else '\n  ') + body)
+            tests += 1
+        f.write('\n]' if tests and not compact else ']')
+    return tests
+
+def default_output_path(anchor_count):
+    return os.path.join(DEFAULT_OUTPUT_DIR, f"angela-paris-test-results-synthetic-{anchor_count}.json")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic Angela Paris test results")
+    parser.add_argument('--anchors', type=int, default=1000, help="Total anchors to generate (default: 1000)")
+    parser.add_argument('--anchors-per-test', type=int, default=5, help="Anchors per successful test (default: 5)")
+    parser.add_argument('--failure-rate', type=float, default=0.05, help="Fraction of failed tests (default: 0.05)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--compact', action='store_true', help="Write minified JSON instead of the Node suite's 2-space layout")
+    parser.add_argument('--output', help=f"Output file (default: {DEFAULT_OUTPUT_DIR}/angela-paris-test-results-synthetic-<anchors>.json)")
+    args = parser.parse_args()
+
+    path = args.output or default_output_path(args.anchors)
+    tests = write_results(path, args.anchors, args.anchors_per_test, args.failure_rate, args.seed, args.compact)
+    print(f"📁 Wrote {tests} tests / {args.anchors} anchors to {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
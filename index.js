@@ -2,6 +2,7 @@ const express = require("express");
 const mongoose = require("mongoose");
 const cors = require("cors");
 const morgan = require("morgan");
+const fs = require("fs");
 const admin = require("firebase-admin");
 require("dotenv").config();
 
@@ -61,6 +62,28 @@ app.options("*", cors(corsOptions));
 
 // === PARSER ===
 app.use(morgan("dev"));
+
+// === ACCESS LOG ===
+// Combined-style lines with the caller's address and Firebase uid, replayed by
+// operations-management/activity_detector.py (same TRIPWELL_ACCESS_LOG path)
+morgan.token("client-ip", (req) => {
+  // The hosting proxy appends the address it saw last; earlier entries come from the client
+  const forwarded = (req.headers["x-forwarded-for"] || "").split(",").map(ip => ip.trim()).filter(Boolean);
+  return forwarded.length ? forwarded[forwarded.length - 1] : req.socket.remoteAddress;
+});
+// Verified Firebase uid (set by verifyFirebaseToken); "-" on routes without a token
+morgan.token("uid", (req) => (req.user && req.user.uid) || "-");
+// firebaseId from the request body - client-supplied and unverified, so logged as its own field
+morgan.token("claimed-uid", (req) => {
+  const claimed = req.body && req.body.firebaseId;
+  return claimed ? encodeURIComponent(String(claimed).slice(0, 128)) : "-";
+});
+if (process.env.TRIPWELL_ACCESS_LOG) {
+  app.use(morgan(':client-ip - :uid [:date[clf]] ":method :url HTTP/:http-version" :status :res[content-length] ":referrer" ":user-agent" claimed=:claimed-uid', {
+    stream: fs.createWriteStream(process.env.TRIPWELL_ACCESS_LOG, { flags: "a" })
+  }));
+  console.log("📜 Writing access log to", process.env.TRIPWELL_ACCESS_LOG);
+}
 app.use(express.json());
 
 // === FIREBASE ADMIN INIT ===
@@ -0,0 +1,198 @@
+"""
+TripWell Duplicate Account Clustering
+=====================================
+
+Groups TripWellUser accounts that look like one person, without comparing
+every account to every other:
+- Blocking: each account is filed under a few keys (normalized email
+  local-part on the same provider, name + hometown, name or email stem +
+  signup time window)
+- Each key is a match rule, so every account in a block is joined to the
+  others with union-find in one pass over the block
+- Time-window blocks only count as a match once they hold a burst of
+  accounts (RULES min_accounts), so steady signups do not chain together
+- Blocks over MAX_BLOCK_SIZE are skipped as too common to mean anything
+  (e.g. "john smith" in a big city), which keeps work linear in user count
+
+Every cluster carries the rules and keys that joined it as evidence.
+"""
+
+import logging
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+
+from data_access import TripWellDataAccess
+
+logger = logging.getLogger(__name__)
+
+MAX_BLOCK_SIZE = 50
+MIN_EMAIL_STEM = 4
+# Domains that deliver to the same mailboxes
+PROVIDER_ALIASES = {"googlemail.com": "gmail.com"}
+# rule -> (signup window in seconds or None, accounts a block needs before it links them)
+RULES = {
+    "email_local_part": (None, 2),
+    "name_hometown": (None, 2),
+    "name_signup_window": (24 * 3600, 2),
+    "email_stem_signup_window": (3600, 3)
+}
+
+def _tokens(*values: Optional[str]) -> List[str]:
+    return [token for value in values if value for token in re.findall(r"[^\W_]+", value.casefold())]
+
+def normalize_local_part(email: Optional[str]) -> Optional[str]:
+    """Local part without case, dots or a +tag: John.Doe+trips@x.com -> johndoe"""
+    if not email or "@" not in email:
+        return None
+    local = email.rsplit("@", 1)[0].casefold().split("+", 1)[0].replace(".", "")
+    return local or None
+
+def email_provider(email: Optional[str]) -> Optional[str]:
+    """Email domain with aliases folded together: x@googlemail.com -> gmail.com"""
+    if not email or "@" not in email:
+        return None
+    domain = email.rsplit("@", 1)[1].strip().casefold()
+    return PROVIDER_ALIASES.get(domain, domain) or None
+
+def email_stem(local_part: Optional[str]) -> Optional[str]:
+    """Letters of a normalized local part, so numbered variants (jdoe1, jdoe_22) share a stem"""
+    stem = "".join(_tokens(re.sub(r"\d+", " ", local_part or "")))
+    return stem if len(stem) >= MIN_EMAIL_STEM else None
+
+def _windows(when: Optional[datetime], seconds: int) -> List[int]:
+    """Two half-overlapping window numbers, so signups straddling a boundary still share one"""
+    if not when:
+        return []
+    stamp = when.timestamp()
+    return [int(stamp // seconds) * 2, int((stamp + seconds / 2) // seconds) * 2 + 1]
+
+class AccountClusters:
+    """Blocked union-find over user accounts"""
+
+    def __init__(self, max_block_size: int = MAX_BLOCK_SIZE):
+        self.max_block_size = max_block_size
+        self.users: List[Dict] = []
+        self.blocks: Dict[Tuple[str, str], array] = {}
+        self.parent = array('i')
+        self.size = array('i')
+        self.stats = {"users": 0, "blocks": 0, "skipped_blocks": 0, "unions": 0}
+
+    def block_keys(self, user: Dict) -> Iterable[Tuple[str, str]]:
+        local = normalize_local_part(user.get("email"))
+        domain = email_provider(user.get("email"))
+        name_tokens = sorted(_tokens(user.get("firstName"), user.get("lastName")))
+        name = " ".join(name_tokens)
+        hometown = " ".join(_tokens(user.get("hometownCity")))
+        # A local part alone ("john", "info") is shared by unrelated people across providers
+        if local and domain:
+            yield "email_local_part", f"{local}@{domain}"
+        if name and hometown:
+            yield "name_hometown", f"{name}|{hometown}"
+        # A lone first name is too common to link accounts on signup time alone
+        if len(name_tokens) >= 2:
+            for window in _windows(user.get("createdAt"), RULES["name_signup_window"][0]):
+                yield "name_signup_window", f"{name}|{window}"
+        stem = email_stem(local)
+        if stem and domain:
+            for window in _windows(user.get("createdAt"), RULES["email_stem_signup_window"][0]):
+                yield "email_stem_signup_window", f"{stem}@{domain}|{window}"
+
+    def add_user(self, user: Dict) -> int:
+        index = len(self.users)
+        self.users.append({
+            "user_id": str(user.get("_id")),
+            "email": user.get("email"),
+            "name": " ".join(part for part in (user.get("firstName"), user.get("lastName")) if part),
+            "hometown": user.get("hometownCity"),
+            "created_at": user.get("createdAt")
+        })
+        self.parent.append(index)
+        self.size.append(1)
+        for key in self.block_keys(user):
+            block = self.blocks.get(key)
+            if block is None:
+                block = self.blocks[key] = array('i')
+            # Oversized blocks stop growing; they are skipped when joining anyway
+            if len(block) <= self.max_block_size:
+                block.append(index)
+        return index
+
+    @classmethod
+    def from_data(cls, data: TripWellDataAccess, max_block_size: int = MAX_BLOCK_SIZE) -> "AccountClusters":
+        clusters = cls(max_block_size)
+        for user in data.find("TripWellUser", {}, ["_id", "email", "firstName", "lastName", "hometownCity", "createdAt"]):
+            clusters.add_user(user)
+        logger.info(f"🧩 Blocked {len(clusters.users)} accounts into {len(clusters.blocks)} candidate groups")
+        return clusters.join()
+
+    def find(self, index: int) -> int:
+        parent = self.parent
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]  # path halving
+            index = parent[index]
+        return index
+
+    def union(self, a: int, b: int) -> bool:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return True
+
+    def join(self) -> "AccountClusters":
+        """Union every account in each usable block with the block's first account"""
+        self.stats.update(users=len(self.users), blocks=0, skipped_blocks=0, unions=0)
+        for (rule, _), block in self.blocks.items():
+            if len(block) < RULES[rule][1]:
+                continue
+            if len(block) > self.max_block_size:
+                self.stats["skipped_blocks"] += 1
+                continue
+            self.stats["blocks"] += 1
+            for index in block[1:]:
+                self.stats["unions"] += self.union(block[0], index)
+        return self
+
+    def clusters(self, min_size: int = 2) -> List[Dict]:
+        """
+        Accounts that appear to belong to one person
+
+        Returns:
+            [{"size", "accounts", "evidence", "signup_span_hours"}], largest clusters first;
+            evidence lists each rule and key that linked accounts in the cluster
+        """
+        members: Dict[int, List[int]] = {}
+        for index in range(len(self.users)):
+            if self.size[self.find(index)] >= min_size:
+                members.setdefault(self.find(index), []).append(index)
+        evidence: Dict[int, List[Dict]] = {root: [] for root in members}
+        for (rule, key), block in self.blocks.items():
+            if RULES[rule][1] <= len(block) <= self.max_block_size:
+                root = self.find(block[0])
+                if root in evidence:
+                    evidence[root].append({"rule": rule, "key": key.split("|")[0], "accounts": len(block)})
+
+        results = []
+        for root, indexes in members.items():
+            accounts = [self.users[i] for i in indexes]
+            signups = [a["created_at"] for a in accounts if a["created_at"]]
+            span = (max(signups) - min(signups)).total_seconds() / 3600 if signups else 0.0
+            # Overlapping time windows can report the same rule and key twice
+            seen, unique = set(), []
+            for item in evidence[root]:
+                if (item["rule"], item["key"]) not in seen:
+                    seen.add((item["rule"], item["key"]))
+                    unique.append(item)
+            results.append({
+                "size": len(accounts),
+                "accounts": [dict(a, created_at=a["created_at"].isoformat() if a["created_at"] else None) for a in accounts],
+                "evidence": unique,
+                "signup_span_hours": round(span, 2)
+            })
+        results.sort(key=lambda c: (-c["size"], c["accounts"][0]["user_id"]))
+        return results
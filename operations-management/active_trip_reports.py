@@ -16,12 +16,22 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from activity_sketches import ActivitySketches
+from data_access import TripWellDataAccess, get_data_access
+from destination_trends import DestinationTrends
+from report_cache import ReportCache, cached_report, get_report_cache
+from report_runner import run_sub_reports
+
 logger = logging.getLogger(__name__)
 
 class ActiveTripReports:
     """Service for generating active trip reports and monitoring"""
     
-    def __init__(self):
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None,
+                 report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+        self.sketches = ActivitySketches(self.data, report_cache=self.report_cache)
         logger.info("🗺️ Active Trip Reports initialized")
     
     def generate_active_trip_summary(self) -> Dict:
@@ -33,29 +43,70 @@ class ActiveTripReports:
         """
         logger.info("📊 Generating active trip summary")
         
-        # TODO: Implement active trip analysis
-        return {
-            "success": True,
-            "report_type": "active_trip_summary",
-            "generated_at": datetime.now().isoformat(),
-            "active_trip_metrics": {
-                "total_active_trips": 0,
-                "trips_starting_today": 0,
-                "trips_ending_today": 0,
-                "trips_in_progress": 0,
-                "average_trip_duration": 0,
-                "most_popular_destinations": [],
-                "trip_engagement_score": 0.0
-            },
-            "trip_status_breakdown": {
-                "planning": 0,
-                "confirmed": 0,
-                "in_progress": 0,
-                "completed": 0,
-                "cancelled": 0
-            },
-            "message": "Active trip summary generated successfully"
-        }
+        try:
+            now = datetime.utcnow()
+            today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            tomorrow = today + timedelta(days=1)
+            active = {"endDate": {"$gte": today}}
+            
+            # One server-side pass over the active trips for every count
+            rows = self.data.aggregate("TripBase", [
+                {"$match": active},
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": 1},
+                    "starting_today": {"$sum": {"$cond": [
+                        {"$and": [{"$gte": ["$startDate", today]}, {"$lt": ["$startDate", tomorrow]}]}, 1, 0
+                    ]}},
+                    "ending_today": {"$sum": {"$cond": [{"$lt": ["$endDate", tomorrow]}, 1, 0]}},
+                    "in_progress": {"$sum": {"$cond": [{"$lte": ["$startDate", now]}, 1, 0]}},
+                    "started": {"$sum": {"$cond": [
+                        {"$or": ["$tripStartedByOriginator", "$tripStartedByParticipant"]}, 1, 0
+                    ]}},
+                    "average_duration": {"$avg": "$daysTotal"}
+                }}
+            ])
+            counts = rows[0] if rows else {}
+            total = counts.get("total", 0)
+            
+            completion_reasons = {
+                row["_id"]: row["count"] for row in self.data.aggregate("TripComplete", [
+                    {"$group": {"_id": "$completionReason", "count": {"$sum": 1}}}
+                ])
+            }
+            
+            return {
+                "success": True,
+                "report_type": "active_trip_summary",
+                "generated_at": now.isoformat(),
+                "active_trip_metrics": {
+                    "total_active_trips": total,
+                    "trips_starting_today": counts.get("starting_today", 0),
+                    "trips_ending_today": counts.get("ending_today", 0),
+                    "trips_in_progress": counts.get("in_progress", 0),
+                    "average_trip_duration": counts.get("average_duration") or 0,
+                    "most_popular_destinations": self.data.top_values("TripBase", ["city", "country"], active, limit=5),
+                    # Share of active trips that someone has actually started
+                    "trip_engagement_score": counts.get("started", 0) / total * 100 if total else 0.0
+                },
+                "trip_status_breakdown": {
+                    "planning": total - counts.get("in_progress", 0),
+                    "confirmed": 0,
+                    "in_progress": counts.get("in_progress", 0),
+                    "completed": completion_reasons.get("completed", 0),
+                    "cancelled": completion_reasons.get("cancelled", 0)
+                },
+                "message": "Active trip summary generated successfully"
+            }
+        except Exception as e:
+            logger.error(f"❌ Active trip summary failed: {e}")
+            return {
+                "success": False,
+                "report_type": "active_trip_summary",
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to generate active trip summary"
+            }
     
     def analyze_trip_performance(self, date_range: Optional[Dict] = None) -> Dict:
         """
@@ -91,6 +142,7 @@ class ActiveTripReports:
             "message": "Trip performance analysis completed successfully"
         }
     
+    @cached_report("destination_popularity")
     def track_destination_popularity(self, time_period: str = "monthly") -> Dict:
         """
         Track destination popularity and trends
@@ -103,23 +155,39 @@ class ActiveTripReports:
         """
         logger.info(f"🌍 Tracking destination popularity for {time_period} period")
         
-        # TODO: Implement destination popularity tracking
+        try:
+            # Streams only the trips created since the previous run into the persisted sketches
+            trends = DestinationTrends.load(self.data)
+            trends.update(self.data)
+            report = trends.report(time_period)
+        except Exception as e:
+            logger.error(f"❌ Destination popularity tracking failed: {e}")
+            return {
+                "success": False,
+                "report_type": "destination_popularity",
+                "time_period": time_period,
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to track destination popularity"
+            }
+        
+        # TODO: Implement diversity, international ratio and preference insights
         return {
             "success": True,
             "report_type": "destination_popularity",
             "time_period": time_period,
             "generated_at": datetime.now().isoformat(),
             "popularity_metrics": {
-                "top_destinations": [],
-                "emerging_destinations": [],
-                "seasonal_trends": {},
+                "top_destinations": report["top_destinations"],
+                "emerging_destinations": report["emerging_destinations"],
+                "seasonal_trends": report["seasonal_trends"],
                 "destination_diversity_score": 0.0,
                 "international_vs_domestic_ratio": 0.0
             },
             "trend_analysis": {
-                "fastest_growing_destinations": [],
-                "declining_destinations": [],
-                "seasonal_patterns": {},
+                "fastest_growing_destinations": report["fastest_growing_destinations"],
+                "declining_destinations": report["declining_destinations"],
+                "seasonal_patterns": report["seasonal_patterns"],
                 "travel_preference_insights": []
             },
             "message": "Destination popularity tracking completed successfully"
@@ -134,13 +202,23 @@ class ActiveTripReports:
         """
         logger.info("👥 Monitoring trip engagement")
         
-        # TODO: Implement trip engagement monitoring
+        # Trip views are not logged; trips with any activity that day stand in for them
+        last_week = {"start": datetime.utcnow() - timedelta(days=7)}
+        if not self.sketches.covers(last_week):
+            # There is no exact fallback for engaged trips, so bring the sketches up to today first
+            self.sketches.update()
+        daily_trips = self.sketches.daily("engaged_trips", last_week)
+        engaged_users = self.sketches.distinct("trip_engaged_users", last_week)
+        
+        # TODO: Implement modification, POI interest, sharing and session metrics
         return {
             "success": True,
             "report_type": "trip_engagement_monitoring",
             "generated_at": datetime.now().isoformat(),
             "engagement_metrics": {
-                "average_daily_trip_views": 0,
+                "average_daily_trip_views": sum(d["estimate"] for d in daily_trips) / len(daily_trips) if daily_trips else 0,
+                "weekly_trip_engaged_users": engaged_users["estimate"],
+                "distinct_count_standard_error": engaged_users["standard_error"],
                 "itinerary_modification_rate": 0.0,
                 "poi_interest_rate": 0.0,
                 "trip_sharing_rate": 0.0,
@@ -160,34 +238,47 @@ class ActiveTripReports:
             "message": "Trip engagement monitoring completed successfully"
         }
     
-    def generate_trip_health_dashboard(self) -> Dict:
+    @cached_report("trip_health_dashboard", params=())
+    def generate_trip_health_dashboard(self, concurrent: bool = True,
+                                       timeouts: Optional[Dict[str, float]] = None) -> Dict:
         """
         Generate comprehensive trip health dashboard
         
+        Args:
+            concurrent: Run the four sub-reports concurrently instead of one after another
+            timeouts: Optional per-sub-report timeouts in seconds, keyed by dashboard section
+            
         Returns:
-            Dict containing trip health metrics
+            Dict containing trip health metrics; sections whose sub-report failed or
+            timed out are left empty and listed in sub_report_errors
         """
         logger.info("🏥 Generating trip health dashboard")
         
         # Generate all trip reports
-        active_summary = self.generate_active_trip_summary()
-        performance_analysis = self.analyze_trip_performance()
-        destination_popularity = self.track_destination_popularity()
-        engagement_monitoring = self.monitor_trip_engagement()
+        run = run_sub_reports({
+            "active_trips": self.generate_active_trip_summary,
+            "performance": self.analyze_trip_performance,
+            "destinations": self.track_destination_popularity,
+            "engagement": self.monitor_trip_engagement
+        }, timeouts=timeouts, concurrent=concurrent)
+        reports = run["results"]
         
         return {
             "success": True,
             "report_type": "trip_health_dashboard",
             "generated_at": datetime.now().isoformat(),
             "dashboard_data": {
-                "active_trips": active_summary["active_trip_metrics"],
-                "performance": performance_analysis["performance_metrics"],
-                "destinations": destination_popularity["popularity_metrics"],
-                "engagement": engagement_monitoring["engagement_metrics"]
+                "active_trips": reports.get("active_trips", {}).get("active_trip_metrics", {}),
+                "performance": reports.get("performance", {}).get("performance_metrics", {}),
+                "destinations": reports.get("destinations", {}).get("popularity_metrics", {}),
+                "engagement": reports.get("engagement", {}).get("engagement_metrics", {})
             },
             "health_score": 0.0,
-            "alerts": [],
+            "alerts": [f"{name} unavailable: {reason}" for name, reason in run["errors"].items()],
             "recommendations": [],
+            "partial": bool(run["errors"]),
+            "sub_report_errors": run["errors"],
+            "sub_report_timings": run["timings"],
             "message": "Trip health dashboard generated successfully"
         }
 
@@ -0,0 +1,264 @@
+"""
+TripWell Activity Burst Detector
+================================
+
+Streaming sliding-window rate limits over auth and request events:
+- Each rule counts events per user or per IP in a ring buffer of time buckets
+- Adding an event and checking the window total is O(1) (the ring has a fixed size)
+- Keys idle for longer than their window are evicted, and a hard cap bounds the
+  rest, so memory follows the number of active keys rather than total traffic
+- A key is flagged once per burst, when its window total first crosses the limit
+
+Events are replayed from the Express access log that index.js writes to
+TRIPWELL_ACCESS_LOG: combined-format lines whose user field is the Firebase uid
+verified from the caller's token, plus a trailing claimed=<firebaseId> with the
+id the request body names. The claimed id is client-supplied (it is all the
+unauthenticated login route has), so per-user rules key it as "claimed:<id>"
+and only fall back to it when there is no verified uid. Plain morgan
+"combined"/"common" logs parse too, but only feed the per-IP rules (their user
+field is always "-"), and the console "dev" format has no address or time:
+
+    python activity_detector.py access.log
+"""
+
+import argparse
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import datetime
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+LOGIN, PROFILE_UPDATE, REQUEST = "login", "profile_update", "request"
+
+# name -> (event kind, key field, window seconds, bucket seconds, max events per window)
+RULES = {
+    "login_burst_per_user": (LOGIN, "user", 300, 30, 10),
+    "login_burst_per_ip": (LOGIN, "ip", 300, 30, 20),
+    "profile_update_burst": (PROFILE_UPDATE, "user", 600, 60, 5),
+    "profile_update_burst_per_ip": (PROFILE_UPDATE, "ip", 600, 60, 15),
+    "request_burst_per_ip": (REQUEST, "ip", 60, 5, 300),
+    "request_burst_per_user": (REQUEST, "user", 60, 5, 300)
+}
+
+# Which suspicious_activities list each rule reports into
+RULE_CATEGORIES = {
+    "login_burst_per_user": "unusual_login_patterns",
+    "login_burst_per_ip": "unusual_login_patterns",
+    "profile_update_burst": "rapid_profile_updates",
+    "profile_update_burst_per_ip": "rapid_profile_updates",
+    "request_burst_per_ip": "data_scraping_attempts",
+    "request_burst_per_user": "data_scraping_attempts"
+}
+
+MAX_KEYS_PER_RULE = 50000
+MAX_FINDINGS_PER_RULE = 1000
+
+# (method, path prefix) -> event kind, matched against the mounted Express routes
+ROUTE_KINDS = (
+    ("POST", "/tripwell/user/createOrFind", LOGIN),
+    ("PUT", "/tripwell/profile", PROFILE_UPDATE)
+)
+
+# index.js access log (and morgan "combined" / "common"): addr - uid [date] "METHOD url HTTP/x" status size ...
+ACCESS_LOG_LINE = re.compile(
+    r'^(?P<ip>\S+) \S+ (?P<user>\S+) \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<url>\S+)[^"]*" (?P<status>\d{3})'
+)
+ACCESS_LOG_CLAIMED = re.compile(r' claimed=(?P<claimed>\S+)\s*$')
+ACCESS_LOG_TIME = "%d/%b/%Y:%H:%M:%S %z"
+CLAIMED_PREFIX = "claimed:"
+
+class RateCounter:
+    """Event count over the last `slots` buckets of one key"""
+
+    __slots__ = ("counts", "epoch", "total", "alerting")
+
+    def __init__(self, slots: int):
+        self.counts = [0] * slots
+        self.epoch = None  # newest bucket number seen
+        self.total = 0
+        self.alerting = False
+
+    def add(self, epoch: int) -> int:
+        """Count one event in bucket `epoch` and return the window total"""
+        slots = len(self.counts)
+        if self.epoch is None or epoch - self.epoch >= slots:
+            self.counts = [0] * slots
+            self.total = 0
+            self.epoch = epoch
+        elif epoch > self.epoch:
+            # Clear the buckets that rotated out since the last event (at most `slots` of them)
+            for stale in range(self.epoch + 1, epoch + 1):
+                self.total -= self.counts[stale % slots]
+                self.counts[stale % slots] = 0
+            self.epoch = epoch
+        elif self.epoch - epoch >= slots:
+            return self.total  # older than the window; out-of-order events are dropped
+        self.counts[epoch % slots] += 1
+        self.total += 1
+        return self.total
+
+class ActivityDetector:
+    """Per-rule counters keyed by user or IP, with idle eviction and a key cap"""
+
+    def __init__(self, rules: Optional[Dict[str, Tuple]] = None, max_keys: int = MAX_KEYS_PER_RULE):
+        self.rules = rules or RULES
+        self.max_keys = max_keys
+        self.counters: Dict[str, OrderedDict] = {name: OrderedDict() for name in self.rules}
+        self.findings: Dict[str, Dict[str, Dict]] = {name: {} for name in self.rules}
+        self.stats = {"events": 0, "flags": 0, "evicted_keys": 0}
+
+    def record(self, kind: str, when: datetime, user: Optional[str] = None, ip: Optional[str] = None) -> List[Dict]:
+        """
+        Count one event against every rule for its kind
+
+        Args:
+            kind: login, profile_update or request (logins and profile updates are also requests)
+            when: Event time
+            user: User id or firebaseId, when known
+            ip: Client address, when known
+
+        Returns:
+            Findings for the rules this event pushed over their limit
+        """
+        self.stats["events"] += 1
+        keys = {"user": user, "ip": ip}
+        kinds = (kind, REQUEST) if kind != REQUEST else (REQUEST,)
+        stamp = when.timestamp()
+        flagged = []
+        for name, (rule_kind, key_field, window, bucket, limit) in self.rules.items():
+            key = keys.get(key_field)
+            if rule_kind not in kinds or not key or key == "-":
+                continue
+            counters = self.counters[name]
+            epoch = int(stamp // bucket)
+            self._evict(counters, epoch - window // bucket)
+
+            counter = counters.get(key)
+            if counter is None:
+                counter = counters[key] = RateCounter(window // bucket)
+            else:
+                counters.move_to_end(key)
+            total = counter.add(epoch)
+
+            if total <= limit:
+                counter.alerting = False
+            elif not counter.alerting:
+                counter.alerting = True
+                flagged.append(self._flag(name, key_field, key, total, when))
+            else:
+                finding = self.findings[name].get(key)
+                if finding:
+                    finding["peak_events"] = max(finding["peak_events"], total)
+                    finding["last_flagged_at"] = when.isoformat()
+        return flagged
+
+    def _evict(self, counters: OrderedDict, oldest_live_epoch: int) -> None:
+        # Least recently touched keys sit at the front; stop at the first one still in its window
+        while counters:
+            key, counter = next(iter(counters.items()))
+            if counter.epoch > oldest_live_epoch and len(counters) < self.max_keys:
+                break
+            counters.popitem(last=False)
+            self.stats["evicted_keys"] += 1
+
+    def _flag(self, name: str, key_field: str, key: str, total: int, when: datetime) -> Dict:
+        self.stats["flags"] += 1
+        findings = self.findings[name]
+        finding = findings.get(key)
+        if finding is None:
+            if len(findings) >= MAX_FINDINGS_PER_RULE:
+                # Keep the strongest findings once the list is full
+                weakest = min(findings, key=lambda k: findings[k]["peak_events"])
+                if findings[weakest]["peak_events"] >= total:
+                    return {"rule": name, key_field: key, "events_in_window": total}
+                del findings[weakest]
+            _, _, window, _, limit = self.rules[name]
+            finding = findings[key] = {
+                "rule": name,
+                key_field: key,
+                "limit": limit,
+                "window_seconds": window,
+                "bursts": 0,
+                "peak_events": 0,
+                "first_flagged_at": when.isoformat()
+            }
+        finding["bursts"] += 1
+        finding["peak_events"] = max(finding["peak_events"], total)
+        finding["last_flagged_at"] = when.isoformat()
+        return dict(finding, events_in_window=total)
+
+    def suspicious_activities(self) -> Dict[str, List[Dict]]:
+        """Findings grouped into the security report's suspicious_activities lists, strongest first"""
+        grouped = {category: [] for category in set(RULE_CATEGORIES.values())}
+        for name, findings in self.findings.items():
+            grouped.setdefault(RULE_CATEGORIES.get(name, name), []).extend(findings.values())
+        for entries in grouped.values():
+            entries.sort(key=lambda f: -f["peak_events"])
+        return grouped
+
+    def active_keys(self) -> int:
+        return sum(len(counters) for counters in self.counters.values())
+
+    def replay(self, events: Iterable[Tuple[str, datetime, Optional[str], Optional[str]]]) -> int:
+        """Feed (kind, when, user, ip) events in time order; returns events processed"""
+        processed = 0
+        for kind, when, user, ip in events:
+            self.record(kind, when, user, ip)
+            processed += 1
+        return processed
+
+def classify(method: str, path: str) -> str:
+    path = path.split("?", 1)[0]
+    for route_method, prefix, kind in ROUTE_KINDS:
+        if method == route_method and path.startswith(prefix):
+            return kind
+    return REQUEST
+
+def read_access_log(lines: Iterable[str]) -> Iterator[Tuple[str, datetime, Optional[str], Optional[str]]]:
+    """
+    Parse access log lines into (kind, when, user, ip) events; lines in other formats are skipped
+
+    user is the verified uid, else "claimed:<firebaseId>" from the request body, else None
+    """
+    skipped = 0
+    for line in lines:
+        match = ACCESS_LOG_LINE.match(line)
+        if not match:
+            skipped += 1
+            continue
+        try:
+            when = datetime.strptime(match["time"], ACCESS_LOG_TIME)
+        except ValueError:
+            skipped += 1
+            continue
+        user = match["user"] if match["user"] != "-" else None
+        if user is None:
+            claimed = ACCESS_LOG_CLAIMED.search(line)
+            if claimed and claimed["claimed"] != "-":
+                user = CLAIMED_PREFIX + unquote(claimed["claimed"])
+        yield classify(match["method"], match["url"]), when, user, match["ip"]
+    if skipped:
+        logger.warning(f"⚠️ Skipped {skipped} access log lines not in the access log format")
+
+def replay_access_log(path: str, detector: Optional[ActivityDetector] = None) -> ActivityDetector:
+    detector = detector or ActivityDetector()
+    with open(path, encoding="utf-8", errors="replace") as log:
+        processed = detector.replay(read_access_log(log))
+    logger.info(f"📜 Replayed {processed} access log events, {detector.stats['flags']} bursts flagged")
+    return detector
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay an Express access log through the TripWell burst detector")
+    parser.add_argument('log', help="Access log written by index.js (TRIPWELL_ACCESS_LOG)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    detector = replay_access_log(args.log)
+    print(json.dumps({"stats": detector.stats, "suspicious_activities": detector.suspicious_activities()}, indent=2))
+
+if __name__ == "__main__":
+    main()
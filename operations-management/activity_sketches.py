@@ -0,0 +1,269 @@
+"""
+TripWell Activity Sketches
+==========================
+
+Per-day HyperLogLog sketches of distinct users and trips:
+- active_users: users who signed up, updated their profile, created or joined
+  a trip, saved selections, updated a live trip or completed a trip that day
+- trip_engaged_users: the subset whose activity touched a trip
+- engaged_trips: trips created, edited, selected on or live-updated that day
+
+One document per metric and UTC day lives in operationsactivitysketches.
+Distinct counts over any window are the union (register-wise max) of that
+window's day sketches, with a relative standard error of 1.04/sqrt(2^precision)
+(about 0.8% at the default precision), instead of a distinct scan over raw events:
+
+    python activity_sketches.py backfill [--start 2025-01-01] [--end 2025-07-01]
+    python activity_sketches.py update
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from data_access import TripWellDataAccess, get_data_access, parse_date_range
+from report_cache import ReportCache, get_report_cache
+
+logger = logging.getLogger(__name__)
+
+SKETCH_MODEL = "ActivitySketch"
+METRICS = ("active_users", "trip_engaged_users", "engaged_trips")
+DEFAULT_PRECISION = 14
+DAY_FORMAT = "%Y-%m-%d"
+# Days built per pass, so a backfill holds a bounded number of sketches in memory
+BUILD_CHUNK_DAYS = 31
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class HyperLogLog:
+    """Mergeable distinct counter over 2^precision one-byte registers"""
+
+    _INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        self.precision = precision
+        self.registers = bytearray(registers) if registers else bytearray(1 << precision)
+
+    @property
+    def standard_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, item) -> None:
+        hashed = int.from_bytes(hashlib.blake2b(str(item).encode(), digest_size=8).digest(), "big")
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Union in place; both sketches must share a precision"""
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge precision {other.precision} into {self.precision}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / sum(self._INVERSE_POWERS[r] for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate while many registers are still empty
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+class ActivitySketches:
+    """Build, refresh and union the per-day sketch documents"""
+
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None, precision: int = DEFAULT_PRECISION,
+                 report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.precision = precision
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+
+    @property
+    def collection(self):
+        return self.data.collection(SKETCH_MODEL)
+
+    def _user_ids(self) -> Dict[str, str]:
+        """firebaseId -> user _id, for collections keyed by the Firebase uid"""
+        return {user["firebaseId"]: str(user["_id"])
+                for user in self.data.find("TripWellUser", {"firebaseId": {"$ne": None}}, ["_id", "firebaseId"])}
+
+    def _events(self, start: datetime, end: datetime, user_ids: Dict[str, str]) -> Iterable[Tuple[datetime, Optional[str], Optional[str]]]:
+        """(when, user _id, trip _id) for every activity in [start, end); either id may be None"""
+        window = {"$gte": start, "$lt": end}
+
+        def user(value):
+            return user_ids.get(value, value) if value is not None else None
+
+        def trip(value):
+            return str(value) if value is not None else None
+
+        for doc in self.data.find("TripWellUser", {"$or": [{"createdAt": window}, {"updatedAt": window}]},
+                                  ["_id", "createdAt", "updatedAt"]):
+            yield doc.get("createdAt"), str(doc["_id"]), None
+            yield doc.get("updatedAt"), str(doc["_id"]), None
+        for doc in self.data.find("TripBase", {"$or": [{"createdAt": window}, {"updatedAt": window}]},
+                                  ["_id", "createdAt", "updatedAt"]):
+            yield doc.get("createdAt"), None, str(doc["_id"])
+            yield doc.get("updatedAt"), None, str(doc["_id"])
+        for doc in self.data.find("JoinCode", {"createdAt": window}, ["userId", "tripId", "createdAt"]):
+            yield doc.get("createdAt"), user(str(doc.get("userId"))), trip(doc.get("tripId"))
+        for doc in self.data.find("UserSelections", {"updatedAt": window}, ["userId", "tripId", "createdAt", "updatedAt"]):
+            yield doc.get("createdAt"), user(doc.get("userId")), trip(doc.get("tripId"))
+            yield doc.get("updatedAt"), user(doc.get("userId")), trip(doc.get("tripId"))
+        for doc in self.data.find("TripCurrentDays", {"updatedAt": window}, ["userId", "tripId", "updatedAt"]):
+            yield doc.get("updatedAt"), user(str(doc.get("userId"))), trip(doc.get("tripId"))
+        for doc in self.data.find("TripComplete", {"tripCompletedAt": window},
+                                  ["originatorId", "participantId", "originalTripId", "tripCompletedAt"]):
+            for role in ("originatorId", "participantId"):
+                if doc.get(role) is not None:
+                    yield doc.get("tripCompletedAt"), str(doc[role]), trip(doc.get("originalTripId"))
+
+    def build(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """
+        Recompute the day sketches in [start, end), BUILD_CHUNK_DAYS at a time
+
+        Args:
+            start: First day to rebuild (None for the first signup)
+            end: Exclusive end (None for now)
+
+        Returns:
+            Number of sketch documents written
+        """
+        end = end or datetime.utcnow()
+        if start is None:
+            first = self.data.find("TripWellUser", {"createdAt": {"$ne": None}}, ["createdAt"], sort=[("createdAt", 1)])
+            first = next(iter(first), None)
+            start = first["createdAt"] if first else end
+        start = _day_start(start)
+        user_ids = self._user_ids()
+        written = 0
+        while start < end:
+            stop = min(start + timedelta(days=BUILD_CHUNK_DAYS), end)
+            days = {}
+            cursor = start
+            # Every day in the chunk is written, so days with no activity overwrite stale sketches
+            while cursor < stop:
+                days[cursor.strftime(DAY_FORMAT)] = {metric: HyperLogLog(self.precision) for metric in METRICS}
+                cursor += timedelta(days=1)
+            for when, user_id, trip_id in self._events(start, stop, user_ids):
+                if when is None or not start <= when < stop:
+                    continue
+                sketches = days[when.strftime(DAY_FORMAT)]
+                if user_id:
+                    sketches["active_users"].add(user_id)
+                    if trip_id:
+                        sketches["trip_engaged_users"].add(user_id)
+                if trip_id:
+                    sketches["engaged_trips"].add(trip_id)
+            now = datetime.utcnow()
+            for key, sketches in days.items():
+                for metric, sketch in sketches.items():
+                    self.collection.replace_one({"_id": f"{metric}:{key}"}, {
+                        "_id": f"{metric}:{key}",
+                        "metric": metric,
+                        "date": datetime.strptime(key, DAY_FORMAT),
+                        "precision": sketch.precision,
+                        "registers": bytes(sketch.registers),
+                        "updated_at": now
+                    }, upsert=True)
+                    written += 1
+            start = stop
+        logger.info(f"🧮 Wrote {written} activity sketches")
+        return written
+
+    def backfill(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """Rebuild sketches from history (all of it unless start/end narrow the window)"""
+        logger.info("🗄️ Backfilling activity sketches")
+        return self._refreshed(self.build(start, end))
+
+    def _refreshed(self, written: int) -> int:
+        """Drop cached reports that were computed from the sketches just replaced"""
+        if written:
+            self.report_cache.on_new_users()
+            self.report_cache.on_new_trips()
+        return written
+
+    def last_day(self) -> Optional[datetime]:
+        newest = self.collection.find_one({}, {"date": 1}, sort=[("date", -1)])
+        return newest["date"] if newest else None
+
+    def covers(self, date_range: Optional[Dict]) -> bool:
+        """True when the sketches reach the last day of date_range (today, when it is open-ended)"""
+        last = self.last_day()
+        if last is None:
+            return False
+        _, end = parse_date_range(date_range)
+        now = datetime.utcnow()
+        # end is exclusive, so a range ending at midnight needs the day before
+        return last >= _day_start(min(end or now, now) - timedelta(microseconds=1))
+
+    def update(self) -> int:
+        """Refresh from the newest sketch day (which may have been partial) through today"""
+        last = self.last_day()
+        if last is None:
+            return self.backfill()
+        return self._refreshed(self.build(min(last, _day_start(datetime.utcnow()))))
+
+    def _sketches(self, metric: str, date_range: Optional[Dict]) -> Iterable[Tuple[datetime, HyperLogLog]]:
+        start, end = parse_date_range(date_range)
+        query = {"metric": metric}
+        if start or end:
+            query["date"] = {}
+            if start:
+                query["date"]["$gte"] = _day_start(start)
+            if end:
+                query["date"]["$lt"] = end
+        for doc in self.collection.find(query, {"date": 1, "precision": 1, "registers": 1}).sort("date", 1):
+            yield doc["date"], HyperLogLog(doc.get("precision", DEFAULT_PRECISION), doc["registers"])
+
+    def distinct(self, metric: str, date_range: Optional[Dict] = None) -> Dict:
+        """
+        Distinct count of one metric over date_range, from the union of its day sketches
+
+        Returns:
+            Dict with "estimate", "standard_error" (relative), "days" (sketches merged)
+            and a 95% "interval"
+        """
+        union, days = HyperLogLog(self.precision), 0
+        for _, sketch in self._sketches(metric, date_range):
+            union.merge(sketch)
+            days += 1
+        estimate = union.count()
+        margin = 2 * union.standard_error * estimate
+        return {
+            "estimate": estimate,
+            "standard_error": round(union.standard_error, 4),
+            "days": days,
+            "interval": [max(round(estimate - margin), 0), round(estimate + margin)]
+        }
+
+    def daily(self, metric: str, date_range: Optional[Dict] = None) -> List[Dict]:
+        """Per-day distinct counts of one metric"""
+        return [{"date": day.strftime(DAY_FORMAT), "estimate": sketch.count()}
+                for day, sketch in self._sketches(metric, date_range)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain TripWell per-day activity sketches")
+    parser.add_argument('command', choices=['backfill', 'update'])
+    parser.add_argument('--start', help="First day to backfill (YYYY-MM-DD, default: first signup)")
+    parser.add_argument('--end', help="Exclusive end day for backfill (YYYY-MM-DD, default: now)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sketches = ActivitySketches()
+    if args.command == 'backfill':
+        start, end = parse_date_range({"start": args.start, "end": args.end})
+        written = sketches.backfill(start, end)
+    else:
+        written = sketches.update()
+    print(f"✅ {written} activity sketches written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+TripWell Daily Rollups
+======================
+
+Materialized per-day aggregates behind the date_range reports:
+- Signups and profile completions (by signup day)
+- Trips created, trip-days booked and per-city trip counts
+- Trips completed and cancelled (by tripCompletedAt)
+
+One document per UTC day lives in the operationsdailyrollups collection, so
+any day-aligned date range is a sum over a few hundred small rows instead of
+a rescan of users and trips. Profile completions are a signup-cohort count: a
+user who completes their profile later is counted on their signup day, like
+the raw report query. `update` refreshes the days since the newest rollup and
+re-rolls earlier days whose users or trips were edited since the last refresh;
+`backfill` rebuilds them from history:
+
+    python daily_rollups.py backfill [--start 2025-01-01] [--end 2025-07-01]
+    python daily_rollups.py update
+"""
+
+import argparse
+import logging
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+
+from data_access import TripWellDataAccess, get_data_access, parse_date_range
+from report_cache import ReportCache, get_report_cache
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_MODEL = "DailyRollup"
+COUNT_FIELDS = ("signups", "profile_completions", "trips_created", "trip_days", "trips_completed", "trips_cancelled")
+DAY_FORMAT = "%Y-%m-%d"
+
+def _day_key(field: str) -> Dict:
+    return {"$dateToString": {"format": DAY_FORMAT, "date": f"${field}"}}
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class DailyRollups:
+    """Build, refresh and query the per-day rollup documents"""
+
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None, report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+
+    @property
+    def collection(self):
+        return self.data.collection(ROLLUP_MODEL)
+
+    def _window(self, field: str, start: Optional[datetime], end: Optional[datetime]) -> Dict:
+        bounds = {"$ne": None}
+        if start:
+            bounds["$gte"] = start
+        if end:
+            bounds["$lt"] = end
+        return {field: bounds}
+
+    def build(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """
+        Recompute every rollup day in [start, end) with one day-grouped pipeline per collection
+
+        Args:
+            start: First day to rebuild (None for the beginning of history)
+            end: Exclusive end (None for now)
+
+        Returns:
+            Number of rollup documents written
+        """
+        start = _day_start(start) if start else None
+        days: Dict[str, Dict] = {}
+
+        def day(key):
+            if key not in days:
+                days[key] = {field: 0 for field in COUNT_FIELDS}
+                days[key]["cities"] = []
+            return days[key]
+
+        for row in self.data.aggregate("TripWellUser", [
+            {"$match": self._window("createdAt", start, end)},
+            {"$group": {
+                "_id": _day_key("createdAt"),
+                "signups": {"$sum": 1},
+                "profile_completions": {"$sum": {"$cond": [{"$eq": ["$profileComplete", True]}, 1, 0]}}
+            }}
+        ]):
+            day(row["_id"]).update(signups=row["signups"], profile_completions=row["profile_completions"])
+
+        for row in self.data.aggregate("TripBase", [
+            {"$match": self._window("createdAt", start, end)},
+            {"$group": {
+                "_id": {"day": _day_key("createdAt"), "city": "$city", "country": "$country"},
+                "count": {"$sum": 1},
+                "trip_days": {"$sum": {"$ifNull": ["$daysTotal", 0]}}
+            }}
+        ]):
+            rollup = day(row["_id"]["day"])
+            rollup["trips_created"] += row["count"]
+            rollup["trip_days"] += row["trip_days"]
+            rollup["cities"].append({"city": row["_id"].get("city"), "country": row["_id"].get("country"), "count": row["count"]})
+
+        for row in self.data.aggregate("TripComplete", [
+            {"$match": self._window("tripCompletedAt", start, end)},
+            {"$group": {"_id": {"day": _day_key("tripCompletedAt"), "reason": "$completionReason"}, "count": {"$sum": 1}}}
+        ]):
+            field = {"completed": "trips_completed", "cancelled": "trips_cancelled"}.get(row["_id"].get("reason"))
+            if field:
+                day(row["_id"]["day"])[field] += row["count"]
+
+        # Days inside the window with no activity get explicit zero rows so stale counts are overwritten
+        if start:
+            cursor, stop = start, end or datetime.utcnow()
+            while cursor < stop:
+                day(cursor.strftime(DAY_FORMAT))
+                cursor += timedelta(days=1)
+
+        now = datetime.utcnow()
+        for key, rollup in days.items():
+            rollup["cities"].sort(key=lambda c: -c["count"])
+            self.collection.replace_one(
+                {"_id": key},
+                {"_id": key, "date": datetime.strptime(key, DAY_FORMAT), **rollup, "updated_at": now},
+                upsert=True
+            )
+        logger.info(f"🧮 Wrote {len(days)} daily rollups")
+        return len(days)
+
+    def backfill(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+        """Rebuild rollups from history (all of it unless start/end narrow the window)"""
+        logger.info("🗄️ Backfilling daily rollups")
+        return self._refreshed(self.build(start, end))
+
+    def _refreshed(self, written: int) -> int:
+        """Drop cached reports that were computed from the rows just replaced"""
+        if written:
+            self.report_cache.on_new_users()
+            self.report_cache.on_new_trips()
+        return written
+
+    def last_day(self) -> Optional[datetime]:
+        newest = self.collection.find_one({}, {"date": 1}, sort=[("date", -1)])
+        return newest["date"] if newest else None
+
+    def _edited_days(self, since: datetime, before: datetime) -> List[datetime]:
+        """Signup and trip creation days before `before` of users and trips edited since `since`"""
+        keys = set()
+        for model in ("TripWellUser", "TripBase"):
+            for row in self.data.aggregate(model, [
+                {"$match": {"updatedAt": {"$gte": since}, "createdAt": {"$ne": None, "$lt": before}}},
+                {"$group": {"_id": _day_key("createdAt")}}
+            ]):
+                keys.add(row["_id"])
+        return [datetime.strptime(key, DAY_FORMAT) for key in sorted(keys)]
+
+    def update(self) -> int:
+        """
+        Refresh from the newest rollup day (which may have been partial) through today, then
+        re-roll earlier days whose users or trips changed since the last refresh (e.g. a
+        profile completed weeks after signup)
+        """
+        newest = self.collection.find_one({}, {"date": 1, "updated_at": 1}, sort=[("date", -1)])
+        if newest is None:
+            return self.backfill()
+        written = self.build(min(newest["date"], _day_start(datetime.utcnow())))
+        for day in self._edited_days(newest.get("updated_at", newest["date"]), newest["date"]):
+            written += self.build(day, day + timedelta(days=1))
+        return self._refreshed(written)
+
+    def covers(self, date_range: Optional[Dict]) -> bool:
+        """
+        True when the rollups answer date_range exactly: both ends fall on UTC day
+        boundaries, the rows start by its start and run (and were refreshed) through its end
+        """
+        start, end = parse_date_range(date_range)
+        if start is None or end is None or start != _day_start(start) or end != _day_start(end):
+            return False
+        first = self.collection.find_one({}, {"date": 1}, sort=[("date", 1)])
+        newest = self.collection.find_one({}, {"date": 1, "updated_at": 1}, sort=[("date", -1)])
+        if not first or first["date"] > start:
+            return False
+        covered_until = min(newest.get("updated_at", newest["date"]), newest["date"] + timedelta(days=1))
+        return covered_until >= end
+
+    def rows(self, date_range: Optional[Dict] = None) -> List[Dict]:
+        """Rollup rows for the days date_range touches (whole days; see covers)"""
+        start, end = parse_date_range(date_range)
+        query = {}
+        if start or end:
+            query["date"] = {}
+            if start:
+                query["date"]["$gte"] = _day_start(start)
+            if end:
+                query["date"]["$lt"] = end
+        return list(self.collection.find(query, {"updated_at": 0}).sort("date", 1))
+
+    def totals(self, date_range: Optional[Dict] = None, top_cities: int = 10) -> Dict:
+        """
+        Sum the rollup rows covering date_range
+
+        Returns:
+            Dict with every count field, "days" (rows summed) and "popular_destinations"
+        """
+        totals = {field: 0 for field in COUNT_FIELDS}
+        cities: Dict[tuple, int] = {}
+        rows = self.rows(date_range)
+        for row in rows:
+            for field in COUNT_FIELDS:
+                totals[field] += row.get(field, 0)
+            for city in row.get("cities", []):
+                key = (city.get("city"), city.get("country"))
+                cities[key] = cities.get(key, 0) + city["count"]
+        totals["days"] = len(rows)
+        totals["popular_destinations"] = [
+            {"city": city, "country": country, "count": count}
+            for (city, country), count in sorted(cities.items(), key=lambda item: -item[1])[:top_cities]
+        ]
+        return totals
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain TripWell daily report rollups")
+    parser.add_argument('command', choices=['backfill', 'update'])
+    parser.add_argument('--start', help="First day to backfill (YYYY-MM-DD, default: beginning of history)")
+    parser.add_argument('--end', help="Exclusive end day for backfill (YYYY-MM-DD, default: now)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rollups = DailyRollups()
+    if args.command == 'backfill':
+        start, end = parse_date_range({"start": args.start, "end": args.end})
+        written = rollups.backfill(start, end)
+    else:
+        written = rollups.update()
+    print(f"✅ {written} daily rollups written")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+TripWell Operations Data Access
+===============================
+
+Shared MongoDB access for the operations-management services:
+- One pooled MongoClient per process, reused by every report
+- Projection-limited cursors so reports only fetch the fields they use
+- Server-side aggregation helpers (counts, top values)
+- Swappable client for local testing against mongomock or a local mongod
+
+Connection settings follow config/db.js: MONGO_URI for the cluster and the
+GoFastFamily database unless MONGO_DB_NAME overrides it.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Iterable, Tuple
+from datetime import datetime, timezone
+
+try:
+    from pymongo import MongoClient
+except ImportError:
+    MongoClient = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_NAME = "GoFastFamily"
+DEFAULT_MAX_POOL_SIZE = 20
+DEFAULT_BATCH_SIZE = 1000
+
+# Mongoose model name -> collection name (Mongoose lowercases and pluralizes model names)
+COLLECTIONS = {
+    "TripWellUser": "tripwellusers",
+    "TripBase": "tripbases",
+    "TripComplete": "tripcompletes",
+    "JoinCode": "joincodes",
+    "UserSelections": "userselections",
+    "PersonaScore": "personascores",
+    "TripCurrentDays": "tripcurrentdays",
+    # Written by the operations services themselves
+    "DailyRollup": "operationsdailyrollups",
+    "DestinationTrends": "operationsdestinationtrends",
+    "ActivitySketch": "operationsactivitysketches"
+}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Return this process's pooled client, creating it on first use (and again after a fork)"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            if MongoClient is None:
+                raise RuntimeError("pymongo is required for operations reports: pip install pymongo")
+            _client = MongoClient(
+                os.environ.get("MONGO_URI", "mongodb://localhost:27017"),
+                maxPoolSize=int(os.environ.get("MONGO_MAX_POOL_SIZE", DEFAULT_MAX_POOL_SIZE)),
+                connect=False
+            )
+            _client_pid = os.getpid()
+            logger.info("🔌 MongoDB client created")
+        return _client
+
+def set_client(client) -> None:
+    """Use the given client for this process, e.g. mongomock.MongoClient() in local tests"""
+    global _client, _client_pid
+    with _client_lock:
+        _client = client
+        _client_pid = os.getpid()
+
+def close_client() -> None:
+    """Close the pooled client; the next report opens a fresh one"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+def _as_datetime(value) -> Optional[datetime]:
+    if value is None:
+        return None
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    # Stored dates are naive UTC, so offsets are converted rather than dropped
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def parse_date_range(date_range: Optional[Dict] = None) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Normalize a report date_range
+
+    Args:
+        date_range: Optional {"start": ..., "end": ...} with datetimes or ISO strings; end is exclusive
+
+    Returns:
+        (start, end) tuple, either side None when open
+    """
+    if not date_range:
+        return None, None
+    return _as_datetime(date_range.get("start")), _as_datetime(date_range.get("end"))
+
+def date_filter(field: str, date_range: Optional[Dict] = None) -> Dict:
+    """Mongo filter selecting documents whose field falls inside date_range"""
+    start, end = parse_date_range(date_range)
+    bounds = {}
+    if start:
+        bounds["$gte"] = start
+    if end:
+        bounds["$lt"] = end
+    return {field: bounds} if bounds else {}
+
+def projection(fields: Optional[Iterable[str]] = None) -> Optional[Dict]:
+    """Projection for the listed fields; _id is only returned when asked for"""
+    if fields is None:
+        return None
+    fields = list(fields)
+    spec = {field: 1 for field in fields}
+    if "_id" not in fields:
+        spec["_id"] = 0
+    return spec
+
+class TripWellDataAccess:
+    """Access to the TripWell collections used by the operations reports"""
+
+    def __init__(self, client=None, db_name: Optional[str] = None):
+        self._client = client
+        self.db_name = db_name or os.environ.get("MONGO_DB_NAME", DEFAULT_DB_NAME)
+
+    @property
+    def db(self):
+        return (self._client or get_client())[self.db_name]
+
+    @property
+    def source(self) -> str:
+        """Which database this reads: the db name, plus the client when one was passed in"""
+        return self.db_name if self._client is None else f"{self.db_name}@{id(self._client):x}"
+
+    def collection(self, model: str):
+        return self.db[COLLECTIONS[model]]
+
+    def find(self, model: str, query: Optional[Dict] = None, fields: Optional[Iterable[str]] = None,
+             sort: Optional[List] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Cursor over a collection that only returns the requested fields
+
+        Args:
+            model: Mongoose model name, e.g. "TripWellUser"
+            query: Mongo filter
+            fields: Fields to fetch (None fetches whole documents)
+            sort: Optional [(field, direction)] list
+            batch_size: Documents per server round trip
+
+        Returns:
+            Lazily evaluated cursor
+        """
+        cursor = self.collection(model).find(query or {}, projection(fields), batch_size=batch_size)
+        if sort:
+            cursor = cursor.sort(sort)
+        return cursor
+
+    def count(self, model: str, query: Optional[Dict] = None) -> int:
+        return self.collection(model).count_documents(query or {})
+
+    def aggregate(self, model: str, pipeline: List[Dict]) -> List[Dict]:
+        """Run an aggregation pipeline on the server and return its (small) result"""
+        return list(self.collection(model).aggregate(pipeline, allowDiskUse=True))
+
+    def top_values(self, model: str, fields: List[str], query: Optional[Dict] = None, limit: int = 10) -> List[Dict]:
+        """Most frequent value combinations of fields, e.g. [{"city": ..., "country": ..., "count": n}]"""
+        pipeline = [
+            {"$match": query or {}},
+            {"$group": {"_id": {field: f"${field}" for field in fields}, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": limit}
+        ]
+        return [{**row["_id"], "count": row["count"]} for row in self.aggregate(model, pipeline)]
+
+    def average(self, model: str, field: str, query: Optional[Dict] = None) -> float:
+        """Server-side mean of a numeric field (0.0 when nothing matches)"""
+        pipeline = [
+            {"$match": {**(query or {}), field: {"$ne": None}}},
+            {"$group": {"_id": None, "average": {"$avg": f"${field}"}}}
+        ]
+        rows = self.aggregate(model, pipeline)
+        return float(rows[0]["average"] or 0.0) if rows else 0.0
+
+_shared = None
+
+def get_data_access() -> TripWellDataAccess:
+    """Process-wide data access object used by default by every operations service"""
+    global _shared
+    if _shared is None:
+        _shared = TripWellDataAccess()
+    return _shared
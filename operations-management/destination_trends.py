@@ -0,0 +1,268 @@
+"""
+TripWell Destination Trends
+===========================
+
+Bounded-memory destination popularity over TripBase city/country/season:
+- A Space-Saving top-K sketch per daily, weekly and monthly bucket, plus one per season
+- Only the newest buckets are kept, so memory stays flat as trips accumulate
+- Growth is scored by comparing the latest calendar window (the last whole periods
+  before the current one) with the window before it; with no trips in the earlier
+  window there is no growth figure
+- State (sketches plus a createdAt/_id watermark) is persisted in MongoDB, so each
+  run only streams trips created since the previous run
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from data_access import TripWellDataAccess
+
+logger = logging.getLogger(__name__)
+
+TRENDS_MODEL = "DestinationTrends"
+STATE_ID = "destination_popularity"
+SKETCH_CAPACITY = 100
+# Buckets per growth window and buckets kept, by time_period
+WINDOWS = {"daily": 7, "weekly": 4, "monthly": 3}
+BUCKETS_KEPT = {"daily": 28, "weekly": 16, "monthly": 12}
+MIN_GROWTH_SUPPORT = 3
+GROWTH_SMOOTHING = 1.0
+
+def bucket_key(when: datetime, time_period: str) -> str:
+    if time_period == "daily":
+        return when.strftime("%Y-%m-%d")
+    if time_period == "weekly":
+        year, week, _ = when.isocalendar()
+        return f"{year}-W{week:02d}"
+    return when.strftime("%Y-%m")
+
+def period_start(when: datetime, time_period: str) -> datetime:
+    """Start of the daily, weekly (ISO, Monday) or monthly period holding when"""
+    day = when.replace(hour=0, minute=0, second=0, microsecond=0)
+    if time_period == "daily":
+        return day
+    if time_period == "weekly":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+def periods_before(start: datetime, time_period: str, count: int) -> datetime:
+    """Start of the period `count` periods before the one beginning at start"""
+    if time_period == "daily":
+        return start - timedelta(days=count)
+    if time_period == "weekly":
+        return start - timedelta(weeks=count)
+    months = start.year * 12 + start.month - 1 - count
+    return start.replace(year=months // 12, month=months % 12 + 1)
+
+class SpaceSaving:
+    """Space-Saving top-K counter: estimates never undercount, overcount by at most `error`"""
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.total = 0
+
+    def add(self, item: str, count: int = 1) -> None:
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            return
+        # Replace the smallest counter; the newcomer inherits its count as error
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        self.errors.pop(victim)
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+
+    def floor(self) -> int:
+        """Upper bound on the count of any item the sketch does not hold (0 until it is full)"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Combined sketch of two streams, trimmed back to capacity"""
+        merged = SpaceSaving(max(self.capacity, other.capacity))
+        merged.total = self.total + other.total
+        for sketch, rest in ((self, other), (other, self)):
+            floor = rest.floor()
+            for item, count in sketch.counts.items():
+                if item in merged.counts:
+                    continue
+                # An item one side dropped may still have had up to that side's floor there
+                merged.counts[item] = count + rest.counts.get(item, floor)
+                merged.errors[item] = sketch.errors[item] + rest.errors.get(item, floor)
+        for item in sorted(merged.counts, key=merged.counts.get)[:max(len(merged.counts) - merged.capacity, 0)]:
+            del merged.counts[item]
+            del merged.errors[item]
+        return merged
+
+    def estimate(self, item: str) -> int:
+        return self.counts.get(item, 0)
+
+    def top(self, n: int = 10) -> List[Tuple[str, int, int]]:
+        """[(item, estimated count, max overcount)] by estimated count"""
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:n]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def to_state(self) -> Dict:
+        # Items are stored as list entries, not keys: city names may contain dots
+        return {"capacity": self.capacity, "total": self.total,
+                "items": [[item, count, self.errors[item]] for item, count in self.counts.items()]}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "SpaceSaving":
+        sketch = cls(state.get("capacity", SKETCH_CAPACITY))
+        sketch.total = state.get("total", 0)
+        for item, count, error in state.get("items", []):
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        return sketch
+
+class DestinationTrends:
+    """Persisted per-bucket sketches and the watermark of the last trip folded in"""
+
+    def __init__(self):
+        self.buckets: Dict[str, Dict[str, SpaceSaving]] = {period: {} for period in WINDOWS}
+        self.seasons: Dict[str, SpaceSaving] = {}
+        self.watermark: Optional[Tuple[datetime, object]] = None
+        self.version = 0
+
+    @classmethod
+    def load(cls, data: TripWellDataAccess) -> "DestinationTrends":
+        trends = cls()
+        state = data.collection(TRENDS_MODEL).find_one({"_id": STATE_ID})
+        if not state:
+            return trends
+        for period in WINDOWS:
+            trends.buckets[period] = {key: SpaceSaving.from_state(sketch)
+                                      for key, sketch in state.get("buckets", {}).get(period, [])}
+        trends.seasons = {season: SpaceSaving.from_state(sketch) for season, sketch in state.get("seasons", [])}
+        if state.get("watermark"):
+            trends.watermark = (state["watermark"]["createdAt"], state["watermark"]["_id"])
+        trends.version = state.get("version", 0)
+        return trends
+
+    def save(self, data: TripWellDataAccess) -> bool:
+        """Persist unless another run saved first (optimistic check on version)"""
+        state = {
+            "_id": STATE_ID,
+            "version": self.version + 1,
+            "buckets": {period: [[key, sketch.to_state()] for key, sketch in sorted(buckets.items())]
+                        for period, buckets in self.buckets.items()},
+            "seasons": [[season, sketch.to_state()] for season, sketch in self.seasons.items()],
+            "watermark": {"createdAt": self.watermark[0], "_id": self.watermark[1]} if self.watermark else None,
+            "updated_at": datetime.utcnow()
+        }
+        try:
+            result = data.collection(TRENDS_MODEL).replace_one(
+                {"_id": STATE_ID, "version": self.version}, state, upsert=self.version == 0)
+        except Exception as e:
+            logger.warning(f"⚠️ Destination trends not saved: {e}")
+            return False
+        if not (result.matched_count or result.upserted_id):
+            logger.warning("⚠️ Destination trends changed underneath this run; keeping the stored state")
+            return False
+        self.version += 1
+        return True
+
+    def add_trip(self, trip: Dict) -> None:
+        created = trip.get("createdAt")
+        if not created or not trip.get("city"):
+            return
+        destination = ", ".join(part for part in (trip.get("city"), trip.get("country")) if part)
+        for period, buckets in self.buckets.items():
+            key = bucket_key(created, period)
+            if key not in buckets:
+                buckets[key] = SpaceSaving()
+                # Drop the oldest buckets beyond what growth scoring needs
+                for stale in sorted(buckets)[:max(len(buckets) - BUCKETS_KEPT[period], 0)]:
+                    del buckets[stale]
+            if key in buckets:
+                buckets[key].add(destination)
+        season = trip.get("season") or "unknown"
+        self.seasons.setdefault(season, SpaceSaving()).add(destination)
+        self.watermark = (created, trip.get("_id"))
+
+    def update(self, data: TripWellDataAccess) -> int:
+        """Fold in trips created since the watermark, then persist; returns trips processed"""
+        query = {"createdAt": {"$ne": None}}
+        if self.watermark:
+            created, trip_id = self.watermark
+            query = {"$or": [{"createdAt": {"$gt": created}}, {"createdAt": created, "_id": {"$gt": trip_id}}]}
+        processed = 0
+        for trip in data.find("TripBase", query, ["_id", "city", "country", "season", "createdAt"],
+                              sort=[("createdAt", 1), ("_id", 1)]):
+            self.add_trip(trip)
+            processed += 1
+        if processed:
+            self.save(data)
+        logger.info(f"🌍 Destination trends: {processed} new trips")
+        return processed
+
+    def _window(self, time_period: str, offset: int, now: datetime) -> SpaceSaving:
+        """
+        Merged sketch of one calendar growth window: offset 0 is the WINDOWS[time_period]
+        whole periods before the one holding now, 1 the same number of periods before those
+        """
+        size = WINDOWS[time_period]
+        current = period_start(now, time_period)
+        merged = SpaceSaving()
+        for back in range(size * offset + 1, size * (offset + 1) + 1):
+            sketch = self.buckets[time_period].get(bucket_key(periods_before(current, time_period, back), time_period))
+            if sketch:
+                merged = merged.merge(sketch)
+        return merged
+
+    def report(self, time_period: str = "monthly", limit: int = 10, now: Optional[datetime] = None) -> Dict:
+        """
+        Popularity and trend figures for one time_period (daily, weekly or monthly)
+
+        The still-filling current period is left out, so both windows span the same
+        number of whole periods and steady traffic scores no growth.
+
+        Args:
+            time_period: Bucket size
+            limit: Destinations per list
+            now: Reference time (UTC, default now)
+
+        Returns:
+            Dict with top, emerging, fastest growing and declining destinations, seasonal
+            figures and window totals; growth lists are empty and window_growth is None
+            while the previous window has no trips
+        """
+        time_period = time_period if time_period in WINDOWS else "monthly"
+        now = now or datetime.utcnow()
+        recent, previous = self._window(time_period, 0, now), self._window(time_period, 1, now)
+        has_baseline = previous.total > 0
+
+        growth = []
+        for destination, count, _ in recent.top(SKETCH_CAPACITY):
+            before = previous.estimate(destination)
+            if has_baseline and count >= MIN_GROWTH_SUPPORT:
+                growth.append((destination, count, before, (count - before) / (before + GROWTH_SMOOTHING)))
+        declining = [
+            (destination, recent.estimate(destination), before, (recent.estimate(destination) - before) / (before + GROWTH_SMOOTHING))
+            for destination, before, _ in previous.top(SKETCH_CAPACITY) if before >= MIN_GROWTH_SUPPORT
+        ]
+
+        def rows(entries):
+            return [{"destination": d, "trips": trips, "previous_trips": before, "growth": round(score, 3)}
+                    for d, trips, before, score in entries]
+
+        return {
+            "top_destinations": [{"destination": d, "trips": count, "max_overcount": error}
+                                 for d, count, error in recent.top(limit)],
+            "emerging_destinations": rows(sorted((g for g in growth if g[2] == 0), key=lambda g: -g[1])[:limit]),
+            "fastest_growing_destinations": rows(sorted((g for g in growth if g[3] > 0), key=lambda g: -g[3])[:limit]),
+            "declining_destinations": rows(sorted((d for d in declining if d[3] < 0), key=lambda d: d[3])[:limit]),
+            "seasonal_trends": {season: sketch.total for season, sketch in sorted(self.seasons.items())},
+            "seasonal_patterns": {season: [d for d, _, _ in sketch.top(5)] for season, sketch in sorted(self.seasons.items())},
+            "window_trips": recent.total,
+            "previous_window_trips": previous.total,
+            "window_growth": round((recent.total - previous.total) / previous.total, 3) if has_baseline else None
+        }
@@ -0,0 +1,184 @@
+"""
+TripWell Conversion Funnel Engine
+=================================
+
+Single-pass signup -> profile -> trip -> completion funnel:
+- TripWellUser, JoinCode and TripComplete are streamed once, each sorted by user
+- The three streams are merge-joined on user id, so no per-stage queries run
+- Each user's furthest stage and per-stage timestamps go into compact arrays
+
+Every ratio, drop-off point and time-to-stage distribution comes from those
+arrays. Reaching a stage implies the earlier ones (a trip means the profile
+step was passed). Profile completion has no timestamp of its own, so it uses
+the profile's updatedAt capped at the first trip.
+"""
+
+import heapq
+import logging
+import math
+from array import array
+from typing import Dict, Iterator, List, Optional
+from datetime import datetime
+
+from data_access import TripWellDataAccess
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("signup", "profile", "trip", "completion")
+SIGNUP, PROFILE, TRIP, COMPLETION = range(len(STAGES))
+
+def _timestamp(value: Optional[datetime]) -> float:
+    return value.timestamp() if value else math.nan
+
+def _group_by_user(cursor, field: str) -> Iterator:
+    """Yield (user id, [docs]) from a cursor sorted by field"""
+    current, docs = None, []
+    for doc in cursor:
+        key = doc.get(field)
+        if key is None:
+            continue
+        if docs and key != current:
+            yield current, docs
+            docs = []
+        current = key
+        docs.append(doc)
+    if docs:
+        yield current, docs
+
+def _completions_by(data: TripWellDataAccess, role: str) -> Iterator[Dict]:
+    """
+    Completed trips as {"userId", "tripCompletedAt"} docs sorted by the given role's user id,
+    then completion time; tripCompletedAt is None when missing (MongoDB sorts those first)
+    """
+    cursor = data.find("TripComplete", {"completionReason": "completed", role: {"$ne": None}},
+                       [role, "tripCompletedAt"], sort=[(role, 1), ("tripCompletedAt", 1)])
+    for trip in cursor:
+        yield {"userId": trip[role], "tripCompletedAt": trip.get("tripCompletedAt")}
+
+def _completion_order(doc: Dict):
+    # Same order as the cursors: missing completion times first, then by time
+    at = doc["tripCompletedAt"]
+    return doc["userId"], at is not None, at or datetime.min
+
+class FunnelEngine:
+    """Per-user furthest stage (array('b')) and stage timestamps (array('d'), NaN when unknown)"""
+
+    def __init__(self):
+        self.furthest = array('b')
+        self.stamps = array('d')
+
+    def add_user(self, signup: Optional[datetime], profile_complete: bool = False,
+                 profile_at: Optional[datetime] = None, has_trip: bool = False,
+                 first_trip_at: Optional[datetime] = None, completed_at: Optional[datetime] = None,
+                 completed: bool = False) -> None:
+        stage = SIGNUP
+        if profile_complete:
+            stage = PROFILE
+        if has_trip or first_trip_at:
+            stage = TRIP
+        if completed or completed_at:
+            stage = COMPLETION
+        if first_trip_at and (profile_at is None or profile_at > first_trip_at):
+            profile_at = first_trip_at
+        self.furthest.append(stage)
+        self.stamps.extend((
+            _timestamp(signup),
+            _timestamp(profile_at) if stage >= PROFILE else math.nan,
+            _timestamp(first_trip_at),
+            _timestamp(completed_at)
+        ))
+
+    @classmethod
+    def from_data(cls, data: TripWellDataAccess) -> "FunnelEngine":
+        """Build the funnel from one sorted pass over users, join codes and completed trips"""
+        engine = cls()
+        trips = _group_by_user(
+            data.find("JoinCode", {}, ["userId", "createdAt"], sort=[("userId", 1), ("createdAt", 1)]), "userId")
+        # Originators and participants are two sorted cursors merged into one per-user stream
+        completions = _group_by_user(heapq.merge(
+            _completions_by(data, "originatorId"), _completions_by(data, "participantId"),
+            key=_completion_order
+        ), "userId")
+        next_trip = next(trips, None)
+        next_completion = next(completions, None)
+
+        for user in data.find("TripWellUser", {}, ["_id", "createdAt", "updatedAt", "profileComplete", "tripId"],
+                              sort=[("_id", 1)]):
+            user_id = user["_id"]
+            # Advance the secondary streams up to this user (ids of deleted users are skipped)
+            while next_trip is not None and next_trip[0] < user_id:
+                next_trip = next(trips, None)
+            while next_completion is not None and next_completion[0] < user_id:
+                next_completion = next(completions, None)
+
+            first_trip_at = completed_at = None
+            completed = False
+            if next_trip is not None and next_trip[0] == user_id:
+                first_trip_at = next_trip[1][0].get("createdAt")
+            if next_completion is not None and next_completion[0] == user_id:
+                # A completion without a time still counts; its time-to-stage is unknown
+                completed = True
+                completed_at = next((doc["tripCompletedAt"] for doc in next_completion[1] if doc["tripCompletedAt"]), None)
+            engine.add_user(user.get("createdAt"), bool(user.get("profileComplete")), user.get("updatedAt"),
+                            user.get("tripId") is not None, first_trip_at, completed_at, completed)
+        logger.info(f"🧮 Funnel built for {len(engine)} users")
+        return engine
+
+    def __len__(self):
+        return len(self.furthest)
+
+    def reached(self) -> List[int]:
+        """Users that reached each stage"""
+        counts = [0] * len(STAGES)
+        for stage in self.furthest:
+            counts[stage] += 1
+        for stage in range(len(STAGES) - 2, -1, -1):
+            counts[stage] += counts[stage + 1]
+        return counts
+
+    def time_to_stage(self) -> Dict[str, Dict]:
+        """Hours from signup to each later stage: count, median and 90th percentile"""
+        durations = {stage: [] for stage in STAGES[1:]}
+        for i in range(len(self)):
+            signup = self.stamps[4 * i]
+            if math.isnan(signup):
+                continue
+            for stage in range(PROFILE, len(STAGES)):
+                at = self.stamps[4 * i + stage]
+                if not math.isnan(at):
+                    durations[STAGES[stage]].append(max(at - signup, 0.0) / 3600)
+        distribution = {}
+        for stage, hours in durations.items():
+            hours.sort()
+            distribution[stage] = {
+                "users": len(hours),
+                "median_hours": hours[len(hours) // 2] if hours else 0.0,
+                "p90_hours": hours[min(int(len(hours) * 0.9), len(hours) - 1)] if hours else 0.0
+            }
+        return distribution
+
+    def summary(self) -> Dict:
+        reached = self.reached()
+
+        def rate(to_stage):
+            return reached[to_stage] / reached[to_stage - 1] * 100 if reached[to_stage - 1] else 0.0
+
+        dropoffs = [
+            {
+                "from": STAGES[stage - 1],
+                "to": STAGES[stage],
+                "users_lost": reached[stage - 1] - reached[stage],
+                "dropoff_rate": 100 - rate(stage) if reached[stage - 1] else 0.0
+            }
+            for stage in range(PROFILE, len(STAGES))
+        ]
+        dropoffs.sort(key=lambda d: -d["dropoff_rate"])
+        return {
+            "signup_to_profile": rate(PROFILE),
+            "profile_to_trip": rate(TRIP),
+            "trip_to_completion": rate(COMPLETION),
+            "overall_conversion": reached[COMPLETION] / reached[SIGNUP] * 100 if reached[SIGNUP] else 0.0,
+            "funnel_dropoff_points": dropoffs,
+            "stage_counts": dict(zip(STAGES, reached)),
+            "time_to_stage": self.time_to_stage()
+        }
@@ -0,0 +1,211 @@
+"""
+TripWell Bulk Persona Scoring
+=============================
+
+Re-scores PersonaScore for the whole user base in one vectorized pass:
+- Profile picks (TripWellUser.persona / planningStyle) and selection behavior
+  (UserSelections behaviorData.metaPreferences, summed over the user's trips)
+  are loaded into NumPy arrays
+- Persona and planning weights for every user come out of a few matrix ops
+- Results go back with unordered bulk upserts, and lastAnalyzedAt is stamped
+
+The weighting is the one services/personaScoreService.js writes on profile save
+(calculationVersion "2.0"), since both write the same PersonaScore documents:
+- persona: 0.5 for the chosen persona plus 0.5 x that persona's share of the
+  user's metaPreferences
+- planning style: 0.5 for the chosen style, 0 otherwise
+findArtPeople & co read them with a 0.5 threshold, which a pick still meets on
+its own. A weighting change must land in both writers under a new
+SCORING_VERSION; score_user() is the per-user reference the tests hold both to.
+
+Only users whose profile or selections changed since lastAnalyzedAt, users never
+analyzed and users scored under another SCORING_VERSION are re-scored:
+
+    python persona_scoring.py [--all] [--dry-run]
+"""
+
+import argparse
+import logging
+from typing import Dict, List, Optional
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from pymongo import UpdateOne
+except ImportError:
+    UpdateOne = None
+
+from data_access import TripWellDataAccess, get_data_access
+
+logger = logging.getLogger(__name__)
+
+SCORING_VERSION = "2.0"
+PERSONAS = ("Art", "Food", "History", "Adventure")
+PLANNING_STYLES = ("Spontaneous", "Mix of spontaneous and planned", "Set a plan and stick to it!")
+# behaviorData.metaPreferences counters, in PERSONAS order
+META_PREFERENCES = ("art", "foodie", "history", "adventure")
+# Score of the chosen persona / planning style (personaScoreService "standard points")
+PICK_SCORE = 0.5
+# Persona score spread over the personas by their share of the user's selections
+BEHAVIOR_WEIGHT = 0.5
+BULK_WRITE_SIZE = 1000
+
+def _index(value: Optional[str], options) -> int:
+    """Position of a profile value among options, or len(options) when unset or unknown"""
+    # Exact match, like personaScoreService's hasOwnProperty check ("Spontaneity" scores nothing there)
+    return options.index(value) if value in options else len(options)
+
+def _meta_counts(meta_preferences: Optional[Dict]) -> List[float]:
+    """metaPreferences counters in PERSONAS order; missing or negative counts are 0"""
+    meta_preferences = meta_preferences or {}
+    return [max(float(meta_preferences.get(name) or 0), 0.0) for name in META_PREFERENCES]
+
+def score_user(persona: Optional[str], planning_style: Optional[str],
+               meta_preferences: Optional[Dict] = None) -> Dict:
+    """One user's PersonaScore weights, operation for operation what score() does for many"""
+    counts = _meta_counts(meta_preferences)
+    total = sum(counts)
+    return {
+        "personaScores": {
+            name: PICK_SCORE * (name == persona) + BEHAVIOR_WEIGHT * (count / total if total else 0.0)
+            for name, count in zip(PERSONAS, counts)
+        },
+        "planningScores": {name: PICK_SCORE * (name == planning_style) for name in PLANNING_STYLES}
+    }
+
+def score(persona_index, planning_index, meta_preferences):
+    """
+    Persona and planning weights for many users at once
+
+    Args:
+        persona_index: (n,) ints into PERSONAS; len(PERSONAS) for no pick
+        planning_index: (n,) ints into PLANNING_STYLES; len(PLANNING_STYLES) for no pick
+        meta_preferences: (n, 4) metaPreferences counts in PERSONAS order
+
+    Returns:
+        (persona scores (n, 4), planning scores (n, 3))
+    """
+    # One-hot rows via an identity matrix with an extra all-zero row for "no pick"
+    persona_picks = np.eye(len(PERSONAS) + 1)[persona_index][:, :len(PERSONAS)]
+    planning_picks = np.eye(len(PLANNING_STYLES) + 1)[planning_index][:, :len(PLANNING_STYLES)]
+    totals = meta_preferences.sum(axis=1, keepdims=True)
+    # Users without selection behavior get a zero share instead of 0 / 0
+    shares = np.divide(meta_preferences, totals, out=np.zeros_like(meta_preferences), where=totals > 0)
+    return PICK_SCORE * persona_picks + BEHAVIOR_WEIGHT * shares, PICK_SCORE * planning_picks
+
+class PersonaScoring:
+    """Change detection, vectorized scoring and bulk write-back"""
+
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None):
+        if np is None:
+            raise ImportError("numpy is required for bulk persona scoring")
+        self.data = data_access or get_data_access()
+
+    def _selections(self) -> Dict[str, Dict]:
+        """Per Firebase uid (UserSelections.userId): metaPreferences summed over trips and the latest updatedAt"""
+        group = {"_id": "$userId", "updatedAt": {"$max": "$updatedAt"}}
+        group.update({name: {"$sum": f"$behaviorData.metaPreferences.{name}"} for name in META_PREFERENCES})
+        return {
+            str(row["_id"]): {"meta_preferences": {name: row[name] for name in META_PREFERENCES},
+                              "updated_at": row.get("updatedAt")}
+            for row in self.data.aggregate("UserSelections", [{"$group": group}])
+        }
+
+    def rescore(self, all_users: bool = False, dry_run: bool = False) -> Dict:
+        """
+        Re-score changed users (or everyone) and write the results back
+
+        Args:
+            all_users: Ignore lastAnalyzedAt and SCORING_VERSION and re-score every user
+            dry_run: Compute scores without writing anything
+
+        Returns:
+            Dict with users scanned, users scored and documents written
+        """
+        outdated = set() if all_users else {
+            str(doc["userId"]) for doc in self.data.find(
+                "PersonaScore", {"calculationVersion": {"$ne": SCORING_VERSION}}, ["userId"])
+        }
+        scored = set() if all_users else {
+            str(doc["userId"]) for doc in self.data.find("PersonaScore", {}, ["userId"])
+        }
+
+        selections = self._selections()
+
+        user_ids: List = []
+        persona_index, planning_index, meta_preferences = [], [], []
+        scanned = 0
+        for user in self.data.find("TripWellUser", {}, ["_id", "firebaseId", "persona", "planningStyle",
+                                                        "updatedAt", "lastAnalyzedAt"]):
+            scanned += 1
+            behavior = selections.get(str(user.get("firebaseId")), {})
+            analyzed = user.get("lastAnalyzedAt")
+            changed = (
+                all_users or analyzed is None
+                or str(user["_id"]) in outdated or str(user["_id"]) not in scored
+                or (user.get("updatedAt") and user["updatedAt"] > analyzed)
+                or (behavior.get("updated_at") and behavior["updated_at"] > analyzed)
+            )
+            if not changed:
+                continue
+            user_ids.append(user["_id"])
+            persona_index.append(_index(user.get("persona"), PERSONAS))
+            planning_index.append(_index(user.get("planningStyle"), PLANNING_STYLES))
+            meta_preferences.append(_meta_counts(behavior.get("meta_preferences")))
+
+        summary = {"users_scanned": scanned, "users_scored": len(user_ids), "scores_written": 0,
+                   "scoring_version": SCORING_VERSION}
+        if not user_ids:
+            logger.info(f"🧮 Persona scores up to date for {scanned} users")
+            return summary
+
+        persona_scores, planning_scores = score(
+            np.array(persona_index, dtype=np.intp),
+            np.array(planning_index, dtype=np.intp),
+            np.array(meta_preferences, dtype=np.float64).reshape(-1, len(META_PREFERENCES))
+        )
+        logger.info(f"🧮 Scored {len(user_ids)} of {scanned} users")
+        if dry_run:
+            return summary
+
+        now = datetime.utcnow()
+        for start in range(0, len(user_ids), BULK_WRITE_SIZE):
+            stop = start + BULK_WRITE_SIZE
+            score_writes, user_writes = [], []
+            for user_id, personas, planning in zip(user_ids[start:stop], persona_scores[start:stop].tolist(),
+                                                   planning_scores[start:stop].tolist()):
+                score_writes.append(UpdateOne({"userId": user_id}, {
+                    "$set": {
+                        "personaScores": dict(zip(PERSONAS, personas)),
+                        "planningScores": dict(zip(PLANNING_STYLES, planning)),
+                        "calculatedAt": now,
+                        "calculationVersion": SCORING_VERSION,
+                        "updatedAt": now
+                    },
+                    "$setOnInsert": {"createdAt": now}
+                }, upsert=True))
+                # Written directly, so the user's own updatedAt is left alone
+                user_writes.append(UpdateOne({"_id": user_id}, {"$set": {"lastAnalyzedAt": now}}))
+            result = self.data.collection("PersonaScore").bulk_write(score_writes, ordered=False)
+            self.data.collection("TripWellUser").bulk_write(user_writes, ordered=False)
+            summary["scores_written"] += result.upserted_count + result.modified_count
+        logger.info(f"✅ Wrote {summary['scores_written']} persona scores")
+        return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk re-score TripWell persona and planning weights")
+    parser.add_argument('--all', action='store_true', help="Re-score every user, not just changed ones")
+    parser.add_argument('--dry-run', action='store_true', help="Compute scores without writing them")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    summary = PersonaScoring().rescore(all_users=args.all, dry_run=args.dry_run)
+    print(f"✅ {summary['users_scored']} of {summary['users_scanned']} users scored, "
+          f"{summary['scores_written']} written (version {summary['scoring_version']})")
+
+if __name__ == "__main__":
+    main()
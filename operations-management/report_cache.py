@@ -0,0 +1,206 @@
+"""
+TripWell Report Cache
+=====================
+
+In-process cache for the operations reports that dashboards poll:
+- Keyed by data source (database), report type and normalized parameters
+  (date_range, week_start, time_period)
+- Per-report TTLs and LRU eviction
+- Single-flight: concurrent identical requests share one computation
+- Invalidation hooks, fired when the daily rollups or activity sketches are
+  refreshed; between refreshes freshness is bounded by the TTLs
+
+Cached responses keep the generated_at of the run that produced them and
+carry "cached": True.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Optional, Any
+from datetime import datetime, date, timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL = 60.0
+
+# Seconds a result stays fresh, by report_type
+REPORT_TTLS = {
+    "management_dashboard": 60.0,
+    "trip_health_dashboard": 60.0,
+    "comprehensive_security_report": 30.0,
+    "user_engagement": 300.0,
+    "trip_activity": 300.0,
+    "conversion_metrics": 300.0,
+    "destination_popularity": 600.0,
+    "weekly_user_engagement": 900.0,
+    "user_lifecycle_analysis": 900.0,
+    "retention_analysis": 900.0
+}
+
+# Reports that go stale when new data of each kind lands
+INVALIDATED_BY = {
+    "users": ("management_dashboard", "user_engagement", "conversion_metrics", "weekly_user_engagement",
+              "user_lifecycle_analysis", "retention_analysis", "comprehensive_security_report"),
+    "trips": ("management_dashboard", "trip_health_dashboard", "trip_activity", "conversion_metrics",
+              "destination_popularity", "weekly_user_engagement", "user_lifecycle_analysis")
+}
+
+def _normalize(value: Any) -> Any:
+    """JSON-stable form of a report parameter: sorted dicts, ISO dates, no None-valued keys"""
+    if isinstance(value, datetime):
+        # Same instant, same key: offsets are converted to naive UTC like data_access._as_datetime
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.replace(microsecond=0).isoformat().lower()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items()) if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, str):
+        try:
+            # ISO date strings and datetimes for the same instant share a key
+            return _normalize(datetime.fromisoformat(value.strip().replace("Z", "+00:00")))
+        except ValueError:
+            return value.strip().lower()
+    return value
+
+def cache_key(report_type: str, params: Optional[Dict] = None, source: Optional[str] = None) -> str:
+    return f"{source or ''}|{report_type}:{json.dumps(_normalize(params or {}), sort_keys=True)}"
+
+class ReportCache:
+    """Thread-safe TTL + LRU cache with single-flight computation"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = {**REPORT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (report_type, expires_at, report)
+        self._inflight: Dict[str, Future] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "shared": 0, "evictions": 0, "invalidations": 0}
+
+    def get_or_compute(self, report_type: str, params: Optional[Dict], compute: Callable[[], Dict],
+                       source: Optional[str] = None) -> Dict:
+        """
+        Return a fresh cached report or compute it once for every concurrent caller
+
+        Args:
+            report_type: Report name, used for the TTL and invalidation
+            params: Parameters that change the report's output
+            compute: Zero-argument callable producing the report
+            source: Data source the report reads (e.g. TripWellDataAccess.source), so
+                services on different databases never share entries
+
+        Returns:
+            Report dict with "cached" set to whether it came from the cache
+        """
+        key = cache_key(report_type, params, source)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return dict(entry[2], cached=True)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+                generation = self._generation
+                self.stats["misses"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            return dict(flight.result(), cached=True)
+
+        try:
+            report = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.set_exception(e)
+            raise
+
+        with self._lock:
+            self._inflight.pop(key, None)
+            # Failed or partial reports are shared with waiting callers but never stored
+            cacheable = report.get("success", True) and not report.get("partial")
+            if cacheable and generation == self._generation:
+                ttl = self.ttls.get(report_type, self.default_ttl)
+                self._entries[key] = (report_type, time.monotonic() + ttl, report)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        flight.set_result(report)
+        return dict(report, cached=False)
+
+    def invalidate(self, report_types: Optional[Iterable[str]] = None) -> int:
+        """Drop cached reports of the given types (all of them when None); returns entries removed"""
+        with self._lock:
+            self._generation += 1
+            if report_types is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                report_types = set(report_types)
+                stale = [key for key, entry in self._entries.items() if entry[0] in report_types]
+                for key in stale:
+                    del self._entries[key]
+                removed = len(stale)
+            self.stats["invalidations"] += removed
+        return removed
+
+    def on_new_users(self) -> int:
+        """New user activity was materialized: invalidates every user-based report"""
+        return self.invalidate(INVALIDATED_BY["users"])
+
+    def on_new_trips(self) -> int:
+        """New trip activity was materialized: invalidates every trip-based report"""
+        return self.invalidate(INVALIDATED_BY["trips"])
+
+    def __len__(self):
+        return len(self._entries)
+
+_shared = ReportCache()
+
+def get_report_cache() -> ReportCache:
+    """Process-wide cache used by the operations services unless they are given their own"""
+    return _shared
+
+def cached_report(report_type: str, params: Optional[Iterable[str]] = None):
+    """
+    Cache a service method's result through the service's report_cache, keyed by
+    the service's data source (self.data) as well as its arguments
+
+    Args:
+        report_type: Report name for TTL and invalidation lookups
+        params: Argument names that form the cache key (defaults to every argument)
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = getattr(self, "report_cache", None)
+            if cache is None:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key_params = {name: value for name, value in bound.arguments.items()
+                          if name != "self" and (params is None or name in params)}
+            source = getattr(getattr(self, "data", None), "source", None)
+            return cache.get_or_compute(report_type, key_params, lambda: method(self, *args, **kwargs), source)
+        return wrapper
+    return decorator
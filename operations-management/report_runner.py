@@ -0,0 +1,84 @@
+"""
+TripWell Operations Sub-Report Runner
+=====================================
+
+Runs the independent sub-reports behind a dashboard:
+- Concurrently on a thread pool, so latency follows the slowest sub-report
+- With a timeout per sub-report
+- Returning whatever finished, plus the names of the ones that did not
+
+Sub-reports spend their time waiting on MongoDB, which releases the GIL, so
+threads are enough here.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SUB_REPORT_TIMEOUT = 10.0
+
+def run_sub_reports(sub_reports: Dict[str, Callable[[], Dict]],
+                    timeouts: Optional[Dict[str, float]] = None,
+                    default_timeout: float = DEFAULT_SUB_REPORT_TIMEOUT,
+                    concurrent: bool = True) -> Dict:
+    """
+    Run named sub-reports and collect their results
+
+    Args:
+        sub_reports: {name: zero-argument callable returning a report dict}
+        timeouts: Optional per-name timeouts in seconds
+        default_timeout: Timeout for names missing from timeouts
+        concurrent: Run on a thread pool (True) or one after another (False)
+
+    Returns:
+        Dict with "results" ({name: report} for every sub-report that succeeded),
+        "errors" ({name: reason} for failures and timeouts) and "timings" ({name: ms}
+        for every sub-report that returned)
+    """
+    timeouts = timeouts or {}
+    results, errors, timings = {}, {}, {}
+
+    def record(name, report):
+        if isinstance(report, dict) and report.get("success") is False:
+            errors[name] = report.get("error") or report.get("message") or "sub-report failed"
+        else:
+            results[name] = report
+
+    if not concurrent:
+        for name, sub_report in sub_reports.items():
+            try:
+                report, timings[name] = _timed(sub_report)
+                record(name, report)
+            except Exception as e:
+                logger.error(f"❌ Sub-report {name} failed: {e}")
+                errors[name] = str(e)
+        return {"results": results, "errors": errors, "timings": timings}
+
+    executor = ThreadPoolExecutor(max_workers=len(sub_reports) or 1, thread_name_prefix="sub-report")
+    started = time.perf_counter()
+    futures = {name: executor.submit(_timed, sub_report) for name, sub_report in sub_reports.items()}
+    deadlines = {name: started + timeouts.get(name, default_timeout) for name in futures}
+    try:
+        # Wait in deadline order so each sub-report gets exactly its own budget
+        for name in sorted(futures, key=deadlines.get):
+            try:
+                report, timings[name] = futures[name].result(timeout=max(deadlines[name] - time.perf_counter(), 0))
+                record(name, report)
+            except FutureTimeoutError:
+                logger.warning(f"⏱️ Sub-report {name} timed out after {timeouts.get(name, default_timeout)}s")
+                errors[name] = "timed out"
+            except Exception as e:
+                logger.error(f"❌ Sub-report {name} failed: {e}")
+                errors[name] = str(e)
+    finally:
+        # Timed-out sub-reports keep their thread until they return; nobody waits for them
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {"results": results, "errors": errors, "timings": timings}
+
+def _timed(sub_report: Callable[[], Dict]):
+    started = time.perf_counter()
+    report = sub_report()
+    return report, round((time.perf_counter() - started) * 1000, 1)
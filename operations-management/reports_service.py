@@ -16,14 +16,50 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from data_access import TripWellDataAccess, get_data_access, date_filter, parse_date_range
+from activity_sketches import ActivitySketches
+from daily_rollups import DailyRollups
+from funnel_engine import FunnelEngine
+from report_cache import ReportCache, cached_report, get_report_cache
+
 logger = logging.getLogger(__name__)
 
 class ReportsService:
     """Service for generating various operational reports"""
     
-    def __init__(self):
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None, use_rollups: bool = True,
+                 report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+        self.rollups = DailyRollups(self.data, self.report_cache) if use_rollups else None
+        self.sketches = ActivitySketches(self.data, report_cache=self.report_cache) if use_rollups else None
         logger.info("📊 Reports Service initialized")
     
+    def _rollup_totals(self, date_range: Optional[Dict]) -> Optional[Dict]:
+        """
+        Summed daily rollups for a date range, or None (use the raw queries) when rollups are
+        off, the range is not day-aligned or the rollups stop before its end
+        """
+        if not date_range or self.rollups is None:
+            return None
+        if not self.rollups.covers(date_range):
+            logger.info("📊 Daily rollups do not cover this date range, using raw queries")
+            return None
+        return self.rollups.totals(date_range)
+    
+    def _distinct(self, metric: str, date_range: Optional[Dict]) -> Optional[Dict]:
+        """
+        Sketch-based distinct count over a date range, or None (use the exact count) when
+        sketches are off or have not been built through the end of the range
+        """
+        if not date_range or self.sketches is None:
+            return None
+        if not self.sketches.covers(date_range):
+            logger.info("📊 Activity sketches do not reach the end of this date range, using exact counts")
+            return None
+        return self.sketches.distinct(metric, date_range)
+    
+    @cached_report("user_engagement")
     def generate_user_engagement_report(self, date_range: Optional[Dict] = None) -> Dict:
         """
         Generate comprehensive user engagement report
@@ -36,22 +72,46 @@ class ReportsService:
         """
         logger.info("📈 Generating user engagement report")
         
-        # TODO: Implement user engagement analysis
-        return {
-            "success": True,
-            "report_type": "user_engagement",
-            "generated_at": datetime.now().isoformat(),
-            "metrics": {
-                "total_users": 0,
-                "active_users": 0,
-                "new_signups": 0,
-                "profile_completion_rate": 0.0,
-                "trip_creation_rate": 0.0,
-                "engagement_score": 0.0
-            },
-            "message": "User engagement report generated successfully"
-        }
+        try:
+            signups = date_filter("createdAt", date_range)
+            rollup = self._rollup_totals(date_range)
+            if rollup:
+                new_signups, profiles_complete = rollup["signups"], rollup["profile_completions"]
+            else:
+                new_signups = self.data.count("TripWellUser", signups)
+                profiles_complete = self.data.count("TripWellUser", {**signups, "profileComplete": True})
+            users_with_trips = self.data.count("TripWellUser", {**signups, "tripId": {"$ne": None}})
+            active = self._distinct("active_users", date_range)
+            active_users = active["estimate"] if active else self.data.count("TripWellUser", date_filter("updatedAt", date_range))
+            profile_completion_rate = profiles_complete / new_signups * 100 if new_signups else 0.0
+            trip_creation_rate = users_with_trips / new_signups * 100 if new_signups else 0.0
+            
+            return {
+                "success": True,
+                "report_type": "user_engagement",
+                "generated_at": datetime.now().isoformat(),
+                "metrics": {
+                    "total_users": self.data.count("TripWellUser"),
+                    "active_users": active_users,
+                    "active_users_standard_error": active["standard_error"] if active else 0.0,
+                    "new_signups": new_signups,
+                    "profile_completion_rate": profile_completion_rate,
+                    "trip_creation_rate": trip_creation_rate,
+                    "engagement_score": (profile_completion_rate + trip_creation_rate) / 2
+                },
+                "message": "User engagement report generated successfully"
+            }
+        except Exception as e:
+            logger.error(f"❌ User engagement report failed: {e}")
+            return {
+                "success": False,
+                "report_type": "user_engagement",
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to generate user engagement report"
+            }
     
+    @cached_report("trip_activity")
     def generate_trip_activity_report(self, date_range: Optional[Dict] = None) -> Dict:
         """
         Generate trip activity and performance report
@@ -64,22 +124,50 @@ class ReportsService:
         """
         logger.info("🗺️ Generating trip activity report")
         
-        # TODO: Implement trip activity analysis
-        return {
-            "success": True,
-            "report_type": "trip_activity",
-            "generated_at": datetime.now().isoformat(),
-            "metrics": {
-                "total_trips": 0,
-                "active_trips": 0,
-                "completed_trips": 0,
-                "trip_creation_rate": 0.0,
-                "average_trip_duration": 0,
-                "popular_destinations": []
-            },
-            "message": "Trip activity report generated successfully"
-        }
+        try:
+            created = date_filter("createdAt", date_range)
+            start, end = parse_date_range(date_range)
+            days = max(((end or datetime.utcnow()) - start).days, 1) if start else None
+            rollup = self._rollup_totals(date_range)
+            if rollup:
+                total_trips = rollup["trips_created"]
+                completed_trips = rollup["trips_completed"]
+                average_trip_duration = rollup["trip_days"] / total_trips if total_trips else 0.0
+                popular_destinations = rollup["popular_destinations"]
+            else:
+                total_trips = self.data.count("TripBase", created)
+                completed_trips = self.data.count("TripComplete", {
+                    **date_filter("tripCompletedAt", date_range), "completionReason": "completed"
+                })
+                average_trip_duration = self.data.average("TripBase", "daysTotal", created)
+                popular_destinations = self.data.top_values("TripBase", ["city", "country"], created, limit=10)
+            
+            return {
+                "success": True,
+                "report_type": "trip_activity",
+                "generated_at": datetime.now().isoformat(),
+                "metrics": {
+                    "total_trips": total_trips,
+                    "active_trips": self.data.count("TripBase", {**created, "endDate": {"$gte": datetime.utcnow()}}),
+                    "completed_trips": completed_trips,
+                    # Trips created per day over the requested range
+                    "trip_creation_rate": total_trips / days if days else 0.0,
+                    "average_trip_duration": average_trip_duration,
+                    "popular_destinations": popular_destinations
+                },
+                "message": "Trip activity report generated successfully"
+            }
+        except Exception as e:
+            logger.error(f"❌ Trip activity report failed: {e}")
+            return {
+                "success": False,
+                "report_type": "trip_activity",
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to generate trip activity report"
+            }
     
+    @cached_report("conversion_metrics")
     def generate_conversion_metrics(self) -> Dict:
         """
         Generate conversion funnel metrics
@@ -89,21 +177,25 @@ class ReportsService:
         """
         logger.info("📊 Generating conversion metrics")
         
-        # TODO: Implement conversion analysis
-        return {
-            "success": True,
-            "report_type": "conversion_metrics",
-            "generated_at": datetime.now().isoformat(),
-            "metrics": {
-                "signup_to_profile": 0.0,
-                "profile_to_trip": 0.0,
-                "trip_to_completion": 0.0,
-                "overall_conversion": 0.0,
-                "funnel_dropoff_points": []
-            },
-            "message": "Conversion metrics generated successfully"
-        }
+        try:
+            return {
+                "success": True,
+                "report_type": "conversion_metrics",
+                "generated_at": datetime.now().isoformat(),
+                "metrics": FunnelEngine.from_data(self.data).summary(),
+                "message": "Conversion metrics generated successfully"
+            }
+        except Exception as e:
+            logger.error(f"❌ Conversion metrics failed: {e}")
+            return {
+                "success": False,
+                "report_type": "conversion_metrics",
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to generate conversion metrics"
+            }
     
+    @cached_report("management_dashboard")
     def generate_management_dashboard_data(self) -> Dict:
         """
         Generate comprehensive management dashboard data
@@ -0,0 +1,167 @@
+"""
+TripWell Retention Engine
+=========================
+
+Cohort retention over per-day active-user bitmaps:
+- Users get dense indexes in signup order, so a signup cohort is a contiguous bit range
+- Each day's active users are one bitmap (a Python int, bit i = user i)
+- Day-N retention and full cohort matrices are bulk AND + popcount operations
+
+A user counts as active on a day when they signed up, updated their profile,
+created or joined a trip (JoinCode), saved selections (UserSelections) or
+completed a trip (TripComplete) that day. Days are UTC days, matching the
+stored dates, the daily rollups and the activity sketches.
+"""
+
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+
+from data_access import TripWellDataAccess
+
+logger = logging.getLogger(__name__)
+
+def _day_start(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+class RetentionEngine:
+    """Per-day active-user bitmaps for one window of days"""
+
+    def __init__(self, start: datetime, end: datetime):
+        self.start = _day_start(start)
+        self.days = (_day_start(end) - self.start).days + 1
+        self.user_index: Dict[str, int] = {}
+        self.signup_day = array('i')  # day offset of each user's signup, non-decreasing
+        self._pending = [bytearray() for _ in range(self.days)]
+        self.active: List[int] = []
+        self._active_from: List[int] = []
+
+    def day_offset(self, when: datetime) -> int:
+        return (when - self.start).days
+
+    def add_user(self, created: datetime, *keys: str) -> int:
+        """Register a user (in signup order) under every id other collections use for them"""
+        index = len(self.signup_day)
+        self.signup_day.append(self.day_offset(created))
+        for key in keys:
+            if key:
+                self.user_index[str(key)] = index
+        self.add_activity(index, created)
+        return index
+
+    def add_activity(self, user, when: Optional[datetime]) -> None:
+        """Mark a user (dense index or any registered id) active on the day of `when`"""
+        if when is None:
+            return
+        index = user if isinstance(user, int) else self.user_index.get(str(user))
+        day = self.day_offset(when)
+        if index is None or not 0 <= day < self.days:
+            return
+        bits = self._pending[day]
+        byte = index >> 3
+        if len(bits) <= byte:
+            bits.extend(bytes(byte + 1 - len(bits)))
+        bits[byte] |= 1 << (index & 7)
+
+    def finalize(self) -> "RetentionEngine":
+        """Freeze the day bitmaps and precompute 'active on this day or later' unions"""
+        self.active = [int.from_bytes(bits, 'little') for bits in self._pending]
+        self._pending = []
+        self._active_from = [0] * (self.days + 1)
+        for day in range(self.days - 1, -1, -1):
+            self._active_from[day] = self._active_from[day + 1] | self.active[day]
+        return self
+
+    @classmethod
+    def from_data(cls, data: TripWellDataAccess, start: datetime, end: Optional[datetime] = None) -> "RetentionEngine":
+        """Load signups and activity for [start, end] with projection-limited cursors"""
+        end = end or datetime.utcnow()
+        engine = cls(start, end)
+        window = {"$gte": engine.start, "$lt": _day_start(end) + timedelta(days=1)}
+
+        for user in data.find("TripWellUser", {"createdAt": {"$lt": window["$lt"]}},
+                              ["_id", "firebaseId", "createdAt", "updatedAt"], sort=[("createdAt", 1)]):
+            if not user.get("createdAt"):
+                continue
+            index = engine.add_user(user["createdAt"], user["_id"], user.get("firebaseId"))
+            engine.add_activity(index, user.get("updatedAt"))
+        for join in data.find("JoinCode", {"createdAt": window}, ["userId", "createdAt"]):
+            engine.add_activity(join.get("userId"), join.get("createdAt"))
+        for selection in data.find("UserSelections", {"updatedAt": window}, ["userId", "createdAt", "updatedAt"]):
+            engine.add_activity(selection.get("userId"), selection.get("createdAt"))
+            engine.add_activity(selection.get("userId"), selection.get("updatedAt"))
+        for trip in data.find("TripComplete", {"tripCompletedAt": window},
+                              ["originatorId", "participantId", "tripCompletedAt"]):
+            engine.add_activity(trip.get("originatorId"), trip.get("tripCompletedAt"))
+            engine.add_activity(trip.get("participantId"), trip.get("tripCompletedAt"))
+        logger.info(f"🧮 Retention bitmaps: {len(engine.signup_day)} users over {engine.days} days")
+        return engine.finalize()
+
+    @property
+    def today(self) -> int:
+        """Last day offset with (possibly partial) data"""
+        return min(self.day_offset(datetime.utcnow()), self.days - 1)
+
+    def cohort(self, first_day: int, last_day: int) -> int:
+        """Bitmap of users who signed up between two day offsets (inclusive)"""
+        lo = bisect_left(self.signup_day, first_day)
+        hi = bisect_right(self.signup_day, last_day)
+        return ((1 << (hi - lo)) - 1) << lo if hi > lo else 0
+
+    def active_between(self, first_day: int, last_day: int) -> int:
+        bitmap = 0
+        for day in range(max(first_day, 0), min(last_day, self.days - 1) + 1):
+            bitmap |= self.active[day]
+        return bitmap
+
+    def retention(self, first_day: int, last_day: int, offset: int, rolling: bool = False) -> Tuple[int, int]:
+        """
+        Day-N retention for the cohorts signing up between two day offsets
+
+        Args:
+            first_day, last_day: Cohort signup day offsets (inclusive)
+            offset: N - days after signup
+            rolling: Count users active on day N or any later day instead of exactly day N
+
+        Returns:
+            (retained users, eligible users); cohorts whose day N has not happened yet are skipped
+        """
+        retained = eligible = 0
+        for day in range(max(first_day, 0), min(last_day, self.today - offset) + 1):
+            cohort = self.cohort(day, day)
+            if not cohort:
+                continue
+            returned = self._active_from[day + offset] if rolling else self.active[day + offset]
+            retained += (cohort & returned).bit_count()
+            eligible += cohort.bit_count()
+        return retained, eligible
+
+    def retention_rate(self, first_day: int, last_day: int, offset: int, rolling: bool = False) -> float:
+        retained, eligible = self.retention(first_day, last_day, offset, rolling)
+        return retained / eligible * 100 if eligible else 0.0
+
+    def cohort_matrix(self, first_day: int, weeks: int) -> Dict[str, Dict]:
+        """
+        Weekly cohort retention matrix
+
+        Returns:
+            {cohort week start (YYYY-MM-DD): {"size": n, "week_0": pct, "week_1": pct, ...}}
+            with a column for every week that has started
+        """
+        weekly_active = [self.active_between(first_day + 7 * w, first_day + 7 * w + 6) for w in range(weeks)]
+        matrix = {}
+        for i in range(weeks):
+            cohort_start = first_day + 7 * i
+            if cohort_start > self.today:
+                break
+            cohort = self.cohort(cohort_start, cohort_start + 6)
+            size = cohort.bit_count()
+            row = {"size": size}
+            for j in range(weeks - i):
+                if first_day + 7 * (i + j) > self.today:
+                    break
+                row[f"week_{j}"] = (cohort & weekly_active[i + j]).bit_count() / size * 100 if size else 0.0
+            matrix[(self.start + timedelta(days=cohort_start)).strftime("%Y-%m-%d")] = row
+        return matrix
@@ -13,52 +13,98 @@ This is a breadcrumb service - core functionality to be implemented.
 """
 
 import logging
+import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from account_clusters import AccountClusters
+from activity_detector import ActivityDetector, replay_access_log
+from data_access import TripWellDataAccess, get_data_access
+from report_cache import ReportCache, cached_report, get_report_cache
+from report_runner import run_sub_reports
+
 logger = logging.getLogger(__name__)
 
+INACTIVE_ACCOUNT_DAYS = 90
+# Flagged bursts at which the threat level is raised
+THREAT_LEVELS = ((10, "high"), (1, "medium"))
+MAX_REPORTED_CLUSTERS = 50
+
 class SecurityMonitoringService:
     """Service for security monitoring and threat detection"""
     
-    def __init__(self):
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None,
+                 report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
         logger.info("🔒 Security Monitoring Service initialized")
     
-    def detect_suspicious_activity(self) -> Dict:
+    def detect_suspicious_activity(self, access_log: Optional[str] = None) -> Dict:
         """
         Detect suspicious user activity patterns
         
+        Args:
+            access_log: Access log written by index.js to replay; defaults to
+                TRIPWELL_ACCESS_LOG, and burst checks are skipped without one
+            
         Returns:
             Dict containing suspicious activity analysis
         """
         logger.info("🚨 Detecting suspicious activity")
         
-        # TODO: Implement suspicious activity detection
-        return {
-            "success": True,
-            "report_type": "suspicious_activity_detection",
-            "generated_at": datetime.now().isoformat(),
-            "security_metrics": {
-                "suspicious_users_detected": 0,
-                "fraud_attempts_blocked": 0,
-                "unusual_login_patterns": 0,
-                "data_breach_attempts": 0,
-                "security_score": 0.0
-            },
-            "suspicious_activities": {
-                "multiple_account_creation": [],
-                "unusual_login_locations": [],
-                "rapid_profile_updates": [],
-                "suspicious_trip_patterns": [],
-                "data_scraping_attempts": []
-            },
-            "threat_level": "low",
-            "recommendations": [
-                "Monitor users with multiple account creation attempts",
-                "Implement additional verification for unusual login patterns"
-            ],
-            "message": "Suspicious activity detection completed successfully"
-        }
+        try:
+            access_log = access_log or os.environ.get("TRIPWELL_ACCESS_LOG")
+            # Each run replays into a fresh detector so the same log is never counted twice
+            detector = replay_access_log(access_log) if access_log else ActivityDetector()
+            if not access_log:
+                logger.warning("⚠️ No access log (TRIPWELL_ACCESS_LOG), skipping burst detection")
+            bursts = detector.suspicious_activities()
+            flagged = sum(len(entries) for entries in bursts.values())
+            duplicates = AccountClusters.from_data(self.data).clusters()
+            flagged += len(duplicates)
+            suspicious_users = {f["user"] for entries in bursts.values() for f in entries if "user" in f}
+            suspicious_users.update(a["user_id"] for cluster in duplicates for a in cluster["accounts"])
+            threat_level = next((level for minimum, level in THREAT_LEVELS if flagged >= minimum), "low")
+            
+            # TODO: Implement fraud, breach and location checks and the security score
+            return {
+                "success": True,
+                "report_type": "suspicious_activity_detection",
+                "generated_at": datetime.now().isoformat(),
+                "security_metrics": {
+                    "suspicious_users_detected": len(suspicious_users),
+                    "fraud_attempts_blocked": 0,
+                    "unusual_login_patterns": len(bursts["unusual_login_patterns"]),
+                    "data_breach_attempts": 0,
+                    "security_score": 0.0
+                },
+                "suspicious_activities": {
+                    "multiple_account_creation": duplicates[:MAX_REPORTED_CLUSTERS],
+                    "unusual_login_locations": [],
+                    "rapid_profile_updates": bursts["rapid_profile_updates"],
+                    "suspicious_trip_patterns": [],
+                    "data_scraping_attempts": bursts["data_scraping_attempts"],
+                    "unusual_login_patterns": bursts["unusual_login_patterns"]
+                },
+                "event_source": "access_log" if access_log else None,
+                "detector_stats": dict(detector.stats, active_keys=detector.active_keys()),
+                "duplicate_account_clusters": len(duplicates),
+                "threat_level": threat_level,
+                "recommendations": [
+                    "Monitor users with multiple account creation attempts",
+                    "Implement additional verification for unusual login patterns"
+                ],
+                "message": "Suspicious activity detection completed successfully"
+            }
+        except Exception as e:
+            logger.error(f"❌ Suspicious activity detection failed: {e}")
+            return {
+                "success": False,
+                "report_type": "suspicious_activity_detection",
+                "generated_at": datetime.now().isoformat(),
+                "error": str(e),
+                "message": "Failed to detect suspicious activity"
+            }
     
     def monitor_account_security(self) -> Dict:
         """
@@ -69,6 +115,10 @@ class SecurityMonitoringService:
         """
         logger.info("🛡️ Monitoring account security")
         
+        # Accounts untouched for INACTIVE_ACCOUNT_DAYS; passwords and 2FA live in Firebase Auth
+        inactive_since = datetime.utcnow() - timedelta(days=INACTIVE_ACCOUNT_DAYS)
+        inactive_accounts = self.data.count("TripWellUser", {"updatedAt": {"$lt": inactive_since}})
+        
         # TODO: Implement account security monitoring
         return {
             "success": True,
@@ -77,7 +127,7 @@ class SecurityMonitoringService:
             "security_metrics": {
                 "accounts_with_weak_passwords": 0,
                 "accounts_without_2fa": 0,
-                "inactive_accounts": 0,
+                "inactive_accounts": inactive_accounts,
                 "compromised_accounts": 0,
                 "security_compliance_score": 0.0
             },
@@ -132,19 +182,29 @@ class SecurityMonitoringService:
             "message": "Fraud pattern analysis completed successfully"
         }
     
-    def generate_security_report(self) -> Dict:
+    @cached_report("comprehensive_security_report", params=())
+    def generate_security_report(self, concurrent: bool = True,
+                                 timeouts: Optional[Dict[str, float]] = None) -> Dict:
         """
         Generate comprehensive security report
         
+        Args:
+            concurrent: Run the three analyses concurrently instead of one after another
+            timeouts: Optional per-analysis timeouts in seconds, keyed by detailed_analyses name
+            
         Returns:
-            Dict containing security report
+            Dict containing security report; analyses that failed or timed out are
+            left empty and listed in sub_report_errors
         """
         logger.info("📊 Generating security report")
         
         # Generate all security analyses
-        suspicious_activity = self.detect_suspicious_activity()
-        account_security = self.monitor_account_security()
-        fraud_analysis = self.analyze_fraud_patterns()
+        run = run_sub_reports({
+            "suspicious_activity": self.detect_suspicious_activity,
+            "account_security": self.monitor_account_security,
+            "fraud_analysis": self.analyze_fraud_patterns
+        }, timeouts=timeouts, concurrent=concurrent)
+        reports = run["results"]
         
         return {
             "success": True,
@@ -158,10 +218,13 @@ class SecurityMonitoringService:
                 "prevention_effectiveness": 0.0
             },
             "detailed_analyses": {
-                "suspicious_activity": suspicious_activity["security_metrics"],
-                "account_security": account_security["security_metrics"],
-                "fraud_analysis": fraud_analysis["fraud_metrics"]
+                "suspicious_activity": reports.get("suspicious_activity", {}).get("security_metrics", {}),
+                "account_security": reports.get("account_security", {}).get("security_metrics", {}),
+                "fraud_analysis": reports.get("fraud_analysis", {}).get("fraud_metrics", {})
             },
+            "partial": bool(run["errors"]),
+            "sub_report_errors": run["errors"],
+            "sub_report_timings": run["timings"],
             "security_recommendations": [
                 "Implement additional fraud detection measures",
                 "Enhance account security monitoring",
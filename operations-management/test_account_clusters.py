@@ -0,0 +1,30 @@
+"""
+Duplicate account clustering checks (python -m pytest test_account_clusters.py)
+"""
+
+from datetime import datetime, timedelta
+
+from account_clusters import AccountClusters
+
+def _cluster(users):
+    clusters = AccountClusters()
+    for i, user in enumerate(users):
+        clusters.add_user({"_id": i, "createdAt": datetime(2025, 1, 1) + timedelta(days=30 * i), **user})
+    return clusters.join().clusters()
+
+def test_common_local_part_on_different_domains_stays_apart():
+    users = [{"email": "john@gmail.com", "firstName": "John", "lastName": "Park"},
+             {"email": "john@yahoo.com", "firstName": "John", "lastName": "Reyes"},
+             {"email": "info@bakery.fr"},
+             {"email": "info@hotel.it"},
+             {"email": "info@museum.de"}]
+    assert _cluster(users) == []
+
+def test_same_mailbox_aliases_cluster():
+    users = [{"email": "John.Doe@gmail.com"},
+             {"email": "johndoe+trips@googlemail.com"},
+             {"email": "johndoe@yahoo.com"}]
+    clusters = _cluster(users)
+    assert len(clusters) == 1
+    assert sorted(a["user_id"] for a in clusters[0]["accounts"]) == ["0", "1"]
+    assert clusters[0]["evidence"][0] == {"rule": "email_local_part", "key": "johndoe@gmail.com", "accounts": 2}
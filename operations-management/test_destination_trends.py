@@ -0,0 +1,68 @@
+"""
+Destination trend window checks (python -m pytest test_destination_trends.py)
+"""
+
+from collections import Counter
+from datetime import datetime
+from random import Random
+
+from destination_trends import DestinationTrends, SpaceSaving
+
+NOW = datetime(2026, 10, 18, 12, 0)
+
+def _trends(months, trips_per_month=5, city="Paris"):
+    trends = DestinationTrends()
+    for year, month in months:
+        for day in range(1, trips_per_month + 1):
+            trends.add_trip({"_id": f"{year}-{month}-{day}", "city": city, "country": "France",
+                             "season": "Fall", "createdAt": datetime(year, month, day * 3)})
+    return trends
+
+def test_flat_traffic_scores_no_growth():
+    months = [(2026, month) for month in range(1, 11)]
+    report = _trends(months).report("monthly", now=NOW)
+    assert report["window_trips"] == report["previous_window_trips"] == 15
+    assert report["window_growth"] == 0
+    assert report["fastest_growing_destinations"] == []
+    assert report["declining_destinations"] == []
+    assert report["emerging_destinations"] == []
+
+def test_windows_do_not_overlap_when_history_is_short():
+    report = _trends([(2026, 8), (2026, 9)]).report("monthly", now=NOW)
+    assert report["window_trips"] == 10
+    assert report["previous_window_trips"] == 0
+    assert report["window_growth"] is None
+    assert report["fastest_growing_destinations"] == []
+    assert report["emerging_destinations"] == []
+
+def test_windows_follow_the_calendar_across_empty_months():
+    # Nothing from April through September: old trips must not be pulled into the windows
+    report = _trends([(2026, 1), (2026, 2), (2026, 3)]).report("monthly", now=NOW)
+    assert report["window_trips"] == 0
+    assert report["previous_window_trips"] == 0
+    assert report["top_destinations"] == []
+
+def test_growth_against_the_previous_window():
+    trends = _trends([(2026, month) for month in range(4, 7)], trips_per_month=2)
+    for month in range(7, 10):
+        for day in range(1, 7):
+            trends.add_trip({"_id": f"{month}-{day}", "city": "Paris", "country": "France",
+                             "createdAt": datetime(2026, month, day)})
+    report = trends.report("monthly", now=NOW)
+    assert (report["window_trips"], report["previous_window_trips"]) == (18, 6)
+    assert report["window_growth"] == 2.0
+    assert report["fastest_growing_destinations"][0]["destination"] == "Paris, France"
+
+def test_merged_sketch_bounds_hold():
+    rng = Random(3)
+    streams = [[f"city{int(rng.paretovariate(1.2)) % 40}" for _ in range(500)] for _ in range(4)]
+    merged = SpaceSaving(8)
+    for stream in streams:
+        sketch = SpaceSaving(8)
+        for item in stream:
+            sketch.add(item)
+        merged = merged.merge(sketch)
+    truth = Counter(item for stream in streams for item in stream)
+    assert merged.total == sum(truth.values())
+    for item, count, error in merged.top(8):
+        assert count - error <= truth[item] <= count
@@ -0,0 +1,61 @@
+"""
+Conversion funnel checks (python -m pytest test_funnel_engine.py)
+"""
+
+from datetime import datetime
+
+from funnel_engine import FunnelEngine
+
+class _Collections:
+    """In-memory stand-in for TripWellDataAccess.find: equality / $ne filters and MongoDB null-first sorts"""
+
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def find(self, model, query=None, fields=None, sort=None):
+        def matches(doc):
+            for field, condition in (query or {}).items():
+                if isinstance(condition, dict):
+                    if "$ne" in condition and doc.get(field) == condition["$ne"]:
+                        return False
+                elif doc.get(field) != condition:
+                    return False
+            return True
+
+        docs = [dict(doc) for doc in self.collections.get(model, []) if matches(doc)]
+        for field, direction in reversed(sort or []):
+            docs.sort(key=lambda doc: (doc.get(field) is not None, doc.get(field) or 0), reverse=direction < 0)
+        return docs
+
+def _engine(completions):
+    return FunnelEngine.from_data(_Collections(
+        TripWellUser=[
+            {"_id": 1, "createdAt": datetime(2025, 1, 1), "updatedAt": datetime(2025, 1, 2), "profileComplete": True},
+            {"_id": 2, "createdAt": datetime(2025, 1, 1), "updatedAt": datetime(2025, 1, 2), "profileComplete": True},
+            {"_id": 3, "createdAt": datetime(2025, 1, 1), "profileComplete": False}
+        ],
+        JoinCode=[
+            {"userId": 1, "createdAt": datetime(2025, 1, 3)},
+            {"userId": 2, "createdAt": datetime(2025, 1, 3)}
+        ],
+        TripComplete=completions
+    ))
+
+def test_completion_without_a_time_still_counts():
+    engine = _engine([
+        {"originatorId": 1, "completionReason": "completed"},
+        {"originatorId": 2, "completionReason": "completed", "tripCompletedAt": datetime(2025, 1, 11)},
+        {"originatorId": 2, "participantId": 1, "completionReason": "completed", "tripCompletedAt": None}
+    ])
+    assert engine.reached() == [3, 2, 2, 2]
+    completion = engine.time_to_stage()["completion"]
+    assert completion["users"] == 1
+    assert completion["median_hours"] == 240.0
+
+def test_timed_completion_is_used_when_an_untimed_one_sorts_first():
+    engine = _engine([
+        {"originatorId": 1, "completionReason": "completed"},
+        {"participantId": 1, "completionReason": "completed", "tripCompletedAt": datetime(2025, 1, 6)}
+    ])
+    assert engine.reached() == [3, 2, 2, 1]
+    assert engine.time_to_stage()["completion"]["median_hours"] == 120.0
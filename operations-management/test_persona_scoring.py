@@ -0,0 +1,87 @@
+"""
+Bulk persona scoring parity with services/personaScoreService.js (python -m pytest test_persona_scoring.py)
+"""
+
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from persona_scoring import META_PREFERENCES, PERSONAS, PLANNING_STYLES, _index, _meta_counts, score, score_user
+
+SERVICE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "personaScoreService.js")
+
+# (persona, planningStyle, metaPreferences) as saved on TripWellUser / UserSelections,
+# including values the JS writer ignores
+SELECTIONS = [
+    ("Art", "Spontaneous", {}),
+    ("Food", "Mix of spontaneous and planned", {"art": 0, "foodie": 0, "adventure": 0, "history": 0}),
+    ("History", "Set a plan and stick to it!", {"history": 3}),
+    ("Adventure", None, {"art": 1, "foodie": 2, "adventure": 3, "history": 1}),
+    (None, "Spontaneous", {"art": 2, "foodie": 1}),
+    ("", "", {"foodie": 7}),
+    ("art", "Spontaneity", {"art": 1, "history": 2}),
+    ("Foodie", "Flow", {"art": -4, "foodie": 1}),
+    (None, None, None)
+]
+
+def _js_weighting(persona, planning, meta_preferences):
+    """calculatePersonaScores v2.0: 0.5 per exact-match pick, plus 0.5 x the persona's share of metaPreferences"""
+    counts = {key: max((meta_preferences or {}).get(key) or 0, 0) for key in ("art", "foodie", "history", "adventure")}
+    total = sum(counts.values())
+    persona_keys = {"Art": "art", "Food": "foodie", "History": "history", "Adventure": "adventure"}
+    return {
+        "personaScores": {
+            name: (0.5 if name == persona else 0.0) + 0.5 * (counts[key] / total if total else 0.0)
+            for name, key in persona_keys.items()
+        },
+        "planningScores": {name: 0.5 if name == planning else 0.0 for name in PLANNING_STYLES}
+    }
+
+def test_scores_match_the_js_weighting():
+    assert [score_user(*selection) for selection in SELECTIONS] == [_js_weighting(*selection) for selection in SELECTIONS]
+
+def test_unknown_picks_score_only_behavior():
+    scores = score_user("art", "Spontaneity", {"history": 2})
+    assert scores["personaScores"] == {"Art": 0.0, "Food": 0.0, "History": 0.5, "Adventure": 0.0}
+    assert set(scores["planningScores"].values()) == {0.0}
+
+def test_a_pick_alone_still_meets_the_query_threshold():
+    # findArtPeople & co default to 0.5
+    assert score_user("Art", None, {"foodie": 9})["personaScores"]["Art"] == 0.5
+    assert score_user(None, None, {"art": 5})["personaScores"]["Art"] == 0.5
+    assert score_user("Art", None, {"art": 1, "foodie": 1})["personaScores"]["Art"] == 0.75
+
+def test_bulk_scores_match_score_user():
+    np = pytest.importorskip("numpy")
+    persona_scores, planning_scores = score(
+        np.array([_index(persona, PERSONAS) for persona, _, _ in SELECTIONS], dtype=np.intp),
+        np.array([_index(planning, PLANNING_STYLES) for _, planning, _ in SELECTIONS], dtype=np.intp),
+        np.array([_meta_counts(meta) for _, _, meta in SELECTIONS], dtype=np.float64).reshape(-1, len(META_PREFERENCES))
+    )
+    bulk = [
+        {"personaScores": dict(zip(PERSONAS, personas)), "planningScores": dict(zip(PLANNING_STYLES, planning))}
+        for personas, planning in zip(persona_scores.tolist(), planning_scores.tolist())
+    ]
+    assert bulk == [score_user(*selection) for selection in SELECTIONS]
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+def test_scores_match_persona_score_service():
+    # Run the service's own calculatePersonaScores; its models (and mongoose) are not needed to calculate
+    script = (
+        "const path = require('path');"
+        "const service = process.argv[1];"
+        "for (const model of ['PersonaScore', 'UserSelections']) {"
+        "  require.cache[require.resolve(path.join(path.dirname(service), '../models/TripWell', model))] = "
+        "  { exports: {} };"
+        "}"
+        "const { calculatePersonaScores } = require(service);"
+        "const selections = JSON.parse(process.argv[2]);"
+        "console.log(JSON.stringify(selections.map(([persona, planningStyle, metaPreferences]) => "
+        "calculatePersonaScores({ persona, planningStyle }, metaPreferences || undefined))));"
+    )
+    output = subprocess.run(["node", "-e", script, os.path.abspath(SERVICE), json.dumps(SELECTIONS)],
+                            capture_output=True, text=True, check=True).stdout
+    assert json.loads(output) == [score_user(*selection) for selection in SELECTIONS]
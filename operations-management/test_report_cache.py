@@ -0,0 +1,27 @@
+"""
+Report cache key checks (python -m pytest test_report_cache.py)
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from data_access import parse_date_range
+from report_cache import cache_key
+
+def _key(start, end="2025-02-01T00:00:00Z"):
+    return cache_key("user_analytics", {"date_range": {"start": start, "end": end}})
+
+def test_different_instants_get_different_keys():
+    assert _key("2025-01-01T00:00:00+05:00") != _key("2025-01-01T00:00:00Z")
+    assert parse_date_range({"start": "2025-01-01T00:00:00+05:00"}) != parse_date_range({"start": "2025-01-01T00:00:00Z"})
+
+def test_same_instant_in_any_offset_shares_a_key():
+    utc = _key("2025-01-01T00:00:00Z")
+    assert _key("2025-01-01T05:00:00+05:00") == utc
+    assert _key("2024-12-31T19:00:00-05:00") == utc
+    assert _key("2025-01-01T00:00:00") == utc
+    assert _key(datetime(2025, 1, 1, 5, tzinfo=timezone(timedelta(hours=5)))) == utc
+    assert _key(datetime(2025, 1, 1)) == utc
+
+def test_data_source_is_part_of_the_key():
+    params = {"date_range": {"start": "2025-01-01"}}
+    assert cache_key("user_analytics", params, "TripWell") != cache_key("user_analytics", params, "TripWellStaging")
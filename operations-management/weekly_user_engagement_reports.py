@@ -16,14 +16,51 @@ import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 
+from activity_sketches import ActivitySketches
+from data_access import TripWellDataAccess, get_data_access
+from report_cache import ReportCache, cached_report, get_report_cache
+from retention_engine import RetentionEngine
+
 logger = logging.getLogger(__name__)
 
+# Signup cohorts (in weeks, ending with the reported week) behind the retention figures
+RETENTION_COHORT_WEEKS = 12
+
+def _monday(week_start: Optional[datetime] = None) -> datetime:
+    """Midnight on the given week start, or on Monday of the current (UTC) week"""
+    if not week_start:
+        today = datetime.utcnow()
+        week_start = today - timedelta(days=today.weekday())
+    return week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+
 class WeeklyUserEngagementReports:
     """Service for generating weekly user engagement reports"""
     
-    def __init__(self):
+    def __init__(self, data_access: Optional[TripWellDataAccess] = None,
+                 report_cache: Optional[ReportCache] = None):
+        self.data = data_access or get_data_access()
+        self.report_cache = report_cache if report_cache is not None else get_report_cache()
+        self.sketches = ActivitySketches(self.data, report_cache=self.report_cache)
+        self._retention_engines = {}
         logger.info("📅 Weekly User Engagement Reports initialized")
     
+    def _retention_cohorts(self, week_start: Optional[datetime] = None):
+        """
+        Retention engine covering the cohort weeks up to week_start plus every day since
+        
+        Returns:
+            (engine, first cohort day offset, last cohort day offset)
+        """
+        week_start = _monday(week_start)
+        first_week = week_start - timedelta(weeks=RETENTION_COHORT_WEEKS - 1)
+        end = max(datetime.utcnow(), week_start + timedelta(days=6))
+        key = (week_start, end.date())
+        if key not in self._retention_engines:
+            # One engine per week and day: the lifecycle and retention reports share it
+            self._retention_engines = {key: RetentionEngine.from_data(self.data, first_week, end)}
+        return self._retention_engines[key], 0, RETENTION_COHORT_WEEKS * 7 - 1
+    
+    @cached_report("weekly_user_engagement")
     def generate_weekly_summary(self, week_start: Optional[datetime] = None) -> Dict:
         """
         Generate weekly user engagement summary
@@ -34,14 +71,22 @@ class WeeklyUserEngagementReports:
         Returns:
             Dict containing weekly engagement summary
         """
-        if not week_start:
-            # Get Monday of current week
-            today = datetime.now()
-            week_start = today - timedelta(days=today.weekday())
+        week_start = _monday(week_start)
+        week_end = week_start + timedelta(days=7)
         
         logger.info(f"📊 Generating weekly summary for week starting {week_start.date()}")
         
-        # TODO: Implement weekly engagement analysis
+        in_week = {"$gte": week_start, "$lt": week_end}
+        new_users = self.data.count("TripWellUser", {"createdAt": in_week})
+        if self.sketches.covers({"start": week_start, "end": week_end}):
+            # Signups count as activity, so everyone active this week who is not new is returning
+            active_users = self.sketches.distinct("active_users", {"start": week_start, "end": week_end})["estimate"]
+            returning_users = max(active_users - new_users, 0)
+        else:
+            active_users = self.data.count("TripWellUser", {"updatedAt": in_week})
+            returning_users = self.data.count("TripWellUser", {"updatedAt": in_week, "createdAt": {"$lt": week_start}})
+        
+        # TODO: Implement engagement score, retention and trend analysis
         return {
             "success": True,
             "report_type": "weekly_user_engagement",
@@ -49,11 +94,11 @@ class WeeklyUserEngagementReports:
             "week_end": (week_start + timedelta(days=6)).isoformat(),
             "generated_at": datetime.now().isoformat(),
             "weekly_metrics": {
-                "new_users": 0,
-                "active_users": 0,
-                "returning_users": 0,
-                "profile_completions": 0,
-                "trip_creations": 0,
+                "new_users": new_users,
+                "active_users": active_users,
+                "returning_users": returning_users,
+                "profile_completions": self.data.count("TripWellUser", {"createdAt": in_week, "profileComplete": True}),
+                "trip_creations": self.data.count("TripBase", {"createdAt": in_week}),
                 "engagement_score": 0.0,
                 "retention_rate": 0.0,
                 "churn_rate": 0.0
@@ -66,6 +111,7 @@ class WeeklyUserEngagementReports:
             "message": "Weekly user engagement summary generated successfully"
         }
     
+    @cached_report("user_lifecycle_analysis")
     def analyze_user_lifecycle(self, week_start: Optional[datetime] = None) -> Dict:
         """
         Analyze user lifecycle patterns for the week
@@ -78,7 +124,10 @@ class WeeklyUserEngagementReports:
         """
         logger.info("🔄 Analyzing user lifecycle patterns")
         
-        # TODO: Implement user lifecycle analysis
+        # Rolling retention: back on day N or any day after it
+        engine, first_day, last_day = self._retention_cohorts(week_start)
+        
+        # TODO: Implement activation, completion and time-to-stage analysis
         return {
             "success": True,
             "report_type": "user_lifecycle_analysis",
@@ -87,8 +136,8 @@ class WeeklyUserEngagementReports:
                 "new_user_activation": 0.0,
                 "profile_completion_rate": 0.0,
                 "first_trip_creation_rate": 0.0,
-                "user_retention_7day": 0.0,
-                "user_retention_30day": 0.0,
+                "user_retention_7day": engine.retention_rate(first_day, last_day, 7, rolling=True),
+                "user_retention_30day": engine.retention_rate(first_day, last_day, 30, rolling=True),
                 "average_time_to_profile": 0,
                 "average_time_to_first_trip": 0
             },
@@ -99,6 +148,7 @@ class WeeklyUserEngagementReports:
             "message": "User lifecycle analysis completed successfully"
         }
     
+    @cached_report("retention_analysis")
     def generate_retention_report(self, week_start: Optional[datetime] = None) -> Dict:
         """
         Generate user retention analysis report
@@ -111,16 +161,18 @@ class WeeklyUserEngagementReports:
         """
         logger.info("📈 Generating retention report")
         
-        # TODO: Implement retention analysis
+        engine, first_day, last_day = self._retention_cohorts(week_start)
+        
+        # TODO: Implement churn analysis
         return {
             "success": True,
             "report_type": "retention_analysis",
             "generated_at": datetime.now().isoformat(),
             "retention_metrics": {
-                "day_1_retention": 0.0,
-                "day_7_retention": 0.0,
-                "day_30_retention": 0.0,
-                "cohort_retention": {},
+                "day_1_retention": engine.retention_rate(first_day, last_day, 1),
+                "day_7_retention": engine.retention_rate(first_day, last_day, 7),
+                "day_30_retention": engine.retention_rate(first_day, last_day, 30),
+                "cohort_retention": engine.cohort_matrix(first_day, RETENTION_COHORT_WEEKS),
                 "churn_analysis": {
                     "primary_churn_points": [],
                     "churn_rate_by_segment": {}
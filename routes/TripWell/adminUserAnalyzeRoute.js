@@ -1,6 +1,6 @@
 const express = require("express");
 const router = express.Router();
-const axios = require("axios");
+const { brainPost, brainGet, sendBusyResponse } = require("../../services/TripWell/pythonBrainClient");
 
 // Environment variables
 const TRIPWELL_AI_BRAIN = process.env.TRIPWELL_AI_BRAIN || 'https://tripwell-ai.onrender.com';
@@ -52,10 +52,7 @@ router.post("/analyze-user", async (req, res) => {
     console.log('📤 Sending to Python service:', analysisRequest);
 
     // Call Python service
-    const pythonResponse = await axios.post(`${TRIPWELL_AI_BRAIN}/analyze-user`, analysisRequest, {
-      headers: {
-        'Content-Type': 'application/json',
-      },
+    const pythonResponse = await brainPost(TRIPWELL_AI_BRAIN, '/analyze-user', analysisRequest, {
       timeout: 15000 // Give Python time to analyze
     });
 
@@ -82,7 +79,9 @@ router.post("/analyze-user", async (req, res) => {
   } catch (error) {
     console.error('❌ Admin user analysis error:', error.message);
     
-    if (error.response) {
+    if (sendBusyResponse(res, error)) {
+      // Python service saturated - 429 with Retry-After already sent
+    } else if (error.response) {
       // Python service responded with error
       res.status(error.response.status).json({
         success: false,
@@ -115,7 +114,7 @@ router.get("/get-user/:userId", async (req, res) => {
     console.log('🔍 Fetching updated user data for:', userId);
     
     // Call Python service to get user data from MongoDB
-    const pythonResponse = await axios.get(`${TRIPWELL_AI_BRAIN}/get-user/${userId}`, {
+    const pythonResponse = await brainGet(TRIPWELL_AI_BRAIN, `/get-user/${userId}`, {
       timeout: 10000
     });
     
@@ -143,7 +142,9 @@ router.get("/get-user/:userId", async (req, res) => {
   } catch (error) {
     console.error('❌ Error fetching user:', error.message);
     
-    if (error.response) {
+    if (sendBusyResponse(res, error)) {
+      // Python service saturated - 429 with Retry-After already sent
+    } else if (error.response) {
       res.status(error.response.status).json({
         success: false,
         error: "Python service error",
@@ -30,7 +30,7 @@ router.put("/profile", verifyFirebaseToken, async (req, res) => {
     
     // Use PersonaScore service for clean weight calculation
     const userSelections = { persona, planningStyle };
-    const personaScore = await savePersonaScores(currentUser._id, userSelections);
+    const personaScore = await savePersonaScores(currentUser._id, userSelections, firebaseId);
     
     // Update profile and set state flags
     // Update user with profile data
@@ -9,7 +9,7 @@
 
 const TripPersona = require("../../models/TripWell/TripPersona");
 const TripBase = require("../../models/TripWell/TripBase");
-const { generatePromptPython } = require('./pythonPromptService');
+const { generatePromptPython, generatePromptsPython } = require('./pythonPromptService');
 
 /**
  * Get user context from MongoDB
@@ -25,6 +25,13 @@ async function getUserContext(tripId, userId) {
     throw new Error("TripBase not found");
   }
   
+  return buildUserContext(tripPersona, tripBase);
+}
+
+/**
+ * Build the Python prompt request from a trip persona and its trip
+ */
+function buildUserContext(tripPersona, tripBase) {
   // Calculate persona weights from primaryPersona
   const personaWeights = {
     art: tripPersona.primaryPersona === 'art' ? 0.6 : 0.1,
@@ -89,4 +96,55 @@ async function needSmartPromptService(tripId, userId) {
   }
 }
 
-module.exports = { needSmartPromptService };
+/**
+ * Batch version for backfills and admin sweeps
+ * Loads every TripPersona and TripBase with one query each, then sends all
+ * prompts through the Python batch endpoint
+ * @param {Array<{tripId, userId}>} items
+ * @returns {Array<Object>} One result per item, in order, each shaped like needSmartPromptService's
+ */
+async function needSmartPromptServiceBatch(items) {
+  console.log(`🧠 NeedSmartPromptService batch starting for ${items.length} trips`);
+  const tripIds = [...new Set(items.map(item => String(item.tripId)))];
+  const [tripPersonas, tripBases] = await Promise.all([
+    TripPersona.find({ tripId: { $in: tripIds } }),
+    TripBase.find({ _id: { $in: tripIds } })
+  ]);
+  const personaByTripUser = new Map(tripPersonas.map(p => [`${p.tripId}:${p.userId}`, p]));
+  const baseById = new Map(tripBases.map(t => [String(t._id), t]));
+
+  const results = new Array(items.length);
+  const contexts = [];  // [index, userContext] for items with complete context
+  items.forEach(({ tripId, userId }, index) => {
+    const tripPersona = personaByTripUser.get(`${tripId}:${userId}`);
+    const tripBase = baseById.get(String(tripId));
+    if (!tripPersona) {
+      results[index] = { success: false, message: "TripPersona not found" };
+    } else if (!tripBase) {
+      results[index] = { success: false, message: "TripBase not found" };
+    } else {
+      contexts.push([index, buildUserContext(tripPersona, tripBase)]);
+    }
+  });
+
+  const promptResults = await generatePromptsPython(contexts.map(([, userContext]) => userContext));
+  contexts.forEach(([index, userContext], position) => {
+    const promptResult = promptResults[position];
+    results[index] = promptResult.success ? {
+      success: true,
+      prompt: promptResult.prompt,
+      metadata: promptResult.metadata,
+      userContext: userContext,
+      message: "Smart prompt generated successfully"
+    } : {
+      success: false,
+      message: `Python prompt generation failed: ${promptResult.message}`
+    };
+  });
+
+  const failed = results.filter(result => !result.success).length;
+  console.log(`✅ NeedSmartPromptService batch done: ${items.length - failed} ok, ${failed} failed`);
+  return results;
+}
+
+module.exports = { needSmartPromptService, needSmartPromptServiceBatch };
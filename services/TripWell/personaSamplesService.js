@@ -1,6 +1,6 @@
 const { OpenAI } = require("openai");
 // pythonSampleService removed - using pythonPromptService instead
-const { generatePromptPython } = require('./pythonPromptService');
+const { generatePromptPython, generatePromptsPython } = require('./pythonPromptService');
 
 const openai = new OpenAI();
 
@@ -42,6 +42,34 @@ async function generatePersonaSamplesNew(city, personaWeights, budget, budgetLev
   }
 }
 
+/**
+ * Batch version of generatePersonaSamplesNew for sweeps over many users
+ * @param {Array<Object>} requests - { city, personaWeights, budget, budgetLevel, romanceLevel,
+ *   caretakerRole, flexibility, whoWith, dailySpacing, season, purpose } per user
+ * @returns {Array<Object>} { success, samples } or { success: false, error } per request, in order
+ */
+async function generatePersonaSamplesNewBatch(requests) {
+  console.log(`🎯 Generating persona samples for ${requests.length} requests with Python service...`);
+  
+  const results = await generatePromptsPython(requests.map(request => ({
+    city: request.city,
+    persona_weights: request.personaWeights,
+    budget: request.budget,
+    budget_level: request.budgetLevel,
+    romance_level: request.romanceLevel,
+    caretaker_role: request.caretakerRole,
+    flexibility: request.flexibility,
+    who_with: request.whoWith,
+    daily_spacing: request.dailySpacing,
+    season: request.season,
+    purpose: request.purpose
+  })));
+  
+  return results.map(result => result.success
+    ? { success: true, samples: result.samples }
+    : { success: false, error: result.message });
+}
+
 /**
  * Generate persona-based samples for user learning (legacy function)
  * Returns 2 attractions, 2 restaurants, 2 neat things tagged by persona
@@ -248,5 +276,6 @@ Return only the JSON object. No explanations, markdown, or extra commentary.`;
 module.exports = {
   generatePersonaSamples,
   generatePersonaSamplesNew,
+  generatePersonaSamplesNewBatch,
   updatePersonaWeights
 };
@@ -0,0 +1,155 @@
+/**
+ * Python Brain Client - Shared HTTP client for the Python AI service
+ *
+ * - TRIPWELL_AI_BRAIN may list several instances (comma-separated), e.g. one
+ *   per worker process/core; each request goes to the least busy instance
+ * - Keep-alive agents reuse connections instead of a new socket per call
+ * - Each instance takes PYTHON_BRAIN_MAX_INFLIGHT requests at once; the rest wait
+ *   in a bounded queue (PYTHON_BRAIN_MAX_QUEUE), and when that is full callers
+ *   get an EBRAINBUSY error with retryAfter so routes can answer 429
+ * - 429/503 responses from the service are retried after their Retry-After
+ */
+
+const http = require('http');
+const https = require('https');
+const axios = require('axios');
+
+const MAX_INFLIGHT_PER_INSTANCE = parseInt(process.env.PYTHON_BRAIN_MAX_INFLIGHT || '8', 10);
+const MAX_QUEUE = parseInt(process.env.PYTHON_BRAIN_MAX_QUEUE || '100', 10);
+const MAX_RETRIES = 2;
+const MAX_RETRY_WAIT_MS = 5000;
+const BUSY_RETRY_AFTER_SECONDS = 1;
+
+const client = axios.create({
+  httpAgent: new http.Agent({ keepAlive: true }),
+  httpsAgent: new https.Agent({ keepAlive: true }),
+  headers: { 'Content-Type': 'application/json' }
+});
+
+const instances = new Map();  // base URL -> { url, inflight }
+const queue = [];             // waiting { pool, resolve }
+const stats = { requests: 0, queued: 0, rejected: 0, retries: 0 };
+
+function parseInstances(baseUrls) {
+  return baseUrls.split(',').map(url => url.trim().replace(/\/$/, '')).filter(Boolean).map(url => {
+    if (!instances.has(url)) instances.set(url, { url, inflight: 0 });
+    return instances.get(url);
+  });
+}
+
+function leastBusy(pool) {
+  const instance = pool.reduce((best, candidate) => candidate.inflight < best.inflight ? candidate : best);
+  return instance.inflight < MAX_INFLIGHT_PER_INSTANCE ? instance : null;
+}
+
+function acquire(pool) {
+  const instance = leastBusy(pool);
+  if (instance) {
+    instance.inflight++;
+    return Promise.resolve(instance);
+  }
+  if (queue.length >= MAX_QUEUE) {
+    stats.rejected++;
+    const error = new Error("Python service is busy, please retry shortly");
+    error.code = 'EBRAINBUSY';
+    error.retryAfter = BUSY_RETRY_AFTER_SECONDS;
+    return Promise.reject(error);
+  }
+  stats.queued++;
+  return new Promise(resolve => queue.push({ pool, resolve }));
+}
+
+function release(instance) {
+  instance.inflight--;
+  // Hand the free slot to the first waiter that can use this instance
+  const index = queue.findIndex(waiter => waiter.pool.includes(instance));
+  if (index !== -1) {
+    const [waiter] = queue.splice(index, 1);
+    instance.inflight++;
+    waiter.resolve(instance);
+  }
+}
+
+function retryAfterMs(error) {
+  const header = error.response && error.response.headers && error.response.headers['retry-after'];
+  const seconds = Number(header);
+  return Math.min(Number.isFinite(seconds) && seconds > 0 ? seconds * 1000 : 500, MAX_RETRY_WAIT_MS);
+}
+
+/**
+ * Send one request to the Python service
+ * @param {string} baseUrls - TRIPWELL_AI_BRAIN value (one URL or a comma-separated list)
+ * @param {Object} config - axios request config with a path as url
+ * @returns {Object} axios response; errors are axios errors or EBRAINBUSY
+ */
+async function brainRequest(baseUrls, config) {
+  const pool = parseInstances(baseUrls);
+  stats.requests++;
+  for (let attempt = 0; ; attempt++) {
+    const instance = await acquire(pool);
+    let failure;
+    try {
+      return await client.request({ ...config, url: `${instance.url}${config.url}` });
+    } catch (error) {
+      failure = error;
+    } finally {
+      release(instance);
+    }
+    // The slot is released before waiting, so a backed-off request does not hold it
+    const status = failure.response && failure.response.status;
+    if (![429, 503].includes(status) || attempt >= MAX_RETRIES) throw failure;
+    stats.retries++;
+    console.log(`⏳ Python service returned ${status}, retrying in ${retryAfterMs(failure)}ms`);
+    await new Promise(resolve => setTimeout(resolve, retryAfterMs(failure)));
+  }
+}
+
+function brainPost(baseUrls, path, data, options = {}) {
+  return brainRequest(baseUrls, { ...options, method: 'post', url: path, data });
+}
+
+function brainGet(baseUrls, path, options = {}) {
+  return brainRequest(baseUrls, { ...options, method: 'get', url: path });
+}
+
+/**
+ * Every configured instance, for per-instance health checks
+ */
+function brainInstances(baseUrls) {
+  return parseInstances(baseUrls).map(instance => instance.url);
+}
+
+/**
+ * Set Retry-After and answer 429 if the error means the Python service is saturated
+ * @returns {boolean} true when a 429 response was sent
+ */
+function sendBusyResponse(res, error) {
+  const status = error.response && error.response.status;
+  if (error.code !== 'EBRAINBUSY' && status !== 429) return false;
+  const retryAfter = error.retryAfter || (error.response.headers && error.response.headers['retry-after']) || BUSY_RETRY_AFTER_SECONDS;
+  res.set('Retry-After', String(retryAfter));
+  res.status(429).json({
+    success: false,
+    error: "Python service busy",
+    message: "Too many analysis requests in flight, please retry shortly",
+    retryAfter: Number(retryAfter)
+  });
+  return true;
+}
+
+function getBrainClientStats() {
+  return {
+    ...stats,
+    waiting: queue.length,
+    instances: [...instances.values()].map(({ url, inflight }) => ({ url, inflight }))
+  };
+}
+
+module.exports = {
+  brainRequest,
+  brainPost,
+  brainGet,
+  brainInstances,
+  sendBusyResponse,
+  getBrainClientStats
+};
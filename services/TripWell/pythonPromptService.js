@@ -4,113 +4,402 @@
  */
 
 const axios = require('axios');
+const { brainPost, brainInstances, getBrainClientStats } = require('./pythonBrainClient');
 
-// Get Python service URL from environment
+// Get Python service URL(s) from environment - comma-separate several instances to spread load
 const PYTHON_SERVICE_URL = process.env.TRIPWELL_AI_BRAIN || 'http://localhost:5000';
 
+// Prompt cache settings - near-identical requests share one Python round trip
+const PROMPT_CACHE_MAX_ENTRIES = parseInt(process.env.PROMPT_CACHE_MAX_ENTRIES || '1000', 10);
+const PROMPT_CACHE_TTL_MS = parseInt(process.env.PROMPT_CACHE_TTL_MS || String(60 * 60 * 1000), 10);
+const PROMPT_BATCH_MAX_SIZE = parseInt(process.env.PROMPT_BATCH_MAX_SIZE || '100', 10);
+const PROMPT_BATCH_FALLBACK_CONCURRENCY = 8;  // parallel single calls when /generate-prompt/batch is missing
+const WEIGHT_STEP = 0.05;  // persona weights and 0-1 levels are rounded to this step
+const BUDGET_STEP = 10;    // daily budget is rounded to this many dollars
+
+const PROMPT_FIELDS = [
+  'city', 'persona_weights', 'budget_level', 'romance_level', 'caretaker_role',
+  'flexibility', 'who_with', 'daily_spacing', 'season', 'purpose', 'budget'
+];
+
+const promptCache = new Map();      // key -> { expiresAt, result }, oldest first (LRU order)
+const inflightPrompts = new Map();  // key -> Promise, so concurrent identical calls share one request
+const promptCacheStats = { hits: 0, misses: 0, shared: 0, evictions: 0 };
+
+function quantize(value, step) {
+  return Math.round(value / step) * step;
+}
+
+function canonicalValue(value) {
+  if (typeof value === 'string') return value.trim().toLowerCase();
+  if (typeof value === 'number') return Number(quantize(value, WEIGHT_STEP).toFixed(2));
+  return value === undefined ? null : value;
+}
+
+/**
+ * Daily budget rounded to BUDGET_STEP; numeric strings ("500", "$1,200") are parsed first
+ */
+function canonicalBudget(value) {
+  const digits = typeof value === 'string' ? value.replace(/[$,\s]/g, '') : null;
+  const amount = digits === null ? value : (digits ? Number(digits) : NaN);
+  if (typeof amount === 'number' && Number.isFinite(amount)) {
+    return quantize(amount, BUDGET_STEP);
+  }
+  return canonicalValue(value);
+}
+
+/**
+ * Build the cache key for a prompt request
+ * Fields are sorted, strings lowercased and every weight/level rounded, so
+ * near-identical requests share a key. Persona weights are rounded as sent
+ * (not normalized): /generate-prompt sees the absolute values
+ */
+function promptCacheKey(requestData) {
+  const canonical = {};
+  for (const field of [...PROMPT_FIELDS].sort()) {
+    const value = requestData[field];
+    if (field === 'persona_weights' && value && typeof value === 'object') {
+      canonical[field] = Object.keys(value).sort().map(persona =>
+        [persona.toLowerCase(), Number(quantize(Number(value[persona]) || 0, WEIGHT_STEP).toFixed(2))]
+      );
+    } else if (field === 'budget') {
+      canonical[field] = canonicalBudget(value);
+    } else {
+      canonical[field] = canonicalValue(value);
+    }
+  }
+  return JSON.stringify(canonical);
+}
+
+function getCachedPrompt(key) {
+  const entry = promptCache.get(key);
+  if (!entry) return null;
+  if (entry.expiresAt <= Date.now()) {
+    promptCache.delete(key);
+    return null;
+  }
+  // Re-insert to mark as most recently used
+  promptCache.delete(key);
+  promptCache.set(key, entry);
+  return entry.result;
+}
+
+function setCachedPrompt(key, result) {
+  promptCache.set(key, { expiresAt: Date.now() + PROMPT_CACHE_TTL_MS, result });
+  while (promptCache.size > PROMPT_CACHE_MAX_ENTRIES) {
+    promptCache.delete(promptCache.keys().next().value);
+    promptCacheStats.evictions++;
+  }
+}
+
 /**
  * Generate rich prompt using Python service
+ * Successful prompts are cached by canonicalized request (see promptCacheKey)
  * @param {Object} requestData - Sample generation request
- * @returns {Object} Generated prompt
+ * @returns {Object} Generated prompt, with cached: true when served from the cache
  */
 async function generatePromptPython(requestData) {
+  const key = promptCacheKey(requestData);
+  const cached = getCachedPrompt(key);
+  if (cached) {
+    promptCacheStats.hits++;
+    return { ...cached, cached: true };
+  }
+  if (inflightPrompts.has(key)) {
+    promptCacheStats.shared++;
+    const shared = await inflightPrompts.get(key);
+    return { ...shared, cached: shared.success };
+  }
+
+  promptCacheStats.misses++;
+  const request = requestPromptPython(requestData);
+  inflightPrompts.set(key, request);
+  try {
+    const result = await request;
+    // Only successful prompts are cached; errors are retried on the next call
+    if (result.success) setCachedPrompt(key, result);
+    return { ...result, cached: false };
+  } finally {
+    inflightPrompts.delete(key);
+  }
+}
+
+/**
+ * Call the Python /generate-prompt endpoint (uncached)
+ */
+async function requestPromptPython(requestData) {
   try {
     console.log("🐍 Calling Python prompt generation service...");
     console.log("🐍 Request data:", JSON.stringify(requestData, null, 2));
 
-    const response = await axios.post(`${PYTHON_SERVICE_URL}/generate-prompt`, {
-      city: requestData.city,
-      persona_weights: requestData.persona_weights,
-      budget_level: requestData.budget_level,
-      romance_level: requestData.romance_level,
-      caretaker_role: requestData.caretaker_role,
-      flexibility: requestData.flexibility,
-      who_with: requestData.who_with,
-      daily_spacing: requestData.daily_spacing,
-      season: requestData.season,
-      purpose: requestData.purpose,
-      budget: requestData.budget
-    }, {
-      timeout: 30000, // 30 second timeout
-      headers: {
-        'Content-Type': 'application/json'
-      }
+    const response = await brainPost(PYTHON_SERVICE_URL, '/generate-prompt', promptPayload(requestData), {
+      timeout: 30000 // 30 second timeout
     });
 
-    if (response.data.status === 'success') {
-      console.log("✅ Python prompt generation successful");
-      
-      return {
-        success: true,
-        prompt: response.data.prompt,
-        metadata: response.data.metadata,
-        message: "Prompt generated successfully"
-      };
-    } else {
-      console.error("❌ Python service returned error:", response.data.message);
-      return {
-        success: false,
-        prompt: "",
-        metadata: {},
-        message: response.data.message || "Python service error"
-      };
-    }
+    return toPromptResult(response.data);
 
   } catch (error) {
     console.error("❌ Python prompt generation failed:", error.message);
+    return promptErrorResult(error);
+  }
+}
+
+/**
+ * Request body for /generate-prompt
+ */
+function promptPayload(requestData) {
+  return {
+    city: requestData.city,
+    persona_weights: requestData.persona_weights,
+    budget_level: requestData.budget_level,
+    romance_level: requestData.romance_level,
+    caretaker_role: requestData.caretaker_role,
+    flexibility: requestData.flexibility,
+    who_with: requestData.who_with,
+    daily_spacing: requestData.daily_spacing,
+    season: requestData.season,
+    purpose: requestData.purpose,
+    budget: requestData.budget
+  };
+}
+
+/**
+ * Convert one Python prompt response into the service result shape
+ */
+function toPromptResult(data) {
+  if (data && data.status === 'success') {
+    console.log("✅ Python prompt generation successful");
     
-    // Handle different types of errors
-    if (error.code === 'ECONNREFUSED') {
-      console.error("❌ Python service is not running or not accessible");
-      return {
-        success: false,
-        prompt: "",
-        metadata: {},
-        message: "Python service is not running. Please start the Python AI service."
-      };
-    } else if (error.code === 'ECONNABORTED') {
-      console.error("❌ Python service request timed out");
-      return {
-        success: false,
-        prompt: "",
-        metadata: {},
-        message: "Python service request timed out. Please try again."
-      };
+    return {
+      success: true,
+      prompt: data.prompt,
+      metadata: data.metadata,
+      message: "Prompt generated successfully"
+    };
+  } else {
+    console.error("❌ Python service returned error:", data && data.message);
+    return {
+      success: false,
+      prompt: "",
+      metadata: {},
+      message: (data && data.message) || "Python service error"
+    };
+  }
+}
+
+/**
+ * Convert a failed Python call into the service result shape
+ */
+function promptErrorResult(error) {
+  // Handle different types of errors
+  if (error.code === 'ECONNREFUSED') {
+    console.error("❌ Python service is not running or not accessible");
+    return {
+      success: false,
+      prompt: "",
+      metadata: {},
+      message: "Python service is not running. Please start the Python AI service."
+    };
+  } else if (error.code === 'EBRAINBUSY' || (error.response && error.response.status === 429)) {
+    console.error("❌ Python service is saturated");
+    return {
+      success: false,
+      prompt: "",
+      metadata: {},
+      message: "Python service is busy. Please try again shortly."
+    };
+  } else if (error.code === 'ECONNABORTED') {
+    console.error("❌ Python service request timed out");
+    return {
+      success: false,
+      prompt: "",
+      metadata: {},
+      message: "Python service request timed out. Please try again."
+    };
+  } else {
+    return {
+      success: false,
+      prompt: "",
+      metadata: {},
+      message: `Python service error: ${error.message}`
+    };
+  }
+}
+
+/**
+ * Generate prompts for many requests at batch throughput
+ * Cached requests are answered locally, duplicates are sent once, and the rest go to
+ * /generate-prompt/batch in chunks of PROMPT_BATCH_MAX_SIZE (falling back to parallel
+ * single calls if the Python service has no batch endpoint)
+ * @param {Array<Object>} requests - Sample generation requests
+ * @returns {Array<Object>} One result per request, in order; failures carry success: false and a message
+ */
+async function generatePromptsPython(requests) {
+  const results = new Array(requests.length);
+  const pending = new Map();  // key -> { requestData, indexes, resolve }
+  const joined = new Map();   // key -> { promise, indexes } for prompts another call is already fetching
+
+  requests.forEach((requestData, index) => {
+    const key = promptCacheKey(requestData);
+    const cached = getCachedPrompt(key);
+    if (cached) {
+      promptCacheStats.hits++;
+      results[index] = { ...cached, cached: true };
+    } else if (pending.has(key)) {
+      promptCacheStats.shared++;
+      pending.get(key).indexes.push(index);
+    } else if (joined.has(key) || inflightPrompts.has(key)) {
+      promptCacheStats.shared++;
+      if (!joined.has(key)) joined.set(key, { promise: inflightPrompts.get(key), indexes: [] });
+      joined.get(key).indexes.push(index);
     } else {
-      return {
-        success: false,
-        prompt: "",
-        metadata: {},
-        message: `Python service error: ${error.message}`
-      };
+      promptCacheStats.misses++;
+      const group = { requestData, indexes: [index] };
+      // Registered as in flight so single-prompt calls for the same key wait for this batch
+      inflightPrompts.set(key, new Promise(resolve => { group.resolve = resolve; }));
+      pending.set(key, group);
+    }
+  });
+
+  console.log(`🐍 Batch prompt generation: ${requests.length} requests, ${pending.size} to generate`);
+  const groups = [...pending.entries()];
+  try {
+    for (let start = 0; start < groups.length; start += PROMPT_BATCH_MAX_SIZE) {
+      const chunk = groups.slice(start, start + PROMPT_BATCH_MAX_SIZE);
+      const chunkResults = await requestPromptBatchPython(chunk.map(([, group]) => group.requestData));
+      chunk.forEach(([key, group], position) => {
+        const result = chunkResults[position];
+        if (result.success) setCachedPrompt(key, result);
+        // Duplicates only count as cached when the prompt they share was generated
+        group.indexes.forEach((index, n) => {
+          results[index] = { ...result, cached: n > 0 && result.success };
+        });
+        settleInflight(key, group, result);
+      });
+    }
+  } finally {
+    // Anything left unsettled (the batch call threw) fails instead of leaving waiters hanging
+    for (const [key, group] of groups) {
+      settleInflight(key, group, { success: false, prompt: "", metadata: {}, message: "Batch prompt generation failed" });
     }
   }
+
+  for (const { promise, indexes } of joined.values()) {
+    const result = await promise;
+    indexes.forEach(index => {
+      results[index] = { ...result, cached: result.success };
+    });
+  }
+  return results;
+}
+
+function settleInflight(key, group, result) {
+  if (!group.resolve) return;
+  group.resolve(result);
+  group.resolve = null;
+  inflightPrompts.delete(key);
 }
 
 /**
- * Check if Python service is healthy
+ * Call the Python /generate-prompt/batch endpoint (uncached)
  */
-async function checkPythonServiceHealth() {
+async function requestPromptBatchPython(requestList) {
   try {
-    const response = await axios.get(`${PYTHON_SERVICE_URL}/health`, {
-      timeout: 5000
+    const response = await brainPost(PYTHON_SERVICE_URL, '/generate-prompt/batch', {
+      requests: requestList.map(promptPayload)
+    }, {
+      timeout: 120000 // 2 minute timeout for a full batch
     });
-    
-    return {
-      healthy: true,
-      status: response.data.status || 'unknown',
-      message: 'Python service is running'
-    };
+
+    const items = Array.isArray(response.data.results) ? response.data.results : [];
+    return requestList.map((_, index) =>
+      items[index] ? toPromptResult(items[index]) : { success: false, prompt: "", metadata: {}, message: "Missing result in batch response" }
+    );
+
   } catch (error) {
+    if (error.response && [404, 405].includes(error.response.status)) {
+      console.log("⚠️ Python service has no batch endpoint, sending requests individually");
+      return mapWithConcurrency(requestList, PROMPT_BATCH_FALLBACK_CONCURRENCY, requestPromptPython);
+    }
+    console.error("❌ Python batch prompt generation failed:", error.message);
+    const failure = promptErrorResult(error);
+    return requestList.map(() => ({ ...failure }));
+  }
+}
+
+async function mapWithConcurrency(items, limit, fn) {
+  const results = new Array(items.length);
+  let next = 0;
+  const workers = Array.from({ length: Math.min(limit, items.length) }, async () => {
+    while (next < items.length) {
+      const index = next++;
+      results[index] = await fn(items[index]);
+    }
+  });
+  await Promise.all(workers);
+  return results;
+}
+
+/**
+ * Check if Python service is healthy
+ */
+async function checkPythonServiceHealth() {
+  // Health checks skip the request queue and hit every configured instance
+  const instances = await Promise.all(brainInstances(PYTHON_SERVICE_URL).map(async url => {
+    try {
+      const response = await axios.get(`${url}/health`, {
+        timeout: 5000
+      });
+      return { url, healthy: true, status: response.data.status || 'unknown' };
+    } catch (error) {
+      return { url, healthy: false, status: 'error', message: error.message };
+    }
+  }));
+  const healthy = instances.filter(instance => instance.healthy);
+  
+  if (healthy.length) {
     return {
-      healthy: false,
-      status: 'error',
-      message: `Python service is not accessible: ${error.message}`
+      healthy: true,
+      status: healthy[0].status,
+      message: `Python service is running (${healthy.length}/${instances.length} instances)`,
+      instances,
+      client: getBrainClientStats()
     };
   }
+  return {
+    healthy: false,
+    status: 'error',
+    message: `Python service is not accessible: ${instances.map(instance => instance.message).join('; ')}`,
+    instances
+  };
+}
+
+/**
+ * Prompt cache hit-rate stats
+ */
+function getPromptCacheStats() {
+  const lookups = promptCacheStats.hits + promptCacheStats.misses + promptCacheStats.shared;
+  return {
+    ...promptCacheStats,
+    entries: promptCache.size,
+    hitRate: lookups ? (promptCacheStats.hits + promptCacheStats.shared) / lookups : 0
+  };
+}
+
+/**
+ * Drop every cached prompt (e.g. after the Python prompt templates change)
+ */
+function clearPromptCache() {
+  const cleared = promptCache.size;
+  promptCache.clear();
+  return cleared;
 }
 
 module.exports = {
   generatePromptPython,
-  checkPythonServiceHealth
+  generatePromptsPython,
+  checkPythonServiceHealth,
+  getPromptCacheStats,
+  clearPromptCache,
+  promptCacheKey
 };
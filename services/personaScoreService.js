@@ -1,5 +1,6 @@
 // services/personaScoreService.js
 const PersonaScore = require("../models/TripWell/PersonaScore");
+const UserSelections = require("../models/TripWell/UserSelections");
 
 /*
   PersonaScore Service
@@ -7,9 +8,26 @@ const PersonaScore = require("../models/TripWell/PersonaScore");
   ✅ Calculates user decision weights based on selections
   ✅ Individual fields for easy querying and mutation
   ✅ Never hardcoded - all logic in service
+
+  Weighting (calculationVersion "2.0", shared with operations-management/persona_scoring.py):
+  persona = 0.5 if picked + 0.5 x its share of the user's selection behavior
+  (UserSelections behaviorData.metaPreferences); planning style = 0.5 if picked.
+  A pick alone still reaches the 0.5 query threshold.
 */
 
-const calculatePersonaScores = (userSelections) => {
+const CALCULATION_VERSION = "2.0";
+const PICK_SCORE = 0.5;
+const BEHAVIOR_WEIGHT = 0.5;
+
+// behaviorData.metaPreferences counter behind each persona
+const META_PREFERENCES = {
+  Art: "art",
+  Food: "foodie",
+  History: "history",
+  Adventure: "adventure"
+};
+
+const calculatePersonaScores = (userSelections, metaPreferences = {}) => {
   const { persona, planningStyle } = userSelections;
   
   // Initialize all persona scores to 0.0 (points system)
@@ -22,7 +40,17 @@ const calculatePersonaScores = (userSelections) => {
   
   // Set selected persona to 0.5 (standard points)
   if (persona && personaScores.hasOwnProperty(persona)) {
-    personaScores[persona] = 0.5;
+    personaScores[persona] = PICK_SCORE;
+  }
+  
+  // Spread the behavior weight by each persona's share of the user's selections
+  const counts = {};
+  for (const [name, key] of Object.entries(META_PREFERENCES)) {
+    counts[name] = Math.max(Number(metaPreferences[key]) || 0, 0);
+  }
+  const total = Object.values(counts).reduce((sum, count) => sum + count, 0);
+  for (const name of Object.keys(personaScores)) {
+    personaScores[name] += BEHAVIOR_WEIGHT * (total ? counts[name] / total : 0.0);
   }
   
   // Initialize all planning scores to 0.0 (points system)
@@ -34,17 +62,32 @@ const calculatePersonaScores = (userSelections) => {
   
   // Set selected planning style to 0.5 (standard points)
   if (planningStyle && planningScores.hasOwnProperty(planningStyle)) {
-    planningScores[planningStyle] = 0.5;
+    planningScores[planningStyle] = PICK_SCORE;
   }
   
   return { personaScores, planningScores };
 };
 
-const savePersonaScores = async (userId, userSelections) => {
+// metaPreferences summed over every trip's UserSelections (keyed by Firebase uid)
+const loadMetaPreferences = async (firebaseId) => {
+  const metaPreferences = {};
+  if (!firebaseId) return metaPreferences;
+  const selections = await UserSelections.find({ userId: firebaseId }, { "behaviorData.metaPreferences": 1 });
+  for (const selection of selections) {
+    const counts = (selection.behaviorData && selection.behaviorData.metaPreferences) || {};
+    for (const key of Object.values(META_PREFERENCES)) {
+      metaPreferences[key] = (metaPreferences[key] || 0) + (Number(counts[key]) || 0);
+    }
+  }
+  return metaPreferences;
+};
+
+const savePersonaScores = async (userId, userSelections, firebaseId) => {
   try {
     console.log(`🧮 Calculating persona scores for user ${userId}`);
     
-    const { personaScores, planningScores } = calculatePersonaScores(userSelections);
+    const metaPreferences = await loadMetaPreferences(firebaseId);
+    const { personaScores, planningScores } = calculatePersonaScores(userSelections, metaPreferences);
     
     // Create or update PersonaScore
     const personaScore = await PersonaScore.findOneAndUpdate(
@@ -54,7 +97,7 @@ const savePersonaScores = async (userId, userSelections) => {
         personaScores,
         planningScores,
         calculatedAt: new Date(),
-        calculationVersion: "1.0"
+        calculationVersion: CALCULATION_VERSION
       },
       { upsert: true, new: true }
     );
@@ -82,28 +125,29 @@ const getPersonaScores = async (userId) => {
   }
 };
 
-// Query helpers
-const findArtPeople = async (minScore = 0.5) => {
+// Query helpers (PICK_SCORE: picked, or every selection went to that persona)
+const findArtPeople = async (minScore = PICK_SCORE) => {
   return await PersonaScore.find({ "personaScores.Art": { $gte: minScore } });
 };
 
-const findFoodPeople = async (minScore = 0.5) => {
+const findFoodPeople = async (minScore = PICK_SCORE) => {
   return await PersonaScore.find({ "personaScores.Food": { $gte: minScore } });
 };
 
-const findHistoryPeople = async (minScore = 0.5) => {
+const findHistoryPeople = async (minScore = PICK_SCORE) => {
   return await PersonaScore.find({ "personaScores.History": { $gte: minScore } });
 };
 
-const findAdventurePeople = async (minScore = 0.5) => {
+const findAdventurePeople = async (minScore = PICK_SCORE) => {
   return await PersonaScore.find({ "personaScores.Adventure": { $gte: minScore } });
 };
 
-const findSpontaneousPeople = async (minScore = 0.5) => {
+const findSpontaneousPeople = async (minScore = PICK_SCORE) => {
   return await PersonaScore.find({ "planningScores.Spontaneous": { $gte: minScore } });
 };
 
 module.exports = {
+  PICK_SCORE,
   calculatePersonaScores,
   savePersonaScores,
   getPersonaScores,
@@ -0,0 +1,47 @@
+const assert = require('node:assert');
+const { promptCacheKey } = require('./services/TripWell/pythonPromptService');
+
+// Which prompt requests share a cache key (and so one Python round trip)
+function testPromptCacheKey() {
+  console.log('🧪 Testing prompt cache keys...');
+
+  const base = {
+    city: 'Paris',
+    persona_weights: { art: 0.6, foodie: 0.1, adventure: 0.1, history: 0.1 },
+    budget: 300,
+    budget_level: 0.5,
+    romance_level: 0.0,
+    caretaker_role: 0.0,
+    flexibility: 0.5,
+    who_with: 'solo',
+    daily_spacing: 0.5,
+    season: 'Summer',
+    purpose: 'vacation'
+  };
+  const key = (changes) => promptCacheKey({ ...base, ...changes });
+  const same = (changes, why) => assert.strictEqual(key(changes), key({}), `should collide: ${why}`);
+  const differs = (changes, why) => assert.notStrictEqual(key(changes), key({}), `should not collide: ${why}`);
+
+  // Requests that differ only in rounding, case or field order collide
+  same({ city: ' paris ', season: 'summer', who_with: 'SOLO' }, 'case and whitespace');
+  same({ persona_weights: { history: 0.1, adventure: 0.1, foodie: 0.1, art: 0.61 } }, 'weight order and rounding');
+  same({ flexibility: 0.51 }, 'level rounding');
+  same({ budget: 302 }, 'budget within $10');
+  same({ budget: '300' }, 'string budget');
+  same({ budget: '$301' }, 'dollar string budget');
+  assert.strictEqual(key({ budget: '$1,200' }), key({ budget: 1200 }), 'should collide: formatted string budget');
+
+  // Requests /generate-prompt would answer differently do not
+  differs({ persona_weights: { art: 1.2, foodie: 0.2, adventure: 0.2, history: 0.2 } }, 'same ratios, larger weights');
+  differs({ persona_weights: { art: 0.1, foodie: 0.6, adventure: 0.1, history: 0.1 } }, 'different primary persona');
+  differs({ budget: 320 }, 'budget $20 apart');
+  differs({ budget: '320' }, 'string budget $20 apart');
+  differs({ budget: 'unknown' }, 'non-numeric budget');
+  differs({ budget: '' }, 'blank budget');
+  differs({ city: 'Rome' }, 'different city');
+  differs({ flexibility: 0.6 }, 'different level');
+
+  console.log('✅ Prompt cache keys collide only for near-identical requests');
+}
+
+testPromptCacheKey();
@@ -0,0 +1,48 @@
+"""
+Near-duplicate anchor clustering checks (python -m pytest tests/test_near_duplicates.py)
+"""
+
+import importlib.util
+import os
+from collections import defaultdict
+
+# The analyzer scripts live at the repository root, one level up
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load(name, filename):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+analyzer = _load('analyze_angela_results', 'analyze-angela-results.py')
+generator = _load('generate_angela_results', 'generate-angela-results.py')
+
+def test_distinct_titles_with_templated_descriptions_stay_apart():
+    index = analyzer.NearDuplicateIndex()
+    description = "Spend time here with a romantic, intimate setting, a bustling market and an easy stroll - budget friendly."
+    titles = ["Louvre Tour", "Seine by Bike", "Seine Food Crawl", "Louvre Food Crawl",
+              "Sunset at Montmartre", "Hidden Gems of Le Marais"]
+    ids = [index.add(title, description) for title in titles]
+    assert len(set(index.cluster_ids()[i] for i in ids)) == len(titles)
+
+def test_near_duplicate_titles_share_a_cluster():
+    index = analyzer.NearDuplicateIndex()
+    description = "Spend time at Louvre with centuries of history and a guided small-group visit - an easy stroll."
+    first = index.add("Louvre Tour", description)
+    second = index.add("Guided Louvre Tour", description)
+    assert index.cluster_ids()[first] == index.cluster_ids()[second]
+
+def test_generated_anchors_do_not_chain_across_places():
+    index = analyzer.NearDuplicateIndex()
+    places = [place for place, _ in generator.PLACES]
+    cluster_places = defaultdict(set)
+    titles = []
+    for result in generator.iter_results(3000):
+        for anchor in result.get('outputAnchors', []):
+            index.add(anchor['title'], anchor['description'])
+            titles.append(anchor['title'])
+    for title, cluster in zip(titles, index.cluster_ids()):
+        cluster_places[cluster].add(next(place for place in places if place in title))
+    assert all(len(found) == 1 for found in cluster_places.values())
+    assert len(cluster_places) >= len(set(titles))